@@ -1,812 +1,1303 @@
-import streamlit as st
-from datetime import datetime, date
-import pandas as pd
-from PIL import Image
-import os
-from config import (
-    ACTIVITIES, PRICING, ADMIN_USERNAME, ADMIN_PASSWORD,
-    CONTACT_EMAIL, CONTACT_PHONE, LOGO_PATH, PACKAGE_INCLUSIONS, GALLERY_IMAGES
-)
-from database import (
-    insert_enquiry, 
-    fetch_all_enquiries, 
-    update_follow_up_notes, 
-    update_enquiry_status,
-    calculate_quotation
-)
-
-# Page configuration
-st.set_page_config(
-    page_title="Pachena Eco-Tourism Resort",
-    page_icon="🏝️",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS with Dark Mode Support
-st.markdown("""
-<style>
-    /* Light Mode (Default) */
-    .main {
-        background: linear-gradient(to bottom, #faf9f6 0%, #e8f5e9 100%);
-    }
-    
-    /* Hero Section */
-    .hero-section {
-        background: linear-gradient(135deg, #1b5e20 0%, #4caf50 50%, #81c784 100%);
-        padding: 2rem;
-        border-radius: 15px;
-        color: white;
-        margin-bottom: 2rem;
-        box-shadow: 0 10px 25px rgba(27, 94, 32, 0.3);
-    }
-    
-    /* Activity Card */
-    .activity-card {
-        background: linear-gradient(135deg, #ffffff 0%, #f1f8e9 100%);
-        padding: 1.5rem;
-        border-radius: 12px;
-        border-left: 5px solid #66bb6a;
-        margin-bottom: 1rem;
-        box-shadow: 0 3px 10px rgba(0,0,0,0.1);
-        transition: all 0.3s ease;
-        color: #424242;
-    }
-    .activity-card h2 {
-        color: #1b5e20;
-    }
-    .activity-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 20px rgba(76, 175, 80, 0.3);
-        border-left-color: #4caf50;
-    }
-    
-    /* Price Table */
-    .price-table {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 3px 10px rgba(0,0,0,0.1);
-        margin-bottom: 1rem;
-        border: 1px solid #e0e0e0;
-    }
-    
-    .price-row {
-        display: flex;
-        justify-content: space-between;
-        padding: 1rem;
-        border-bottom: 1px solid #f0f0f0;
-        transition: all 0.2s;
-    }
-    
-    .price-row:hover {
-        background: #f1f8e9;
-        border-radius: 6px;
-    }
-    
-    .price-row:last-child {
-        border-bottom: none;
-    }
-    
-    .service-name {
-        font-size: 1.1rem;
-        color: #2e7d32;
-        font-weight: 500;
-    }
-    
-    .price-amount {
-        font-size: 1.3rem;
-        color: #1b5e20;
-        font-weight: bold;
-    }
-    
-    /* Package Inclusion Card */
-    .inclusion-card {
-        background: linear-gradient(135deg, #e8f5e9 0%, #c8e6c9 100%);
-        padding: 1.5rem;
-        border-radius: 12px;
-        border: 2px solid #66bb6a;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 3px 10px rgba(76, 175, 80, 0.2);
-    }
-    
-    .inclusion-item {
-        padding: 0.5rem 0;
-        font-size: 1.05rem;
-        color: #1b5e20;
-        font-weight: 500;
-    }
-    
-    .inclusion-item:before {
-        content: "✓ ";
-        color: #2e7d32;
-        font-weight: bold;
-        font-size: 1.3rem;
-        margin-right: 0.3rem;
-    }
-    
-    /* Gallery Container */
-    .gallery-container {
-        margin: 1rem 0;
-    }
-    
-    /* Gallery Image Caption */
-    .gallery-caption {
-        text-align: center;
-        color: #2e7d32;
-        font-weight: 500;
-        margin-top: 0.5rem;
-        font-size: 0.9rem;
-    }
-    
-    /* Button Styling */
-    .stButton>button {
-        background: linear-gradient(135deg, #2e7d32 0%, #66bb6a 100%);
-        color: white;
-        border: none;
-        padding: 0.75rem 2rem;
-        border-radius: 8px;
-        font-weight: bold;
-        font-size: 1.1rem;
-        box-shadow: 0 4px 12px rgba(46, 125, 50, 0.3);
-        transition: all 0.3s;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 16px rgba(46, 125, 50, 0.4);
-        background: linear-gradient(135deg, #1b5e20 0%, #4caf50 100%);
-    }
-    
-    /* Section Headers */
-    .section-header {
-        color: #1b5e20;
-        font-size: 2rem;
-        font-weight: bold;
-        margin-bottom: 1rem;
-        border-bottom: 4px solid #66bb6a;
-        padding-bottom: 0.5rem;
-    }
-    
-    /* Sidebar Styling */
-    [data-testid="stSidebar"] {
-        background: #e8f5e9;
-    }
-    
-    /* Sidebar Text Elements - Light Mode */
-    [data-testid="stSidebar"] .stMarkdown {
-        color: #212121;
-    }
-    
-    [data-testid="stSidebar"] h3 {
-        color: #1b5e20 !important;
-        font-weight: 600;
-    }
-    
-    [data-testid="stSidebar"] .stRadio label {
-        color: #1b5e20 !important;
-        font-weight: 500;
-    }
-    
-    [data-testid="stSidebar"] .stInfo, 
-    [data-testid="stSidebar"] .stSuccess {
-        background-color: #ffffff !important;
-        border: 1px solid #c8e6c9;
-        color: #212121 !important;
-    }
-    
-    [data-testid="stSidebar"] .stInfo p,
-    [data-testid="stSidebar"] .stSuccess p {
-        color: #212121 !important;
-        font-weight: 500;
-    }
-    
-    /* Logo Container */
-    .logo-container {
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        margin-bottom: 1.5rem;
-        padding: 1rem;
-    }
-    
-    .logo-container svg {
-        max-width: 100%;
-        height: auto;
-        filter: drop-shadow(0 4px 8px rgba(0,0,0,0.1));
-    }
-    
-    /* Dark Mode Styles */
-    @media (prefers-color-scheme: dark) {
-        .main {
-            background: linear-gradient(to bottom, #1a1a1a 0%, #0d2818 100%);
-        }
-        
-        .hero-section {
-            background: linear-gradient(135deg, #1b4d20 0%, #2d6e32 50%, #3d7d43 100%);
-            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.5);
-        }
-        
-        .activity-card {
-            background: linear-gradient(135deg, #2a2a2a 0%, #1e3d25 100%);
-            border-left: 5px solid #66bb6a;
-            box-shadow: 0 3px 10px rgba(0,0,0,0.4);
-            color: #e0e0e0;
-        }
-        
-        .activity-card h2 {
-            color: #81c784 !important;
-        }
-        
-        .activity-card p {
-            color: #c8c8c8 !important;
-        }
-        
-        .price-table {
-            background: #2a2a2a;
-            border: 1px solid #3d3d3d;
-            box-shadow: 0 3px 10px rgba(0,0,0,0.4);
-        }
-        
-        .price-row {
-            border-bottom: 1px solid #3d3d3d;
-        }
-        
-        .price-row:hover {
-            background: #1e3d25;
-        }
-        
-        .service-name {
-            color: #81c784;
-        }
-        
-        .price-amount {
-            color: #a5d6a7;
-        }
-        
-        .inclusion-card {
-            background: linear-gradient(135deg, #1e3d25 0%, #2d4f32 100%);
-            border: 2px solid #4caf50;
-            box-shadow: 0 3px 10px rgba(76, 175, 80, 0.3);
-        }
-        
-        .inclusion-item {
-            color: #c8e6c9;
-        }
-        
-        .inclusion-item:before {
-            color: #81c784;
-        }
-        
-        .gallery-caption {
-            color: #81c784;
-            background: rgba(0, 0, 0, 0.5);
-            padding: 0.5rem;
-            border-radius: 4px;
-        }
-        
-        .section-header {
-            color: #81c784;
-            border-bottom: 4px solid #4caf50;
-        }
-        
-        [data-testid="stSidebar"] {
-            background: #1e3d25;
-        }
-        
-        [data-testid="stSidebar"] .stMarkdown {
-            color: #e0e0e0;
-        }
-        
-        [data-testid="stSidebar"] h3 {
-            color: #81c784 !important;
-        }
-        
-        [data-testid="stSidebar"] .stRadio label {
-            color: #81c784 !important;
-        }
-        
-        [data-testid="stSidebar"] .stInfo, 
-        [data-testid="stSidebar"] .stSuccess {
-            background-color: #2a2a2a !important;
-            border: 1px solid #4caf50;
-            color: #e0e0e0 !important;
-        }
-        
-        [data-testid="stSidebar"] .stInfo p,
-        [data-testid="stSidebar"] .stSuccess p {
-            color: #e0e0e0 !important;
-        }
-        
-        .logo-container svg {
-            filter: drop-shadow(0 4px 8px rgba(0,0,0,0.6)) brightness(1.1);
-        }
-    }
-    
-    /* Force dark mode for Streamlit in dark theme */
-    [data-theme="dark"] .main {
-        background: linear-gradient(to bottom, #1a1a1a 0%, #0d2818 100%);
-    }
-    
-    [data-theme="dark"] .hero-section {
-        background: linear-gradient(135deg, #1b4d20 0%, #2d6e32 50%, #3d7d43 100%);
-        box-shadow: 0 10px 25px rgba(0, 0, 0, 0.5);
-    }
-    
-    [data-theme="dark"] .activity-card {
-        background: linear-gradient(135deg, #2a2a2a 0%, #1e3d25 100%);
-        color: #e0e0e0;
-    }
-    
-    [data-theme="dark"] .activity-card h2 {
-        color: #81c784 !important;
-    }
-    
-    [data-theme="dark"] .activity-card p {
-        color: #c8c8c8 !important;
-    }
-    
-    [data-theme="dark"] .price-table {
-        background: #2a2a2a;
-        border: 1px solid #3d3d3d;
-    }
-    
-    [data-theme="dark"] .price-row {
-        border-bottom: 1px solid #3d3d3d;
-    }
-    
-    [data-theme="dark"] .price-row:hover {
-        background: #1e3d25;
-    }
-    
-    [data-theme="dark"] .service-name {
-        color: #81c784;
-    }
-    
-    [data-theme="dark"] .price-amount {
-        color: #a5d6a7;
-    }
-    
-    [data-theme="dark"] .inclusion-card {
-        background: linear-gradient(135deg, #1e3d25 0%, #2d4f32 100%);
-        border: 2px solid #4caf50;
-    }
-    
-    [data-theme="dark"] .inclusion-item {
-        color: #c8e6c9;
-    }
-    
-    [data-theme="dark"] .inclusion-item:before {
-        color: #81c784;
-    }
-    
-    [data-theme="dark"] .gallery-caption {
-        color: #81c784;
-        background: rgba(0, 0, 0, 0.5);
-        padding: 0.5rem;
-        border-radius: 4px;
-    }
-    
-    [data-theme="dark"] .section-header {
-        color: #81c784;
-        border-bottom: 4px solid #4caf50;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] {
-        background: #1e3d25;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] .stMarkdown {
-        color: #e0e0e0;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] h3 {
-        color: #81c784 !important;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] .stRadio label {
-        color: #e0e0e0 !important;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] .stInfo, 
-    [data-theme="dark"] [data-testid="stSidebar"] .stSuccess {
-        background-color: #2a2a2a !important;
-        border: 1px solid #4caf50;
-        color: #e0e0e0 !important;
-    }
-    
-    [data-theme="dark"] [data-testid="stSidebar"] .stInfo p,
-    [data-theme="dark"] [data-testid="stSidebar"] .stSuccess p {
-        color: #e0e0e0 !important;
-    }
-    
-    [data-theme="dark"] .logo-container svg {
-        filter: drop-shadow(0 4px 8px rgba(0,0,0,0.6)) brightness(1.1);
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize session state
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'page' not in st.session_state:
-    st.session_state.page = 'home'
-
-
-def render_hero_section():
-    """Render the hero section with resort description and logo"""
-    # Display logo - optimized for 1366x768 landscape SVG
-    if os.path.exists(LOGO_PATH):
-        # Handle SVG or image files
-        if LOGO_PATH.endswith('.svg'):
-            with open(LOGO_PATH, 'r') as f:
-                svg_content = f.read()
-            st.markdown(f'''
-            <div class="logo-container">
-                <div style="max-width: 900px; width: 100%;">
-                    {svg_content}
-                </div>
-            </div>
-            ''', unsafe_allow_html=True)
-        else:
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                logo = Image.open(LOGO_PATH)
-                st.image(logo, use_container_width=True)
-    
-    st.markdown("""
-    <div class="hero-section">
-        <h1 style="text-align: center; font-size: 2.8rem; text-shadow: 2px 2px 4px rgba(0,0,0,0.2);">Welcome to Pachena Resort</h1>
-        <h3 style="text-align: center; margin-top: 0.5rem; font-size: 1.5rem;">Your Gateway to Nature & Relaxation</h3>
-        <p style="font-size: 1.15rem; margin-top: 1.5rem; text-align: center; line-height: 1.6;">
-            Escape to the tranquility of Pachena Resort, where comfortable tented accommodation meets 
-            authentic farm experiences. Nestled in nature's embrace, we offer the perfect blend of 
-            adventure, relaxation, and genuine hospitality.
-        </p>
-        <p style="font-size: 1.1rem; text-align: center; margin-top: 1rem; line-height: 1.6;">
-            From guided farm tours and bonfire chats to spa treatments and nature walks, 
-            every moment at Pachena is designed to reconnect you with the beauty of the outdoors.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-
-
-def render_gallery_section():
-    """Render photo gallery with captions"""
-    st.markdown('<h2 class="section-header">📸 Resort Gallery</h2>', unsafe_allow_html=True)
-    st.markdown("Discover the beauty and charm of Pachena Resort through our photo collection")
-    
-    # Display images in a grid (4 columns)
-    cols_per_row = 4
-    
-    for i in range(0, len(GALLERY_IMAGES), cols_per_row):
-        cols = st.columns(cols_per_row)
-        for j in range(cols_per_row):
-            idx = i + j
-            if idx < len(GALLERY_IMAGES):
-                img_data = GALLERY_IMAGES[idx]
-                img_file = img_data["file"]
-                caption = img_data["caption"]
-                
-                if os.path.exists(img_file):
-                    with cols[j]:
-                        try:
-                            img = Image.open(img_file)
-                            st.image(img, use_container_width=True)
-                            st.markdown(f'<p class="gallery-caption">{caption}</p>', unsafe_allow_html=True)
-                        except Exception as e:
-                            st.warning(f"Could not load {img_file}")
-
-
-def render_activities_section():
-    """Render the activities section in a grid layout"""
-    st.markdown('<h2 class="section-header">🌟 Our Experiences</h2>', unsafe_allow_html=True)
-    st.markdown("Immerse yourself in a variety of activities designed for relaxation and adventure")
-    
-    # Create a 3-column grid for activities
-    cols = st.columns(3)
-    
-    for idx, activity in enumerate(ACTIVITIES):
-        col = cols[idx % 3]
-        with col:
-            st.markdown(f"""
-            <div class="activity-card">
-                <h2 style="margin: 0; color: #1b5e20;">{activity['icon']} {activity['name']}</h2>
-                <p style="margin-top: 0.5rem; color: #424242; line-height: 1.5;">{activity['description']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-
-def render_pricing_section():
-    """Render the pricing section with clear service-price layout"""
-    st.markdown('<h2 class="section-header">💰 Rates & Pricing</h2>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([3, 2])
-    
-    with col1:
-        st.markdown("### Pachena Resort Rates (Per Person)")
-        st.markdown("""
-        <div class="price-table">
-        """, unsafe_allow_html=True)
-        
-        # Display each price item
-        for service, price in PRICING.items():
-            price_text = f"${price}" if "Starting" not in service else f"Starting at ${price}"
-            st.markdown(f"""
-            <div class="price-row">
-                <span class="service-name">{service}</span>
-                <span class="price-amount">{price_text}</span>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("### What's Included")
-        st.markdown('<div class="inclusion-card">', unsafe_allow_html=True)
-        
-        for inclusion in PACKAGE_INCLUSIONS:
-            st.markdown(f'<div class="inclusion-item">{inclusion}</div>', unsafe_allow_html=True)
-        
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.info("💡 **Note:** Child packages apply to children under 12 years old")
-
-
-def render_booking_form():
-    """Render the booking enquiry form"""
-    st.markdown('<h2 class="section-header">📝 Book Your Stay</h2>', unsafe_allow_html=True)
-    st.markdown("Complete the form below and our team will contact you to confirm your booking")
-    
-    with st.form("booking_form", clear_on_submit=True):
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            name = st.text_input("Full Name *", placeholder="Enter your full name")
-            phone = st.text_input("Phone Number *", placeholder="+263 775 387 683")
-            booking_date = st.date_input("Preferred Date *", min_value=date.today())
-        
-        with col2:
-            num_adults = st.number_input("Number of Adults *", min_value=0, max_value=20, value=1)
-            num_children = st.number_input("Number of Children (Under 12)", min_value=0, max_value=20, value=0)
-            
-            package_options = list(PRICING.keys())
-            package = st.selectbox("Select Package/Service *", options=package_options)
-        
-        # Additional comments
-        comments = st.text_area("Special Requests or Questions", placeholder="Any dietary requirements, special occasions, or questions?")
-        
-        submitted = st.form_submit_button("Submit Booking Enquiry", use_container_width=True)
-        
-        if submitted:
-            # Validation
-            if not name or not phone:
-                st.error("❌ Please fill in all required fields (Name and Phone)")
-            elif num_adults == 0 and num_children == 0:
-                st.error("❌ Please specify at least one adult or child")
-            else:
-                # Insert into database
-                result = insert_enquiry(
-                    name=name,
-                    phone=phone,
-                    date=str(booking_date),
-                    num_adults=num_adults,
-                    num_children=num_children,
-                    package=package
-                )
-                
-                if result.get("success"):
-                    st.success("🎉 Thank you for your booking enquiry! Our team will contact you shortly to confirm your reservation.")
-                    st.balloons()
-                    st.info(f"📧 You can also reach us directly at {CONTACT_EMAIL} or call {CONTACT_PHONE}")
-                else:
-                    st.error(f"❌ Error submitting enquiry: {result.get('error')}")
-
-
-def render_public_page():
-    """Render the complete public landing page"""
-    render_hero_section()
-    st.divider()
-    render_gallery_section()
-    st.divider()
-    render_activities_section()
-    st.divider()
-    render_pricing_section()
-    st.divider()
-    render_booking_form()
-
-
-def render_staff_login():
-    """Render the staff login page"""
-    st.header("🔐 Staff Login")
-    
-    with st.form("login_form"):
-        username = st.text_input("Username")
-        password = st.text_input("Password", type="password")
-        submit = st.form_submit_button("Login")
-        
-        if submit:
-            if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
-                st.session_state.logged_in = True
-                st.success("Login successful!")
-                st.rerun()
-            else:
-                st.error("Invalid username or password")
-
-
-def render_admin_dashboard():
-    """Render the admin dashboard"""
-    st.header("📊 Admin Dashboard")
-    
-    # Logout button
-    col1, col2, col3 = st.columns([1, 1, 4])
-    with col1:
-        if st.button("🚪 Logout"):
-            st.session_state.logged_in = False
-            st.rerun()
-    
-    with col2:
-        if st.button("🔄 Refresh Data"):
-            st.rerun()
-    
-    st.divider()
-    
-    # Fetch all enquiries
-    enquiries_df = fetch_all_enquiries()
-    
-    if enquiries_df.empty:
-        st.info("No enquiries found in the database.")
-        return
-    
-    # Display summary metrics
-    st.subheader("📈 Summary")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Total Enquiries", len(enquiries_df))
-    
-    with col2:
-        pending = len(enquiries_df[enquiries_df.get('status', 'pending') == 'pending'])
-        st.metric("Pending", pending)
-    
-    with col3:
-        total_adults = enquiries_df['num_adults'].sum()
-        st.metric("Total Adults", int(total_adults))
-    
-    with col4:
-        total_children = enquiries_df['num_children'].sum()
-        st.metric("Total Children", int(total_children))
-    
-    st.divider()
-    
-    # Display enquiries table
-    st.subheader("📋 All Enquiries")
-    
-    # Select columns to display
-    display_columns = ['id', 'name', 'phone', 'booking_date', 'num_adults', 
-                      'num_children', 'package', 'status', 'created_at']
-    
-    available_columns = [col for col in display_columns if col in enquiries_df.columns]
-    st.dataframe(enquiries_df[available_columns], use_container_width=True, hide_index=True)
-    
-    st.divider()
-    
-    # Section for adding follow-up notes and generating quotations
-    st.subheader("🔧 Manage Enquiry")
-    
-    enquiry_ids = enquiries_df['id'].tolist()
-    selected_id = st.selectbox("Select Enquiry ID", options=enquiry_ids)
-    
-    if selected_id:
-        selected_enquiry = enquiries_df[enquiries_df['id'] == selected_id].iloc[0]
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**Customer Details:**")
-            st.write(f"Name: {selected_enquiry['name']}")
-            st.write(f"Phone: {selected_enquiry['phone']}")
-            st.write(f"Date: {selected_enquiry['booking_date']}")
-            st.write(f"Adults: {selected_enquiry['num_adults']}")
-            st.write(f"Children: {selected_enquiry['num_children']}")
-            st.write(f"Package: {selected_enquiry['package']}")
-            
-            # Update status
-            st.markdown("**Update Status:**")
-            new_status = st.selectbox("Change Status", 
-                                     options=['pending', 'confirmed', 'completed', 'cancelled'],
-                                     key='status_select')
-            if st.button("Update Status"):
-                result = update_enquiry_status(selected_id, new_status)
-                if result.get("success"):
-                    st.success("Status updated successfully!")
-                    st.rerun()
-                else:
-                    st.error(f"Error: {result.get('error')}")
-        
-        with col2:
-            # Add follow-up notes
-            st.markdown("**Follow-up Notes:**")
-            current_notes = selected_enquiry.get('follow_up_notes', '')
-            notes = st.text_area("Add Notes", value=current_notes, height=150)
-            
-            if st.button("Save Notes"):
-                result = update_follow_up_notes(selected_id, notes)
-                if result.get("success"):
-                    st.success("Notes saved successfully!")
-                    st.rerun()
-                else:
-                    st.error(f"Error: {result.get('error')}")
-            
-            # Generate quotation
-            st.markdown("**Generate Quotation:**")
-            if st.button("Calculate Quotation"):
-                quotation = calculate_quotation(
-                    num_adults=int(selected_enquiry['num_adults']),
-                    num_children=int(selected_enquiry['num_children']),
-                    package=selected_enquiry['package']
-                )
-                
-                st.markdown("---")
-                st.markdown("**Quotation Breakdown:**")
-                st.write(f"Adults: {quotation['num_adults']} × ${quotation['adult_price']} = ${quotation['adults_total']}")
-                st.write(f"Children: {quotation['num_children']} × ${quotation['child_price']} = ${quotation['children_total']}")
-                st.write(f"Package: {quotation['package']} = ${quotation['package_price']}")
-                st.write(f"Subtotal: ${quotation['subtotal']:.2f}")
-                st.write(f"Tax (12%): ${quotation['tax']:.2f}")
-                st.markdown(f"**Total: ${quotation['total']:.2f}**")
-
-
-def main():
-    """Main application"""
-    
-    # Sidebar with logo - optimized for landscape SVG
-    if os.path.exists(LOGO_PATH):
-        try:
-            if LOGO_PATH.endswith('.svg'):
-                with open(LOGO_PATH, 'r') as f:
-                    svg_content = f.read()
-                st.sidebar.markdown(f'''
-                <div style="max-width: 100%; overflow: hidden; margin-bottom: 1rem;">
-                    {svg_content}
-                </div>
-                ''', unsafe_allow_html=True)
-            else:
-                logo = Image.open(LOGO_PATH)
-                st.sidebar.image(logo, use_container_width=True)
-        except:
-            st.sidebar.title("Pachena Resort")
-    else:
-        st.sidebar.title("Pachena Resort")
-    
-    if not st.session_state.logged_in:
-        page = st.sidebar.radio("Navigation", ["🏠 Home", "🔐 Staff Login"], label_visibility="collapsed")
-    else:
-        page = st.sidebar.radio("Navigation", ["🏠 Home", "📊 Admin Dashboard"], label_visibility="collapsed")
-    
-    st.sidebar.divider()
-    st.sidebar.markdown("### 📞 Contact Us")
-    st.sidebar.info(f"📧 {CONTACT_EMAIL}\n\n📱 {CONTACT_PHONE}")
-    
-    st.sidebar.divider()
-    st.sidebar.markdown("### 🕒 Operating Hours")
-    st.sidebar.success("**Open Daily**\n\n🌅 8:00 AM - 6:00 PM")
-    
-    # Clean up page names for routing
-    page_clean = page.split(" ", 1)[1] if " " in page else page
-    
-    # Render appropriate page
-    if "Home" in page:
-        render_public_page()
-    elif "Staff Login" in page:
-        render_staff_login()
-    elif "Admin Dashboard" in page:
-        if st.session_state.logged_in:
-            render_admin_dashboard()
-        else:
-            st.warning("Please log in to access the admin dashboard")
-            render_staff_login()
-
-
-if __name__ == "__main__":
-    main()
+import streamlit as st
+from datetime import datetime, date
+import pandas as pd
+import os
+import re
+import uuid
+import config
+from config import (
+    ACTIVITIES, PRICING, ADMIN_USERNAME, ADMIN_PASSWORD,
+    CONTACT_EMAIL, CONTACT_PHONE, LOGO_PATH, PACKAGE_INCLUSIONS, GALLERY_IMAGES,
+    ENQUIRY_STATUSES, GALLERY_COLUMN_WIDTH, OUTBOX_ENABLED, OUTBOX_PATH, OUTBOX_MAX_ATTEMPTS, TAX_RATE,
+    DAILY_GUEST_CAPACITY, OCCUPANCY_HEATMAP_DAYS, SEARCH_MIN_LENGTH, SEARCH_RESULT_LIMIT,
+    RATE_LIMIT_TRUST_PROXY, REALTIME_ENABLED, LIVE_UPDATE_INTERVAL, DB_ASYNC_PREFETCH,
+    PROFILING_ENABLED
+)
+from assets import gallery_image, load_image, logo_markup, content_hash, get_asset_cache_stats
+from outbox import enqueue_enquiry, start_flusher, get_outbox_stats
+from ratelimit import check_booking_submission, forwarded_client_ip, get_rate_limit_stats
+from changefeed import start_change_feed, get_change_version, get_change_feed_stats
+from metrics import timed_render, register_gauges, start_metrics_exporter, get_metrics_summary
+from profiler import profile_rerun, list_profiles, get_hotspots, read_profile
+from async_database import (
+    run_concurrently,
+    fetch_enquiry_summary_async,
+    fetch_occupancy_async,
+    fetch_enquiry_page_async,
+    fetch_enquiry_notes_async
+)
+from database import (
+    build_enquiry_record,
+    insert_enquiry_records,
+    fetch_enquiry_page,
+    fetch_enquiry_summary,
+    fetch_enquiry_notes,
+    fetch_occupancy,
+    search_enquiries,
+    get_date_occupancy,
+    update_follow_up_notes, 
+    update_enquiry_status,
+    bulk_update_enquiries,
+    calculate_quotation,
+    calculate_quotations,
+    warm_up_pool,
+    get_pool_stats,
+    get_enquiry_cache_stats,
+    invalidate_enquiry_cache
+)
+
+# Page configuration
+st.set_page_config(
+    page_title="Pachena Eco-Tourism Resort",
+    page_icon="🏝️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS with Dark Mode Support
+CUSTOM_CSS = """
+<style>
+    /* Light Mode (Default) */
+    .main {
+        background: linear-gradient(to bottom, #faf9f6 0%, #e8f5e9 100%);
+    }
+    
+    /* Hero Section */
+    .hero-section {
+        background: linear-gradient(135deg, #1b5e20 0%, #4caf50 50%, #81c784 100%);
+        padding: 2rem;
+        border-radius: 15px;
+        color: white;
+        margin-bottom: 2rem;
+        box-shadow: 0 10px 25px rgba(27, 94, 32, 0.3);
+    }
+    
+    /* Activity Grid */
+    .activity-grid {
+        display: grid;
+        grid-template-columns: repeat(3, minmax(0, 1fr));
+        column-gap: 1rem;
+    }
+    
+    @media (max-width: 768px) {
+        .activity-grid {
+            grid-template-columns: 1fr;
+        }
+    }
+    
+    /* Activity Card */
+    .activity-card {
+        background: linear-gradient(135deg, #ffffff 0%, #f1f8e9 100%);
+        padding: 1.5rem;
+        border-radius: 12px;
+        border-left: 5px solid #66bb6a;
+        margin-bottom: 1rem;
+        box-shadow: 0 3px 10px rgba(0,0,0,0.1);
+        transition: all 0.3s ease;
+        color: #424242;
+    }
+    .activity-card h2 {
+        color: #1b5e20;
+    }
+    .activity-card:hover {
+        transform: translateY(-5px);
+        box-shadow: 0 8px 20px rgba(76, 175, 80, 0.3);
+        border-left-color: #4caf50;
+    }
+    
+    /* Price Table */
+    .price-table {
+        background: white;
+        padding: 1.5rem;
+        border-radius: 12px;
+        box-shadow: 0 3px 10px rgba(0,0,0,0.1);
+        margin-bottom: 1rem;
+        border: 1px solid #e0e0e0;
+    }
+    
+    .price-row {
+        display: flex;
+        justify-content: space-between;
+        padding: 1rem;
+        border-bottom: 1px solid #f0f0f0;
+        transition: all 0.2s;
+    }
+    
+    .price-row:hover {
+        background: #f1f8e9;
+        border-radius: 6px;
+    }
+    
+    .price-row:last-child {
+        border-bottom: none;
+    }
+    
+    .service-name {
+        font-size: 1.1rem;
+        color: #2e7d32;
+        font-weight: 500;
+    }
+    
+    .price-amount {
+        font-size: 1.3rem;
+        color: #1b5e20;
+        font-weight: bold;
+    }
+    
+    /* Package Inclusion Card */
+    .inclusion-card {
+        background: linear-gradient(135deg, #e8f5e9 0%, #c8e6c9 100%);
+        padding: 1.5rem;
+        border-radius: 12px;
+        border: 2px solid #66bb6a;
+        margin-bottom: 1.5rem;
+        box-shadow: 0 3px 10px rgba(76, 175, 80, 0.2);
+    }
+    
+    .inclusion-item {
+        padding: 0.5rem 0;
+        font-size: 1.05rem;
+        color: #1b5e20;
+        font-weight: 500;
+    }
+    
+    .inclusion-item:before {
+        content: "✓ ";
+        color: #2e7d32;
+        font-weight: bold;
+        font-size: 1.3rem;
+        margin-right: 0.3rem;
+    }
+    
+    /* Gallery Container */
+    .gallery-container {
+        margin: 1rem 0;
+    }
+    
+    /* Gallery Image Caption */
+    .gallery-caption {
+        text-align: center;
+        color: #2e7d32;
+        font-weight: 500;
+        margin-top: 0.5rem;
+        font-size: 0.9rem;
+    }
+    
+    /* Button Styling */
+    .stButton>button {
+        background: linear-gradient(135deg, #2e7d32 0%, #66bb6a 100%);
+        color: white;
+        border: none;
+        padding: 0.75rem 2rem;
+        border-radius: 8px;
+        font-weight: bold;
+        font-size: 1.1rem;
+        box-shadow: 0 4px 12px rgba(46, 125, 50, 0.3);
+        transition: all 0.3s;
+    }
+    
+    .stButton>button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 6px 16px rgba(46, 125, 50, 0.4);
+        background: linear-gradient(135deg, #1b5e20 0%, #4caf50 100%);
+    }
+    
+    /* Section Headers */
+    .section-header {
+        color: #1b5e20;
+        font-size: 2rem;
+        font-weight: bold;
+        margin-bottom: 1rem;
+        border-bottom: 4px solid #66bb6a;
+        padding-bottom: 0.5rem;
+    }
+    
+    /* Sidebar Styling */
+    [data-testid="stSidebar"] {
+        background: #e8f5e9;
+    }
+    
+    /* Sidebar Text Elements - Light Mode */
+    [data-testid="stSidebar"] .stMarkdown {
+        color: #212121;
+    }
+    
+    [data-testid="stSidebar"] h3 {
+        color: #1b5e20 !important;
+        font-weight: 600;
+    }
+    
+    [data-testid="stSidebar"] .stRadio label {
+        color: #1b5e20 !important;
+        font-weight: 500;
+    }
+    
+    [data-testid="stSidebar"] .stInfo, 
+    [data-testid="stSidebar"] .stSuccess {
+        background-color: #ffffff !important;
+        border: 1px solid #c8e6c9;
+        color: #212121 !important;
+    }
+    
+    [data-testid="stSidebar"] .stInfo p,
+    [data-testid="stSidebar"] .stSuccess p {
+        color: #212121 !important;
+        font-weight: 500;
+    }
+    
+    /* Logo Container */
+    .logo-container {
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        margin-bottom: 1.5rem;
+        padding: 1rem;
+    }
+    
+    .logo-container svg,
+    .logo-container img {
+        max-width: 100%;
+        height: auto;
+        filter: drop-shadow(0 4px 8px rgba(0,0,0,0.1));
+    }
+    
+    /* Dark Mode Styles */
+    @media (prefers-color-scheme: dark) {
+        .main {
+            background: linear-gradient(to bottom, #1a1a1a 0%, #0d2818 100%);
+        }
+        
+        .hero-section {
+            background: linear-gradient(135deg, #1b4d20 0%, #2d6e32 50%, #3d7d43 100%);
+            box-shadow: 0 10px 25px rgba(0, 0, 0, 0.5);
+        }
+        
+        .activity-card {
+            background: linear-gradient(135deg, #2a2a2a 0%, #1e3d25 100%);
+            border-left: 5px solid #66bb6a;
+            box-shadow: 0 3px 10px rgba(0,0,0,0.4);
+            color: #e0e0e0;
+        }
+        
+        .activity-card h2 {
+            color: #81c784 !important;
+        }
+        
+        .activity-card p {
+            color: #c8c8c8 !important;
+        }
+        
+        .price-table {
+            background: #2a2a2a;
+            border: 1px solid #3d3d3d;
+            box-shadow: 0 3px 10px rgba(0,0,0,0.4);
+        }
+        
+        .price-row {
+            border-bottom: 1px solid #3d3d3d;
+        }
+        
+        .price-row:hover {
+            background: #1e3d25;
+        }
+        
+        .service-name {
+            color: #81c784;
+        }
+        
+        .price-amount {
+            color: #a5d6a7;
+        }
+        
+        .inclusion-card {
+            background: linear-gradient(135deg, #1e3d25 0%, #2d4f32 100%);
+            border: 2px solid #4caf50;
+            box-shadow: 0 3px 10px rgba(76, 175, 80, 0.3);
+        }
+        
+        .inclusion-item {
+            color: #c8e6c9;
+        }
+        
+        .inclusion-item:before {
+            color: #81c784;
+        }
+        
+        .gallery-caption {
+            color: #81c784;
+            background: rgba(0, 0, 0, 0.5);
+            padding: 0.5rem;
+            border-radius: 4px;
+        }
+        
+        .section-header {
+            color: #81c784;
+            border-bottom: 4px solid #4caf50;
+        }
+        
+        [data-testid="stSidebar"] {
+            background: #1e3d25;
+        }
+        
+        [data-testid="stSidebar"] .stMarkdown {
+            color: #e0e0e0;
+        }
+        
+        [data-testid="stSidebar"] h3 {
+            color: #81c784 !important;
+        }
+        
+        [data-testid="stSidebar"] .stRadio label {
+            color: #81c784 !important;
+        }
+        
+        [data-testid="stSidebar"] .stInfo, 
+        [data-testid="stSidebar"] .stSuccess {
+            background-color: #2a2a2a !important;
+            border: 1px solid #4caf50;
+            color: #e0e0e0 !important;
+        }
+        
+        [data-testid="stSidebar"] .stInfo p,
+        [data-testid="stSidebar"] .stSuccess p {
+            color: #e0e0e0 !important;
+        }
+        
+        .logo-container svg,
+        .logo-container img {
+            filter: drop-shadow(0 4px 8px rgba(0,0,0,0.6)) brightness(1.1);
+        }
+    }
+    
+    /* Force dark mode for Streamlit in dark theme */
+    [data-theme="dark"] .main {
+        background: linear-gradient(to bottom, #1a1a1a 0%, #0d2818 100%);
+    }
+    
+    [data-theme="dark"] .hero-section {
+        background: linear-gradient(135deg, #1b4d20 0%, #2d6e32 50%, #3d7d43 100%);
+        box-shadow: 0 10px 25px rgba(0, 0, 0, 0.5);
+    }
+    
+    [data-theme="dark"] .activity-card {
+        background: linear-gradient(135deg, #2a2a2a 0%, #1e3d25 100%);
+        color: #e0e0e0;
+    }
+    
+    [data-theme="dark"] .activity-card h2 {
+        color: #81c784 !important;
+    }
+    
+    [data-theme="dark"] .activity-card p {
+        color: #c8c8c8 !important;
+    }
+    
+    [data-theme="dark"] .price-table {
+        background: #2a2a2a;
+        border: 1px solid #3d3d3d;
+    }
+    
+    [data-theme="dark"] .price-row {
+        border-bottom: 1px solid #3d3d3d;
+    }
+    
+    [data-theme="dark"] .price-row:hover {
+        background: #1e3d25;
+    }
+    
+    [data-theme="dark"] .service-name {
+        color: #81c784;
+    }
+    
+    [data-theme="dark"] .price-amount {
+        color: #a5d6a7;
+    }
+    
+    [data-theme="dark"] .inclusion-card {
+        background: linear-gradient(135deg, #1e3d25 0%, #2d4f32 100%);
+        border: 2px solid #4caf50;
+    }
+    
+    [data-theme="dark"] .inclusion-item {
+        color: #c8e6c9;
+    }
+    
+    [data-theme="dark"] .inclusion-item:before {
+        color: #81c784;
+    }
+    
+    [data-theme="dark"] .gallery-caption {
+        color: #81c784;
+        background: rgba(0, 0, 0, 0.5);
+        padding: 0.5rem;
+        border-radius: 4px;
+    }
+    
+    [data-theme="dark"] .section-header {
+        color: #81c784;
+        border-bottom: 4px solid #4caf50;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] {
+        background: #1e3d25;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] .stMarkdown {
+        color: #e0e0e0;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] h3 {
+        color: #81c784 !important;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] .stRadio label {
+        color: #e0e0e0 !important;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] .stInfo, 
+    [data-theme="dark"] [data-testid="stSidebar"] .stSuccess {
+        background-color: #2a2a2a !important;
+        border: 1px solid #4caf50;
+        color: #e0e0e0 !important;
+    }
+    
+    [data-theme="dark"] [data-testid="stSidebar"] .stInfo p,
+    [data-theme="dark"] [data-testid="stSidebar"] .stSuccess p {
+        color: #e0e0e0 !important;
+    }
+    
+    [data-theme="dark"] .logo-container svg,
+    [data-theme="dark"] .logo-container img {
+        filter: drop-shadow(0 4px 8px rgba(0,0,0,0.6)) brightness(1.1);
+    }
+</style>
+"""
+
+
+@st.cache_resource
+def compiled_css() -> str:
+    """Return CUSTOM_CSS with comments and redundant whitespace removed, built once per process"""
+    css = re.sub(r"/\*.*?\*/", "", CUSTOM_CSS, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{}:;,>])\s*", r"\1", css).strip()
+
+
+st.markdown(compiled_css(), unsafe_allow_html=True)
+
+# Warm the shared database connection pool once per server process
+@st.cache_resource
+def warm_database_pool():
+    return warm_up_pool()
+
+
+warm_database_pool()
+
+
+# Start the background thread that drains queued booking enquiries to Supabase
+@st.cache_resource
+def start_outbox_flusher():
+    return start_flusher() if OUTBOX_ENABLED else None
+
+
+start_outbox_flusher()
+
+
+# Start the single listener that applies enquiry change events to the shared cache
+@st.cache_resource
+def start_change_feed_listener():
+    return start_change_feed() if REALTIME_ENABLED else None
+
+
+start_change_feed_listener()
+
+
+# Export database call and render metrics, plus the shared caches' and pool's counters
+@st.cache_resource
+def start_metrics_endpoint():
+    register_gauges("db_pool", get_pool_stats)
+    register_gauges("enquiry_cache", get_enquiry_cache_stats)
+    register_gauges("asset_cache", get_asset_cache_stats)
+    register_gauges("change_feed", get_change_feed_stats)
+    register_gauges("booking_rate_limit", get_rate_limit_stats)
+    if OUTBOX_ENABLED:
+        register_gauges("outbox", get_outbox_stats)
+    return start_metrics_exporter()
+
+
+start_metrics_endpoint()
+
+# Initialize session state
+if 'logged_in' not in st.session_state:
+    st.session_state.logged_in = False
+if 'page' not in st.session_state:
+    st.session_state.page = 'home'
+
+
+def config_version() -> str:
+    """Return a hash of config.py used to key the precompiled section HTML"""
+    return content_hash(config.__file__)
+
+
+@st.cache_resource
+def build_activities_html(version: str) -> str:
+    """Build the complete activities section once per config.py version"""
+    cards = "".join(
+        f'<div class="activity-card">'
+        f'<h2 style="margin: 0; color: #1b5e20;">{activity["icon"]} {activity["name"]}</h2>'
+        f'<p style="margin-top: 0.5rem; color: #424242; line-height: 1.5;">{activity["description"]}</p>'
+        f'</div>'
+        for activity in ACTIVITIES
+    )
+    return (
+        '<h2 class="section-header">🌟 Our Experiences</h2>'
+        '<p>Immerse yourself in a variety of activities designed for relaxation and adventure</p>'
+        f'<div class="activity-grid">{cards}</div>'
+    )
+
+
+@st.cache_resource
+def build_price_table_html(version: str) -> str:
+    """Build the rates table once per config.py version"""
+    rows = ""
+    for service, price in PRICING.items():
+        price_text = f"${price}" if "Starting" not in service else f"Starting at ${price}"
+        rows += (
+            f'<div class="price-row">'
+            f'<span class="service-name">{service}</span>'
+            f'<span class="price-amount">{price_text}</span>'
+            f'</div>'
+        )
+    return f'<h3>Pachena Resort Rates (Per Person)</h3><div class="price-table">{rows}</div>'
+
+
+@st.cache_resource
+def build_inclusions_html(version: str) -> str:
+    """Build the package inclusions card once per config.py version"""
+    items = "".join(f'<div class="inclusion-item">{inclusion}</div>' for inclusion in PACKAGE_INCLUSIONS)
+    return f"<h3>What's Included</h3><div class=\"inclusion-card\">{items}</div>"
+
+
+HERO_HTML = """
+<div class="hero-section">
+    <h1 style="text-align: center; font-size: 2.8rem; text-shadow: 2px 2px 4px rgba(0,0,0,0.2);">Welcome to Pachena Resort</h1>
+    <h3 style="text-align: center; margin-top: 0.5rem; font-size: 1.5rem;">Your Gateway to Nature & Relaxation</h3>
+    <p style="font-size: 1.15rem; margin-top: 1.5rem; text-align: center; line-height: 1.6;">
+        Escape to the tranquility of Pachena Resort, where comfortable tented accommodation meets 
+        authentic farm experiences. Nestled in nature's embrace, we offer the perfect blend of 
+        adventure, relaxation, and genuine hospitality.
+    </p>
+    <p style="font-size: 1.1rem; text-align: center; margin-top: 1rem; line-height: 1.6;">
+        From guided farm tours and bonfire chats to spa treatments and nature walks, 
+        every moment at Pachena is designed to reconnect you with the beauty of the outdoors.
+    </p>
+</div>
+"""
+
+
+@timed_render
+def render_hero_section():
+    """Render the hero section with resort description and logo"""
+    # Display logo - optimized for 1366x768 landscape SVG
+    logo_html = ""
+    if os.path.exists(LOGO_PATH):
+        # Handle SVG or image files
+        if LOGO_PATH.endswith('.svg'):
+            logo_html = (
+                '<div class="logo-container"><div style="max-width: 900px; width: 100%;">'
+                f'{logo_markup(width=900)}</div></div>'
+            )
+        else:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col2:
+                logo = load_image(LOGO_PATH)
+                st.image(logo, use_container_width=True)
+    
+    # Logo and hero text go out as a single element
+    st.markdown(logo_html + HERO_HTML, unsafe_allow_html=True)
+
+
+@st.fragment
+@timed_render
+def render_gallery_section():
+    """Render photo gallery with captions (reruns on its own when the size toggle changes)"""
+    st.markdown('<h2 class="section-header">📸 Resort Gallery</h2>', unsafe_allow_html=True)
+    st.markdown("Discover the beauty and charm of Pachena Resort through our photo collection")
+    
+    # Thumbnails sized for the grid are served unless full-size photos are requested
+    full_size = st.toggle("Show full-size photos", value=False)
+    
+    # Display images in a grid (4 columns)
+    cols_per_row = 4
+    
+    for i in range(0, len(GALLERY_IMAGES), cols_per_row):
+        cols = st.columns(cols_per_row)
+        for j in range(cols_per_row):
+            idx = i + j
+            if idx < len(GALLERY_IMAGES):
+                img_data = GALLERY_IMAGES[idx]
+                img_file = img_data["file"]
+                caption = img_data["caption"]
+                
+                if os.path.exists(img_file):
+                    with cols[j]:
+                        try:
+                            if full_size:
+                                img = load_image(img_file)
+                            else:
+                                img = gallery_image(img_file, GALLERY_COLUMN_WIDTH)
+                            st.image(img, use_container_width=True)
+                            st.markdown(f'<p class="gallery-caption">{caption}</p>', unsafe_allow_html=True)
+                        except Exception as e:
+                            st.warning(f"Could not load {img_file}")
+
+
+@timed_render
+def render_activities_section():
+    """Render the activities section in a grid layout"""
+    st.markdown(build_activities_html(config_version()), unsafe_allow_html=True)
+
+
+@timed_render
+def render_pricing_section():
+    """Render the pricing section with clear service-price layout"""
+    st.markdown('<h2 class="section-header">💰 Rates & Pricing</h2>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        st.markdown(build_price_table_html(config_version()), unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(build_inclusions_html(config_version()), unsafe_allow_html=True)
+        
+        st.info("💡 **Note:** Child packages apply to children under 12 years old")
+
+
+def client_ip() -> str:
+    """Return the visitor's IP address, or None if Streamlit does not know it"""
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = forwarded_client_ip(st.context.headers.get("X-Forwarded-For", ""))
+        if forwarded:
+            return forwarded
+    return st.context.ip_address
+
+
+@st.fragment
+@timed_render
+def render_booking_form():
+    """Render the booking enquiry form (submitting reruns only this form)"""
+    st.markdown('<h2 class="section-header">📝 Book Your Stay</h2>', unsafe_allow_html=True)
+    st.markdown("Complete the form below and our team will contact you to confirm your booking")
+    
+    # Availability check (changing the date reruns only this form)
+    check_date = st.date_input("Check availability for", min_value=date.today(), key="availability_date")
+    availability = get_date_occupancy(check_date)
+    if availability["remaining"] > 0:
+        st.caption(f"✅ {availability['remaining']} of {DAILY_GUEST_CAPACITY} places available on {check_date:%d %B %Y}")
+    else:
+        st.caption(f"⚠️ {check_date:%d %B %Y} is fully booked")
+    
+    # One idempotency key per submission, replaced once the enquiry is accepted
+    if 'booking_idempotency_key' not in st.session_state:
+        st.session_state.booking_idempotency_key = str(uuid.uuid4())
+    
+    with st.form("booking_form", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            name = st.text_input("Full Name *", placeholder="Enter your full name")
+            phone = st.text_input("Phone Number *", placeholder="+263 775 387 683")
+            booking_date = st.date_input("Preferred Date *", min_value=date.today())
+        
+        with col2:
+            num_adults = st.number_input("Number of Adults *", min_value=0, max_value=20, value=1)
+            num_children = st.number_input("Number of Children (Under 12)", min_value=0, max_value=20, value=0)
+            
+            package_options = list(PRICING.keys())
+            package = st.selectbox("Select Package/Service *", options=package_options)
+        
+        # Additional comments
+        comments = st.text_area("Special Requests or Questions", placeholder="Any dietary requirements, special occasions, or questions?")
+        
+        submitted = st.form_submit_button("Submit Booking Enquiry", use_container_width=True)
+        
+        if submitted:
+            # Validation
+            if not name or not phone:
+                st.error("❌ Please fill in all required fields (Name and Phone)")
+            elif num_adults == 0 and num_children == 0:
+                st.error("❌ Please specify at least one adult or child")
+            else:
+                availability = get_date_occupancy(booking_date)
+                enquiry = build_enquiry_record(
+                    name=name,
+                    phone=phone,
+                    date=str(booking_date),
+                    num_adults=num_adults,
+                    num_children=num_children,
+                    package=package,
+                    idempotency_key=st.session_state.booking_idempotency_key
+                )
+                
+                # Enquiries already sent from this session are not sent again
+                submitted = st.session_state.setdefault('submitted_fingerprints', set())
+                session_id = st.session_state.setdefault('client_session_id', str(uuid.uuid4()))
+                if enquiry["fingerprint"] in submitted:
+                    result = {"success": True, "duplicates": 1}
+                else:
+                    # Throttle per session and per IP before anything reaches the database
+                    limit = check_booking_submission(session_id, client_ip())
+                    if not limit["allowed"]:
+                        result = {"success": False, "rate_limited": limit}
+                    else:
+                        # Journal locally and let the flusher deliver it; insert directly if the journal is unavailable
+                        result = enqueue_enquiry(enquiry) if OUTBOX_ENABLED else {"success": False}
+                        if not result.get("success"):
+                            result = insert_enquiry_records([enquiry])
+                
+                if result.get("success"):
+                    submitted.add(enquiry["fingerprint"])
+                    st.session_state.booking_idempotency_key = str(uuid.uuid4())
+                
+                if result.get("duplicates"):
+                    st.info("✅ We already have your enquiry for this date and package. Our team will contact you shortly.")
+                elif result.get("rate_limited"):
+                    limit = result["rate_limited"]
+                    if limit["reason"] == "debounce":
+                        st.warning("⏳ Your enquiry is being submitted, please wait a moment.")
+                    else:
+                        st.warning(
+                            f"⏳ Too many enquiries have been sent from your connection. "
+                            f"Please try again in {max(int(limit['retry_after'] / 60), 1)} minute(s) "
+                            f"or contact us directly at {CONTACT_PHONE}."
+                        )
+                elif result.get("success"):
+                    st.success("🎉 Thank you for your booking enquiry! Our team will contact you shortly to confirm your reservation.")
+                    st.balloons()
+                    if num_adults + num_children > availability["remaining"]:
+                        st.warning(
+                            f"⚠️ Only {availability['remaining']} places are left on {booking_date:%d %B %Y}. "
+                            "We have recorded your enquiry and will contact you about alternative dates."
+                        )
+                    st.info(f"📧 You can also reach us directly at {CONTACT_EMAIL} or call {CONTACT_PHONE}")
+                else:
+                    st.error(f"❌ Error submitting enquiry: {result.get('error')}")
+
+
+@timed_render
+def render_public_page():
+    """Render the complete public landing page"""
+    render_hero_section()
+    st.divider()
+    render_gallery_section()
+    st.divider()
+    render_activities_section()
+    st.divider()
+    render_pricing_section()
+    st.divider()
+    render_booking_form()
+
+
+@timed_render
+def render_staff_login():
+    """Render the staff login page"""
+    st.header("🔐 Staff Login")
+    
+    with st.form("login_form"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        submit = st.form_submit_button("Login")
+        
+        if submit:
+            if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
+                st.session_state.logged_in = True
+                st.success("Login successful!")
+                st.rerun()
+            else:
+                st.error("Invalid username or password")
+
+
+@timed_render
+def render_enquiry_table(enquiries_df: pd.DataFrame):
+    """Render enquiries with their revenue forecast: the quoted total for each enquiry"""
+    table_df = enquiries_df
+    if not enquiries_df.empty:
+        table_df = enquiries_df.assign(forecast_total=calculate_quotations(enquiries_df)["total"])
+    
+    st.dataframe(table_df, use_container_width=True, hide_index=True,
+                 column_config={
+                     "booking_date": st.column_config.DateColumn("booking_date"),
+                     "forecast_total": st.column_config.NumberColumn("forecast_total", format="$%.2f")
+                 })
+
+
+def browser_filters(status: str, package: str, date_range: tuple) -> dict:
+    """
+    Turn the enquiry browser's filter widget values into fetch_enquiry_page arguments
+    
+    Args:
+        status: Selected status or "All"
+        package: Selected package or "All"
+        date_range: Selected booking dates, empty or (start,) or (start, end)
+    
+    Returns:
+        dict: status, package, date_from and date_to, None where unfiltered
+    """
+    date_from = str(date_range[0]) if len(date_range) > 0 else None
+    date_to = str(date_range[1]) if len(date_range) > 1 else date_from
+    return {
+        "status": None if status == "All" else status,
+        "package": None if package == "All" else package,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+
+
+@timed_render
+def render_enquiry_browser() -> pd.DataFrame:
+    """Render search, filters and the current keyset page of enquiries, returning the enquiries shown"""
+    st.subheader("📋 All Enquiries")
+    
+    search = st.text_input("🔍 Search", placeholder="Name, phone number or words from the notes",
+                           key='search_term').strip()
+    if len(search) >= SEARCH_MIN_LENGTH:
+        results_df = search_enquiries(search)
+        if len(results_df) >= SEARCH_RESULT_LIMIT:
+            st.caption(f"Showing the best {SEARCH_RESULT_LIMIT} matches; refine the search to narrow them down")
+        else:
+            st.caption(f"{len(results_df)} matching enquiries")
+        render_enquiry_table(results_df)
+        return results_df
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        status = st.selectbox("Status", options=["All"] + ENQUIRY_STATUSES, key='filter_status')
+    with col2:
+        package = st.selectbox("Package", options=["All"] + list(PRICING.keys()), key='filter_package')
+    with col3:
+        date_range = st.date_input("Booking Date Range", value=(), key='filter_dates')
+    
+    filters = browser_filters(status, package, date_range)
+    
+    # Start from the first page whenever the filters change
+    if st.session_state.get('browser_filters') != filters:
+        st.session_state.browser_filters = filters
+        st.session_state.page_cursors = [None]
+    
+    cursors = st.session_state.page_cursors
+    page_df, next_cursor = fetch_enquiry_page(cursor=cursors[-1], **filters)
+    render_enquiry_table(page_df)
+    
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun(scope="fragment")
+    with col2:
+        if st.button("Next ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun(scope="fragment")
+    with col3:
+        st.caption(f"Page {len(cursors)}")
+    
+    return page_df
+
+
+@timed_render
+def render_outbox_notice():
+    """Warn admins about booking enquiries the outbox could not deliver"""
+    try:
+        outbox = get_outbox_stats()
+    except Exception as e:
+        st.error(f"Could not read the enquiry outbox: {e}")
+        return
+    
+    if outbox["failed"]:
+        st.error(f"⚠️ Booking enquiries not saved after {OUTBOX_MAX_ATTEMPTS} attempts: {outbox['failed']}. "
+                 f"They are kept in {OUTBOX_PATH} and listed in the server log.")
+    if outbox["pending"]:
+        st.caption(f"Booking enquiries waiting to be saved: {outbox['pending']}")
+
+
+def prefetch_dashboard():
+    """
+    Load the dashboard's independent reads concurrently
+    
+    Warms the shared cache with the summary, occupancy, the current page
+    of the enquiry browser and the selected enquiry's notes in one round
+    of overlapping queries, so the sections below render from the cache.
+    The page is keyed on the current filter widgets and skipped while a
+    search replaces the browser.
+    """
+    reads = [fetch_enquiry_summary_async(), fetch_occupancy_async()]
+    if len(st.session_state.get('search_term', '').strip()) < SEARCH_MIN_LENGTH:
+        filters = browser_filters(st.session_state.get('filter_status', "All"),
+                                  st.session_state.get('filter_package', "All"),
+                                  st.session_state.get('filter_dates', ()))
+        # The browser restarts from the first page when the filters changed since its last run
+        cursor = None
+        if st.session_state.get('browser_filters') == filters:
+            cursor = st.session_state.page_cursors[-1]
+        reads.append(fetch_enquiry_page_async(cursor=cursor, **filters))
+    selected_id = st.session_state.get('selected_enquiry_id')
+    if selected_id:
+        reads.append(fetch_enquiry_notes_async(int(selected_id)))
+    run_concurrently(*reads)
+
+
+@timed_render
+def render_admin_dashboard():
+    """Render the admin dashboard"""
+    st.header("📊 Admin Dashboard")
+    
+    # Logout button
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("🚪 Logout"):
+            st.session_state.logged_in = False
+            st.session_state.profile_reruns = False
+            st.rerun()
+    
+    with col2:
+        if st.button("🔄 Refresh Data"):
+            invalidate_enquiry_cache()
+            st.rerun()
+    
+    with col3:
+        if REALTIME_ENABLED:
+            # A full rerun renders every change so far, including this session's own writes
+            st.session_state.seen_change_version = get_change_version()
+            render_live_updates()
+    
+    st.divider()
+    
+    if OUTBOX_ENABLED:
+        render_outbox_notice()
+    
+    if DB_ASYNC_PREFETCH:
+        prefetch_dashboard()
+    
+    # Fetch summary metrics computed in the database
+    summary = fetch_enquiry_summary()
+    
+    if summary['total_enquiries'] == 0:
+        st.info("No enquiries found in the database.")
+        return
+    
+    # Display summary metrics
+    st.subheader("📈 Summary")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Enquiries", summary['total_enquiries'])
+    
+    with col2:
+        st.metric("Pending", summary['pending'])
+    
+    with col3:
+        st.metric("Total Adults", int(summary['total_adults']))
+    
+    with col4:
+        st.metric("Total Children", int(summary['total_children']))
+    
+    breakdown_columns = {'key': None, 'enquiries': 'Enquiries', 'adults': 'Adults', 'children': 'Children'}
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("**By Status**")
+        by_status = pd.DataFrame(summary['by_status'], columns=list(breakdown_columns))
+        st.dataframe(by_status.rename(columns={**breakdown_columns, 'key': 'Status'}),
+                     use_container_width=True, hide_index=True)
+    
+    with col2:
+        st.markdown("**By Package**")
+        by_package = pd.DataFrame(summary['by_package'], columns=list(breakdown_columns))
+        st.dataframe(by_package.rename(columns={**breakdown_columns, 'key': 'Package'}),
+                     use_container_width=True, hide_index=True)
+    
+    st.divider()
+    
+    render_occupancy_heatmap()
+    
+    st.divider()
+    
+    render_enquiry_workspace()
+
+
+@timed_render
+def render_performance_panel():
+    """Render database call and render timings collected since the server started"""
+    with st.expander("⏱️ Performance"):
+        summary = get_metrics_summary()
+        for title, timings in (("Database calls", summary['db']), ("Renders", summary['render'])):
+            st.markdown(f"**{title}**")
+            timings_df = pd.DataFrame.from_dict(timings, orient='index')
+            if timings_df.empty:
+                st.caption("Nothing recorded yet")
+                continue
+            timings_df['total_ms'] = timings_df['calls'] * timings_df['mean_ms']
+            st.dataframe(timings_df.sort_values('total_ms', ascending=False).round(1),
+                         use_container_width=True)
+        
+        exporter = start_metrics_endpoint()
+        if exporter.get("url"):
+            st.caption(f"Prometheus metrics: {exporter['url']}")
+
+
+@timed_render
+def render_profiler_panel():
+    """Render the rerun profiler switch, the hotspots of a stored rerun and its exports"""
+    with st.expander("🔬 Profiler"):
+        if PROFILING_ENABLED:
+            st.caption("PROFILING_ENABLED is set: every rerun of every session is profiled")
+        else:
+            # Kept outside the widget's state so it survives navigating away from the dashboard
+            st.session_state.profile_reruns = st.toggle(
+                "Profile my reruns", value=st.session_state.get('profile_reruns', False),
+                help="Profiles each following rerun of this session, on any page"
+            )
+        
+        profiles = list_profiles()
+        if not profiles:
+            st.caption("No profiled reruns stored yet")
+            return
+        
+        labels = {
+            f"{profile['created']:%Y-%m-%d %H:%M:%S} · {profile['label']} · {profile['duration_ms']} ms": profile['name']
+            for profile in profiles
+        }
+        name = labels[st.selectbox("Rerun", options=list(labels), key='profile_name')]
+        sort = st.radio("Sort by", options=["cumulative_ms", "own_ms"], horizontal=True, key='profile_sort',
+                        format_func=lambda column: "Cumulative time" if column == "cumulative_ms" else "Own time")
+        hotspots_df = pd.DataFrame(get_hotspots(name, sort))
+        st.dataframe(hotspots_df.round(2), use_container_width=True, hide_index=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("⬇️ Collapsed stacks", data=read_profile(name, "folded"),
+                               file_name=f"{name}.folded", mime="text/plain",
+                               help="Sampled call stacks for flamegraph.pl or speedscope")
+        with col2:
+            st.download_button("⬇️ cProfile stats", data=read_profile(name, "prof"),
+                               file_name=f"{name}.prof", mime="application/octet-stream",
+                               help="pstats file for snakeviz or python -m pstats")
+
+
+@st.fragment(run_every=LIVE_UPDATE_INTERVAL)
+@timed_render
+def render_live_updates():
+    """Rerun the dashboard once other sessions' writes or change feed events changed the cache (checking never queries the database)"""
+    version = get_change_version()
+    if st.session_state.setdefault('seen_change_version', version) != version:
+        st.session_state.seen_change_version = version
+        st.rerun()
+    
+    if get_change_feed_stats()["connected"]:
+        st.caption("🟢 Live: new and updated enquiries appear automatically")
+    else:
+        st.caption("⚪ Live updates reconnecting; use Refresh Data to reload")
+
+
+@timed_render
+def render_occupancy_heatmap():
+    """Render guests booked per day over the coming weeks as a calendar heatmap"""
+    st.subheader("🗓️ Occupancy")
+    
+    occupancy = fetch_occupancy()
+    days = pd.date_range(date.today(), periods=OCCUPANCY_HEATMAP_DAYS, freq="D")
+    booked = [occupancy.get(day, {}) for day in days.strftime("%Y-%m-%d")]
+    calendar = pd.DataFrame({
+        "date": days.strftime("%Y-%m-%d"),
+        "week": (days - pd.to_timedelta(days.weekday, unit="D")).strftime("%Y-%m-%d"),
+        "weekday": days.strftime("%a"),
+        "guests": [day.get("adults", 0) + day.get("children", 0) for day in booked],
+        "enquiries": [day.get("enquiries", 0) for day in booked]
+    })
+    calendar["occupancy"] = calendar["guests"] / DAILY_GUEST_CAPACITY
+    
+    st.vega_lite_chart(calendar, {
+        "mark": {"type": "rect", "stroke": "white"},
+        "encoding": {
+            "x": {"field": "weekday", "type": "ordinal", "title": None,
+                  "sort": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]},
+            "y": {"field": "week", "type": "ordinal", "title": "Week of"},
+            "color": {"field": "occupancy", "type": "quantitative", "title": "Occupancy",
+                      "scale": {"domain": [0, 1], "scheme": "greens"}, "legend": {"format": "%"}},
+            "tooltip": [
+                {"field": "date", "type": "ordinal", "title": "Date"},
+                {"field": "guests", "type": "quantitative", "title": "Guests"},
+                {"field": "enquiries", "type": "quantitative", "title": "Enquiries"},
+                {"field": "occupancy", "type": "quantitative", "title": "Occupancy", "format": ".0%"}
+            ]
+        }
+    }, use_container_width=True)
+    
+    full_days = int((calendar["guests"] >= DAILY_GUEST_CAPACITY).sum())
+    st.caption(f"Capacity {DAILY_GUEST_CAPACITY} guests per day · {full_days} fully booked day(s) in the next {OCCUPANCY_HEATMAP_DAYS} days")
+
+
+@st.fragment
+@timed_render
+def render_enquiry_workspace():
+    """Render the enquiry browser and manage panel, which rerun without the summary above"""
+    # Display one page of enquiries
+    page_df = render_enquiry_browser()
+    
+    st.divider()
+    
+    # Section for adding follow-up notes and generating quotations
+    st.subheader("🔧 Manage Enquiry")
+    
+    if page_df.empty:
+        st.info("No enquiries match the search or selected filters.")
+        return
+    
+    enquiry_ids = page_df['id'].tolist()
+    
+    with st.expander("Bulk update the enquiries shown"):
+        if st.checkbox("All enquiries shown", key='bulk_all'):
+            bulk_ids = enquiry_ids
+        else:
+            bulk_ids = st.multiselect("Enquiry IDs", options=enquiry_ids, key='bulk_ids')
+        col1, col2 = st.columns(2)
+        with col1:
+            bulk_status = st.selectbox("New Status", options=["Keep current"] + ENQUIRY_STATUSES, key='bulk_status')
+        with col2:
+            bulk_note = st.text_input("Append Note", key='bulk_note')
+        
+        if st.button("Apply to Selected", disabled=not bulk_ids):
+            result = bulk_update_enquiries(
+                bulk_ids,
+                status=None if bulk_status == "Keep current" else bulk_status,
+                note=bulk_note.strip() or None
+            )
+            if result.get("success"):
+                st.success(f"Updated {len(result['data'])} enquiries")
+                st.rerun()
+            else:
+                st.error(f"Error: {result.get('error')}")
+    
+    selected_id = st.selectbox("Select Enquiry ID", options=enquiry_ids, key='selected_enquiry_id')
+    
+    if selected_id:
+        selected_enquiry = page_df[page_df['id'] == selected_id].iloc[0]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("**Customer Details:**")
+            st.write(f"Name: {selected_enquiry['name']}")
+            st.write(f"Phone: {selected_enquiry['phone']}")
+            st.write(f"Date: {selected_enquiry['booking_date']:%Y-%m-%d}")
+            st.write(f"Adults: {selected_enquiry['num_adults']}")
+            st.write(f"Children: {selected_enquiry['num_children']}")
+            st.write(f"Package: {selected_enquiry['package']}")
+            
+            # Update status
+            st.markdown("**Update Status:**")
+            new_status = st.selectbox("Change Status", 
+                                     options=ENQUIRY_STATUSES,
+                                     key='status_select')
+            if st.button("Update Status"):
+                result = update_enquiry_status(selected_id, new_status)
+                if result.get("success"):
+                    st.success("Status updated successfully!")
+                    st.rerun()
+                else:
+                    st.error(f"Error: {result.get('error')}")
+        
+        with col2:
+            # Add follow-up notes
+            st.markdown("**Follow-up Notes:**")
+            current_notes = fetch_enquiry_notes(int(selected_id))
+            notes = st.text_area("Add Notes", value=current_notes, height=150)
+            
+            if st.button("Save Notes"):
+                result = update_follow_up_notes(selected_id, notes)
+                if result.get("success"):
+                    st.success("Notes saved successfully!")
+                    st.rerun()
+                else:
+                    st.error(f"Error: {result.get('error')}")
+            
+            # Generate quotation
+            st.markdown("**Generate Quotation:**")
+            if st.button("Calculate Quotation"):
+                quotation = calculate_quotation(
+                    num_adults=int(selected_enquiry['num_adults']),
+                    num_children=int(selected_enquiry['num_children']),
+                    package=selected_enquiry['package']
+                )
+                
+                st.markdown("---")
+                st.markdown("**Quotation Breakdown:**")
+                st.write(f"Adults: {quotation['num_adults']} × ${quotation['adult_price']} = ${quotation['adults_total']}")
+                st.write(f"Children: {quotation['num_children']} × ${quotation['child_price']} = ${quotation['children_total']}")
+                st.write(f"Package: {quotation['package']} = ${quotation['package_price']}")
+                st.write(f"Subtotal: ${quotation['subtotal']:.2f}")
+                st.write(f"Tax ({TAX_RATE:.0%}): ${quotation['tax']:.2f}")
+                st.markdown(f"**Total: ${quotation['total']:.2f}**")
+
+
+@timed_render
+def main():
+    """Main application"""
+    
+    # Sidebar with logo - optimized for landscape SVG
+    if os.path.exists(LOGO_PATH):
+        try:
+            if LOGO_PATH.endswith('.svg'):
+                svg_content = logo_markup(width=300)
+                st.sidebar.markdown(f'''
+                <div style="max-width: 100%; overflow: hidden; margin-bottom: 1rem;">
+                    {svg_content}
+                </div>
+                ''', unsafe_allow_html=True)
+            else:
+                logo = load_image(LOGO_PATH)
+                st.sidebar.image(logo, use_container_width=True)
+        except:
+            st.sidebar.title("Pachena Resort")
+    else:
+        st.sidebar.title("Pachena Resort")
+    
+    if not st.session_state.logged_in:
+        page = st.sidebar.radio("Navigation", ["🏠 Home", "🔐 Staff Login"], label_visibility="collapsed")
+    else:
+        page = st.sidebar.radio("Navigation", ["🏠 Home", "📊 Admin Dashboard"], label_visibility="collapsed")
+    
+    st.sidebar.divider()
+    st.sidebar.markdown("### 📞 Contact Us")
+    st.sidebar.info(f"📧 {CONTACT_EMAIL}\n\n📱 {CONTACT_PHONE}")
+    
+    st.sidebar.divider()
+    st.sidebar.markdown("### 🕒 Operating Hours")
+    st.sidebar.success("**Open Daily**\n\n🌅 8:00 AM - 6:00 PM")
+    
+    # Clean up page names for routing
+    page_clean = page.split(" ", 1)[1] if " " in page else page
+    
+    # Render appropriate page
+    if "Home" in page:
+        render_public_page()
+    elif "Staff Login" in page:
+        render_staff_login()
+    elif "Admin Dashboard" in page:
+        if st.session_state.logged_in:
+            render_admin_dashboard()
+            
+            # Diagnostics, shown even when the dashboard has no enquiries to display
+            st.divider()
+            render_performance_panel()
+            render_profiler_panel()
+        else:
+            st.warning("Please log in to access the admin dashboard")
+            render_staff_login()
+
+
+if __name__ == "__main__":
+    # Profile the whole rerun when profiling is on for the server or this admin's session
+    if PROFILING_ENABLED or st.session_state.get('profile_reruns'):
+        profile_rerun(main)
+    else:
+        main()
@@ -0,0 +1,338 @@
+"""
+Static asset pipeline for the landing page
+
+Builds resized gallery thumbnails and an optimized logo ahead of time and
+keeps decoded images and logo markup in a process-wide memory cache.
+Build the static assets with:
+    python assets.py
+"""
+import base64
+import hashlib
+import html
+import io
+import os
+import re
+import threading
+
+from PIL import Image, ImageOps, features
+
+from cache import SizedLRUCache
+from config import (
+    GALLERY_IMAGES, THUMBNAIL_DIR, THUMBNAIL_WIDTHS, THUMBNAIL_FORMAT,
+    THUMBNAIL_QUALITY, ASSET_CACHE_MAX_BYTES, LOGO_PATH, LOGO_DELIVERY,
+    LOGO_RASTER_WIDTHS, STATIC_DIR, SVG_PRECISION, SVG_TRANSFORM_PRECISION, SVG_EMBEDDED_MAX_PX
+)
+
+try:
+    import cairosvg
+except ImportError:
+    cairosvg = None
+
+# Elements and attributes that do not affect rendering
+_SVG_METADATA = re.compile(
+    r"<\?xml[^>]*\?>|<!DOCTYPE[^>]*>|<!--.*?-->|<metadata\b.*?</metadata>|"
+    r"<title\b.*?</title>|<desc\b.*?</desc>",
+    re.S
+)
+_SVG_EDITOR_ATTRIBUTES = re.compile(r'\s(?:inkscape|sodipodi|sketch):[\w-]+="[^"]*"')
+_SVG_GEOMETRY_ATTRIBUTES = re.compile(
+    r'(\s(?:d|points|transform|viewBox|x|y|x1|y1|x2|y2|cx|cy|r|rx|ry|width|height)=")([^"]*)(")'
+)
+_DECIMAL = re.compile(r"-?\d*\.\d+")
+_PATH_COMMAND = re.compile(r"\s*([MLHVCSQTAZmlhvcsqtaz])\s*")
+_EMBEDDED_RASTER = re.compile(r'data:image/(?:png|jpeg);base64,([A-Za-z0-9+/=\s]+)')
+
+# Decoded images, raw bytes and text assets shared by all sessions
+_asset_cache = SizedLRUCache(ASSET_CACHE_MAX_BYTES)
+
+# Content hashes keyed by (path, mtime, size) so unchanged files are hashed once
+_hashes = {}
+_hash_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    """Return a short SHA-256 digest of a file's content"""
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _hash_lock:
+        if key in _hashes:
+            return _hashes[key]
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    
+    with _hash_lock:
+        _hashes[key] = digest.hexdigest()[:16]
+        return _hashes[key]
+
+
+def _file_version(path: str) -> tuple:
+    """Return the (mtime, size) pair used to detect changed files"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def load_image(path: str) -> Image.Image:
+    """Return the decoded image at path, cached until the file changes"""
+    version = _file_version(path)
+    img = _asset_cache.get(("image", path), version)
+    if img is None:
+        with Image.open(path) as f:
+            img = f.copy()
+        _asset_cache.set(("image", path), img, img.width * img.height * len(img.getbands()), version)
+    return img
+
+
+def load_bytes(path: str) -> bytes:
+    """Return the raw bytes of an already-encoded file, cached until the file changes"""
+    version = _file_version(path)
+    data = _asset_cache.get(("bytes", path), version)
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+        _asset_cache.set(("bytes", path), data, len(data), version)
+    return data
+
+
+def load_text(path: str) -> str:
+    """Return the text content of a file (e.g. SVG markup), cached until the file changes"""
+    version = _file_version(path)
+    text = _asset_cache.get(("text", path), version)
+    if text is None:
+        with open(path, 'r') as f:
+            text = f.read()
+        _asset_cache.set(("text", path), text, len(text.encode()), version)
+    return text
+
+
+def get_asset_cache_stats() -> dict:
+    """Return hit/miss/eviction counters and memory use of the asset cache"""
+    return _asset_cache.stats()
+
+
+def thumbnail_format() -> str:
+    """Return the configured thumbnail format, falling back to JPEG without WebP support"""
+    if THUMBNAIL_FORMAT == "webp" and not features.check("webp"):
+        return "jpeg"
+    return THUMBNAIL_FORMAT
+
+
+def thumbnail_path(source: str, width: int) -> str:
+    """Return the cache path of the thumbnail of source at the given width"""
+    fmt = thumbnail_format()
+    extension = "webp" if fmt == "webp" else "jpg"
+    return os.path.join(THUMBNAIL_DIR, f"{content_hash(source)}-{width}.{extension}")
+
+
+def generate_thumbnail(source: str, width: int) -> str:
+    """
+    Create (if needed) a resized, re-encoded copy of an image
+    
+    Args:
+        source: Path of the original image
+        width: Maximum width in pixels; smaller images are not upscaled
+    
+    Returns:
+        str: Path of the thumbnail file
+    """
+    path = thumbnail_path(source, width)
+    if os.path.exists(path):
+        return path
+    
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img.thumbnail((width, img.height), Image.LANCZOS)
+        
+        # Write to a temporary name first so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if thumbnail_format() == "webp":
+            img.save(tmp_path, "WEBP", quality=THUMBNAIL_QUALITY, method=6)
+        else:
+            img.save(tmp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        os.replace(tmp_path, path)
+    
+    return path
+
+
+def gallery_image(source: str, width: int):
+    """
+    Return the thumbnail for a gallery column of the given width
+    
+    Uses the smallest configured width that covers the column and returns
+    its encoded bytes from the asset cache. Falls back to the decoded
+    original if the thumbnail cannot be produced.
+    """
+    fits = [w for w in sorted(THUMBNAIL_WIDTHS) if w >= width]
+    target = fits[0] if fits else max(THUMBNAIL_WIDTHS)
+    try:
+        path = thumbnail_path(source, target)
+        if not os.path.exists(path):
+            generate_thumbnail(source, target)
+        return load_bytes(path)
+    except Exception as e:
+        print(f"Could not create thumbnail for {source}: {e}")
+        return load_image(source)
+
+
+def _round_decimals(value: str, precision: int) -> str:
+    """Round every decimal number in an attribute value"""
+    def shorten(match):
+        number = f"{float(match.group()):.{precision}f}".rstrip("0").rstrip(".")
+        return "0" if number in ("", "-0") else number
+    return _DECIMAL.sub(shorten, value)
+
+
+def _shrink_raster(match, max_px: int) -> str:
+    """Downscale an embedded base64 raster and re-encode it compactly"""
+    with Image.open(io.BytesIO(base64.b64decode(match.group(1)))) as img:
+        img.load()
+        if max(img.size) > max_px:
+            img.thumbnail((max_px, max_px), Image.LANCZOS)
+        
+        # Opaque colour images compress far better as JPEG; masks and alpha stay lossless PNG
+        buffer = io.BytesIO()
+        if img.mode == "RGB":
+            img.save(buffer, "JPEG", quality=85, optimize=True, progressive=True)
+            mime = "jpeg"
+        else:
+            img.save(buffer, "PNG", optimize=True)
+            mime = "png"
+    
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    if len(encoded) >= len(match.group(1)):
+        return match.group(0)
+    return f"data:image/{mime};base64,{encoded}"
+
+
+def optimize_svg(markup: str, precision: int = SVG_PRECISION,
+                 max_embedded_px: int = SVG_EMBEDDED_MAX_PX,
+                 transform_precision: int = SVG_TRANSFORM_PRECISION) -> str:
+    """
+    Shrink SVG markup without changing how it renders at the displayed sizes
+    
+    Strips the XML prolog, comments, metadata and editor attributes,
+    rounds geometry coordinates and collapses whitespace in path data
+    and between tags. Transforms keep more decimals, since an error in a
+    scale factor grows with every coordinate it scales. Embedded raster images larger than max_embedded_px
+    are downscaled and re-encoded; their display size is unchanged.
+    
+    Args:
+        markup: SVG source
+        precision: Decimal places kept in coordinates
+        max_embedded_px: Longest side for embedded rasters, or 0 to leave them untouched
+        transform_precision: Decimal places kept in transform matrices
+    
+    Returns:
+        str: Optimized SVG markup
+    """
+    if max_embedded_px:
+        markup = _EMBEDDED_RASTER.sub(lambda m: _shrink_raster(m, max_embedded_px), markup)
+    markup = _SVG_METADATA.sub("", markup)
+    markup = _SVG_EDITOR_ATTRIBUTES.sub("", markup)
+    
+    def geometry(match):
+        name, value, quote = match.groups()
+        if name.strip() == "transform=\"":
+            value = _round_decimals(value, max(precision, transform_precision))
+        else:
+            value = _round_decimals(value, precision)
+        if name.strip() == "d=\"":
+            value = _PATH_COMMAND.sub(r"\1", " ".join(value.split()))
+        return f"{name}{value}{quote}"
+    
+    markup = _SVG_GEOMETRY_ATTRIBUTES.sub(geometry, markup)
+    return re.sub(r">\s+<", "><", markup).strip()
+
+
+def load_optimized_svg(path: str) -> str:
+    """Return optimized SVG markup for path, cached until the file changes"""
+    version = _file_version(path)
+    markup = _asset_cache.get(("svg", path), version)
+    if markup is None:
+        markup = optimize_svg(load_text(path))
+        _asset_cache.set(("svg", path), markup, len(markup.encode()), version)
+    return markup
+
+
+def _static_logo_name(extension: str, width: int = None) -> str:
+    """Return the file name of a built logo asset inside STATIC_DIR"""
+    stem = os.path.splitext(os.path.basename(LOGO_PATH))[0]
+    return f"{stem}-{width}.{extension}" if width else f"{stem}.min.{extension}"
+
+
+def build_logo_assets() -> list:
+    """
+    Write the optimized SVG logo, and rasterized copies if cairosvg is installed, to STATIC_DIR
+    
+    Returns:
+        list: Paths of the files written
+    """
+    if not LOGO_PATH.endswith('.svg') or not os.path.exists(LOGO_PATH):
+        return []
+    
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    markup = load_optimized_svg(LOGO_PATH)
+    svg_path = os.path.join(STATIC_DIR, _static_logo_name("svg"))
+    with open(svg_path, 'w') as f:
+        f.write(markup)
+    written = [svg_path]
+    
+    if cairosvg is None:
+        print("cairosvg not installed; skipping logo rasterization")
+        return written
+    
+    for width in LOGO_RASTER_WIDTHS:
+        png_path = os.path.join(STATIC_DIR, _static_logo_name("png", width))
+        cairosvg.svg2png(bytestring=markup.encode(), write_to=png_path, output_width=width)
+        written.append(png_path)
+        if features.check("webp"):
+            webp_path = os.path.join(STATIC_DIR, _static_logo_name("webp", width))
+            with Image.open(png_path) as img:
+                img.save(webp_path, "WEBP", quality=THUMBNAIL_QUALITY, method=6)
+            written.append(webp_path)
+    
+    return written
+
+
+def logo_markup(width: int) -> str:
+    """
+    Return the HTML used to display the SVG logo at the given width
+    
+    In "static" delivery mode the logo is referenced by URL from Streamlit's
+    static file server (so browsers download and cache it once), preferring
+    a rasterized copy at the displayed width when one was built. Otherwise,
+    or if the static files are missing, the optimized markup is inlined.
+    """
+    static_svg = _static_logo_name("svg")
+    if LOGO_DELIVERY == "static" and os.path.exists(os.path.join(STATIC_DIR, static_svg)):
+        fits = [w for w in sorted(LOGO_RASTER_WIDTHS) if w >= width]
+        target = fits[0] if fits else max(LOGO_RASTER_WIDTHS)
+        sources = ""
+        for extension, mime in (("webp", "image/webp"), ("png", "image/png")):
+            name = _static_logo_name(extension, target)
+            if os.path.exists(os.path.join(STATIC_DIR, name)):
+                sources += f'<source srcset="./app/static/{html.escape(name)}" type="{mime}">'
+        img = f'<img src="./app/static/{html.escape(static_svg)}" alt="Pachena Resort" style="width: 100%; height: auto;">'
+        return f"<picture>{sources}{img}</picture>"
+    
+    return load_optimized_svg(LOGO_PATH)
+
+
+def build_thumbnails() -> int:
+    """Pre-generate thumbnails for every gallery image at every configured width"""
+    count = 0
+    for img_data in GALLERY_IMAGES:
+        if os.path.exists(img_data["file"]):
+            for width in THUMBNAIL_WIDTHS:
+                generate_thumbnail(img_data["file"], width)
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    print(f"Generated {build_thumbnails()} thumbnails in {THUMBNAIL_DIR}/")
+    for path in build_logo_assets():
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.0f} KB)")
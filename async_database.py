@@ -0,0 +1,218 @@
+"""
+Asyncio variants of the admin dashboard reads
+
+The coroutines here build the same queries as database.py, share its
+enquiry cache and cache keys, and run on supabase's AsyncClient, so
+independent reads overlap instead of waiting on each other. They all run
+on one background event loop per process; Streamlit scripts are
+synchronous and call them through run_concurrently(). With
+STORAGE_BACKEND="sqlite" each query runs in a worker thread instead.
+"""
+import asyncio
+import importlib.util
+import threading
+
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, STORAGE_BACKEND, DB_POOL_SIZE,
+    DB_KEEPALIVE_EXPIRY, DB_TIMEOUT, DB_HTTP2, ENQUIRY_PAGE_SIZE
+)
+from metrics import instrument_call, record_request, record_response
+from database import (
+    _enquiry_cache, SUMMARY_KEY, OCCUPANCY_KEY, LIST_COLUMNS, get_supabase_client,
+    enquiry_page_query, enquiry_page_result, enquiry_notes_query, occupancy_query,
+    occupancy_by_date, empty_summary
+)
+import pandas as pd
+
+# Event loop every coroutine in this module runs on, served by a daemon thread
+_loop = None
+_loop_lock = threading.Lock()
+
+# AsyncClient bound to _loop, created by the first query
+_async_client = None
+_async_client_lock = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-database", daemon=True).start()
+    return _loop
+
+
+async def _record_http_request(request: httpx.Request):
+    """httpx request hook counting requests for the database call metrics"""
+    record_request()
+
+
+async def _record_http_response(response: httpx.Response):
+    """httpx response hook adding the response size and status to the database call metrics"""
+    await response.aread()
+    record_response(response.status_code, len(response.content))
+
+
+def _build_async_http_client() -> httpx.AsyncClient:
+    """Create the keep-alive HTTP client used for async PostgREST calls"""
+    return httpx.AsyncClient(
+        event_hooks={"request": [_record_http_request], "response": [_record_http_response]},
+        http2=DB_HTTP2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=DB_POOL_SIZE,
+            max_keepalive_connections=DB_POOL_SIZE,
+            keepalive_expiry=DB_KEEPALIVE_EXPIRY
+        ),
+        timeout=DB_TIMEOUT,
+        follow_redirects=True
+    )
+
+
+async def get_async_client() -> AsyncClient:
+    """
+    Return the shared async database client, creating it on first use
+
+    With STORAGE_BACKEND="sqlite" this is the sync SQLiteClient; run its
+    queries with _execute(), which moves them off the event loop.
+    """
+    global _async_client, _async_client_lock
+    if STORAGE_BACKEND == "sqlite":
+        return get_supabase_client()
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("Supabase credentials not configured. Please set SUPABASE_URL and SUPABASE_KEY in .env file")
+
+    if _async_client_lock is None:
+        _async_client_lock = asyncio.Lock()
+    async with _async_client_lock:
+        if _async_client is None:
+            options = AsyncClientOptions(postgrest_client_timeout=DB_TIMEOUT)
+            # Newer supabase releases accept a preconfigured httpx client
+            if "httpx_client" in getattr(AsyncClientOptions, "__dataclass_fields__", {}):
+                options.httpx_client = _build_async_http_client()
+            _async_client = await acreate_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+    return _async_client
+
+
+async def _execute(query):
+    """Execute a query built on get_async_client()'s client and return the response"""
+    if STORAGE_BACKEND == "sqlite":
+        return await asyncio.to_thread(query.execute)
+    return await query.execute()
+
+
+@instrument_call
+async def fetch_enquiry_summary_async() -> dict:
+    """
+    Async variant of database.fetch_enquiry_summary
+
+    Returns:
+        dict: Dashboard summary metrics
+    """
+    try:
+        summary = _enquiry_cache.get(SUMMARY_KEY)
+        if summary is None:
+            supabase = await get_async_client()
+            summary = (await _execute(supabase.rpc("enquiry_summary"))).data
+            _enquiry_cache.set(SUMMARY_KEY, summary)
+        return summary
+
+    except Exception as e:
+        print(f"Error fetching enquiry summary: {e}")
+        return empty_summary()
+
+
+@instrument_call
+async def fetch_occupancy_async() -> dict:
+    """
+    Async variant of database.fetch_occupancy
+
+    Returns:
+        dict: {enquiries, adults, children} by booking date ('YYYY-MM-DD')
+    """
+    try:
+        occupancy = _enquiry_cache.get(OCCUPANCY_KEY)
+        if occupancy is None:
+            supabase = await get_async_client()
+            response = await _execute(occupancy_query(supabase))
+            occupancy = occupancy_by_date(response.data or [])
+            _enquiry_cache.set(OCCUPANCY_KEY, occupancy)
+        return occupancy
+
+    except Exception as e:
+        print(f"Error fetching occupancy: {e}")
+        return {}
+
+
+@instrument_call
+async def fetch_enquiry_page_async(cursor: tuple = None, page_size: int = ENQUIRY_PAGE_SIZE,
+                                   status: str = None, package: str = None,
+                                   date_from: str = None, date_to: str = None,
+                                   columns: list = LIST_COLUMNS) -> tuple:
+    """
+    Async variant of database.fetch_enquiry_page
+
+    Returns:
+        tuple: (DataFrame of the page, cursor for the next page or None)
+    """
+    try:
+        supabase = await get_async_client()
+        query, key = enquiry_page_query(supabase, cursor, page_size, status,
+                                        package, date_from, date_to, columns)
+        rows = _enquiry_cache.get(key)
+        if rows is None:
+            rows = (await _execute(query)).data or []
+            _enquiry_cache.set(key, rows)
+
+        return enquiry_page_result(rows, page_size)
+
+    except Exception as e:
+        print(f"Error fetching enquiry page: {e}")
+        return pd.DataFrame(), None
+
+
+@instrument_call
+async def fetch_enquiry_notes_async(enquiry_id: int) -> str:
+    """
+    Async variant of database.fetch_enquiry_notes
+
+    Returns:
+        str: Follow-up notes, or an empty string if none or on error
+    """
+    key = ("enquiries", "notes", enquiry_id)
+    try:
+        notes = _enquiry_cache.get(key)
+        if notes is None:
+            supabase = await get_async_client()
+            response = await _execute(enquiry_notes_query(supabase, enquiry_id))
+            notes = (response.data[0].get("follow_up_notes") if response.data else None) or ""
+            _enquiry_cache.set(key, notes)
+        return notes
+
+    except Exception as e:
+        print(f"Error fetching notes for enquiry {enquiry_id}: {e}")
+        return ""
+
+
+async def _gather(coroutines):
+    """Await coroutines concurrently and return their results in order"""
+    return await asyncio.gather(*coroutines)
+
+
+def run_concurrently(*coroutines) -> list:
+    """
+    Run coroutines together on the background event loop and wait for all of them
+
+    Safe to call from Streamlit scripts and other threads without a
+    running event loop of their own.
+
+    Args:
+        coroutines: Coroutines from this module
+
+    Returns:
+        list: Their results, in the order given
+    """
+    return asyncio.run_coroutine_threadsafe(_gather(coroutines), _get_loop()).result()
@@ -0,0 +1,292 @@
+"""
+Offline benchmarks for the enquiry data paths
+
+Run with: python benchmarks.py
+"""
+import http.server
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import PRICING, ENQUIRY_STATUSES, STORAGE_BACKEND, SQLITE_PATH
+import database
+import async_database
+from database import (
+    LIST_COLUMNS, enquiries_to_dataframe, insert_enquiry, insert_enquiries_bulk,
+    calculate_quotation, calculate_quotations, fetch_enquiry_page, fetch_enquiry_summary,
+    fetch_enquiry_notes, fetch_occupancy, search_enquiries, invalidate_enquiry_cache
+)
+from async_database import (
+    run_concurrently, fetch_enquiry_summary_async, fetch_occupancy_async,
+    fetch_enquiry_page_async, fetch_enquiry_notes_async
+)
+
+
+def make_enquiry_rows(count: int, seed: int = 42) -> list:
+    """Generate synthetic enquiry rows shaped like Supabase responses"""
+    rng = random.Random(seed)
+    packages = list(PRICING.keys())
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        rows.append({
+            "id": i + 1,
+            "name": f"Guest {i}",
+            "phone": f"+263 77{rng.randrange(10**7):07d}",
+            "booking_date": str(date(2026, 1, 1) + timedelta(days=rng.randrange(365))),
+            "num_adults": rng.randint(1, 8),
+            "num_children": rng.randint(0, 6),
+            "package": rng.choice(packages),
+            "status": rng.choice(ENQUIRY_STATUSES),
+            "follow_up_notes": "Called guest, awaiting deposit. " * rng.randint(0, 6),
+            "created_at": created.isoformat() + "+00:00",
+            "updated_at": created.isoformat() + "+00:00",
+        })
+    return rows
+
+
+class _StubPostgrestHandler(http.server.BaseHTTPRequestHandler):
+    """Minimal PostgREST stand-in that echoes inserted rows, and answers reads with no rows, after a simulated network delay"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.005
+    next_id = 1
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        rows = body if isinstance(body, list) else [body]
+        for row in rows:
+            row["id"] = _StubPostgrestHandler.next_id
+            _StubPostgrestHandler.next_id += 1
+        time.sleep(self.latency)
+        
+        payload = json.dumps(rows).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def do_GET(self):
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+    
+    def log_message(self, *args):
+        pass
+
+
+def bench_bulk_insert(count: int = 10_000, latency: float = 0.005):
+    """Compare per-row insert_enquiry against insert_enquiries_bulk on a stub server with fixed latency"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubPostgrestHandler)
+    _StubPostgrestHandler.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Point the shared client at the stub server
+    database.SUPABASE_URL = f"http://127.0.0.1:{server.server_port}"
+    database.SUPABASE_KEY = "benchmark-key"
+    database._client = None
+    
+    enquiries = make_enquiry_rows(count)
+    try:
+        start = time.perf_counter()
+        for enquiry in enquiries:
+            insert_enquiry(enquiry["name"], enquiry["phone"], enquiry["booking_date"],
+                           enquiry["num_adults"], enquiry["num_children"], enquiry["package"])
+        per_row = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        result = insert_enquiries_bulk(enquiries)
+        bulk = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        database._client = None
+    
+    print(f"Inserting {count:,} enquiries ({latency * 1000:.0f} ms simulated round trip)")
+    print(f"  per-row insert_enquiry:  {per_row:8.2f} s")
+    print(f"  insert_enquiries_bulk:   {bulk:8.2f} s  ({result['inserted']:,} inserted)")
+    print(f"  speed-up: {per_row / bulk:.0f}x")
+
+
+def _render_timing_script():
+    """AppTest script timing either the whole landing page or the booking form fragment alone"""
+    import time
+    import streamlit as st
+    import app
+    
+    start = time.perf_counter()
+    if st.session_state.get("bench_mode") == "fragment":
+        app.render_booking_form()
+    else:
+        app.render_public_page()
+    st.session_state.bench_seconds = time.perf_counter() - start
+
+
+def bench_interaction_rerun(runs: int = 20):
+    """Compare server time per booking-form interaction: whole-page rerun vs fragment rerun"""
+    from streamlit.testing.v1 import AppTest
+    
+    timings = {}
+    for mode in ("full", "fragment"):
+        samples = []
+        for _ in range(runs):
+            at = AppTest.from_function(_render_timing_script, default_timeout=120)
+            at.session_state["bench_mode"] = mode
+            at.run()
+            samples.append(at.session_state["bench_seconds"])
+        samples.sort()
+        timings[mode] = samples[len(samples) // 2]
+    
+    print(f"Server time per booking-form interaction (median of {runs})")
+    print(f"  whole landing page rerun: {timings['full'] * 1000:8.1f} ms")
+    print(f"  booking form fragment:    {timings['fragment'] * 1000:8.1f} ms")
+    print(f"  reduction: {100 * (1 - timings['fragment'] / timings['full']):.0f}%")
+
+
+def bench_dataframe_memory(count: int = 100_000):
+    """Compare DataFrame memory for select("*") with default dtypes vs projected, typed columns"""
+    rows = make_enquiry_rows(count)
+    
+    start = time.perf_counter()
+    before = pd.DataFrame(rows)
+    before_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    after = enquiries_to_dataframe(rows, LIST_COLUMNS)
+    after_time = time.perf_counter() - start
+    
+    before_mb = before.memory_usage(deep=True).sum() / 1024 ** 2
+    after_mb = after.memory_usage(deep=True).sum() / 1024 ** 2
+    print(f"DataFrame memory for {count:,} enquiries")
+    print(f"  select(*), default dtypes:   {before_mb:8.1f} MB  (built in {before_time:.2f}s)")
+    print(f"  list columns, compact dtypes: {after_mb:8.1f} MB  (built in {after_time:.2f}s)")
+    print(f"  reduction: {100 * (1 - after_mb / before_mb):.0f}%")
+
+
+def bench_quotations(count: int = 1_000_000, scalar_sample: int = 100_000):
+    """Compare calculate_quotation in a Python loop with calculate_quotations over a DataFrame"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        "num_adults": rng.integers(1, 9, count).astype("int16"),
+        "num_children": rng.integers(0, 7, count).astype("int16"),
+        "package": pd.Categorical(rng.choice(list(PRICING.keys()) + ["Legacy Package"], count)),
+    })
+    
+    sample = df.head(scalar_sample)
+    start = time.perf_counter()
+    scalar_totals = [
+        calculate_quotation(int(adults), int(children), package)["total"]
+        for adults, children, package in zip(sample["num_adults"], sample["num_children"], sample["package"])
+    ]
+    scalar = (time.perf_counter() - start) * count / scalar_sample
+    
+    start = time.perf_counter()
+    quotes = calculate_quotations(df)
+    vectorized = time.perf_counter() - start
+    
+    assert np.allclose(quotes["total"].to_numpy()[:scalar_sample], scalar_totals)
+    print(f"Quoting {count:,} enquiries")
+    print(f"  calculate_quotation loop:  {scalar:8.2f} s  (extrapolated from {scalar_sample:,} rows)")
+    print(f"  calculate_quotations:      {vectorized:8.2f} s")
+    print(f"  speed-up: {scalar / vectorized:.0f}x")
+
+
+def bench_local_backend(count: int = 50_000, runs: int = 20):
+    """Time the admin dashboard reads on an in-memory SQLite backend, with the enquiry cache cleared each run"""
+    database.STORAGE_BACKEND = "sqlite"
+    database.SQLITE_PATH = ":memory:"
+    database._client = None
+    
+    reads = {
+        "fetch_enquiry_page": fetch_enquiry_page,
+        "fetch_enquiry_summary": fetch_enquiry_summary,
+        "fetch_occupancy": fetch_occupancy,
+        "search_enquiries": lambda: search_enquiries("Guest 4242"),
+    }
+    try:
+        start = time.perf_counter()
+        result = insert_enquiries_bulk(make_enquiry_rows(count))
+        load = time.perf_counter() - start
+        
+        timings = {}
+        for name, read in reads.items():
+            samples = []
+            for _ in range(runs):
+                invalidate_enquiry_cache()
+                start = time.perf_counter()
+                read()
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            timings[name] = samples[len(samples) // 2]
+    finally:
+        database.STORAGE_BACKEND = STORAGE_BACKEND
+        database.SQLITE_PATH = SQLITE_PATH
+        database._client = None
+    
+    print(f"Dashboard reads on the local SQLite backend ({result['inserted']:,} enquiries loaded in {load:.2f}s, median of {runs})")
+    for name, seconds in timings.items():
+        print(f"  {name + ':':24} {seconds * 1000:8.2f} ms")
+
+
+def bench_dashboard_reads(latency: float = 0.05, runs: int = 10):
+    """Compare loading the dashboard's reads one after another against run_concurrently, with the cache cleared each run"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubPostgrestHandler)
+    _StubPostgrestHandler.latency = latency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    
+    # Point both the sync and the async client at the stub server
+    for module in (database, async_database):
+        module.SUPABASE_URL = f"http://127.0.0.1:{server.server_port}"
+        module.SUPABASE_KEY = "benchmark-key"
+    database._client = None
+    async_database._async_client = None
+    
+    def sequential():
+        fetch_enquiry_summary()
+        fetch_occupancy()
+        fetch_enquiry_page()
+        fetch_enquiry_notes(1)
+    
+    def concurrent():
+        run_concurrently(fetch_enquiry_summary_async(), fetch_occupancy_async(),
+                         fetch_enquiry_page_async(), fetch_enquiry_notes_async(1))
+    
+    timings = {}
+    try:
+        for name, load in (("sequential", sequential), ("run_concurrently", concurrent)):
+            samples = []
+            for _ in range(runs + 1):
+                invalidate_enquiry_cache()
+                start = time.perf_counter()
+                load()
+                samples.append(time.perf_counter() - start)
+            # The first run opens the connections
+            samples = sorted(samples[1:])
+            timings[name] = samples[len(samples) // 2]
+    finally:
+        server.shutdown()
+        database._client = None
+        async_database._async_client = None
+    
+    print(f"Loading the dashboard's 4 reads ({latency * 1000:.0f} ms simulated round trip, median of {runs})")
+    for name, seconds in timings.items():
+        print(f"  {name + ':':20} {seconds * 1000:8.1f} ms")
+    print(f"  speed-up: {timings['sequential'] / timings['run_concurrently']:.1f}x")
+
+
+if __name__ == "__main__":
+    bench_dataframe_memory()
+    bench_interaction_rerun()
+    bench_bulk_insert()
+    bench_quotations()
+    bench_local_backend()
+    bench_dashboard_reads()
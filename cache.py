@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        """
+        Args:
+            ttl: Seconds an entry stays valid after it was stored
+            max_entries: Maximum number of entries before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def patch(self, func, keys=None):
+        """
+        Replace cached values in place without resetting their expiry
+        
+        Args:
+            func: Callable receiving (key, value) and returning the new value
+            keys: Optional iterable restricting which keys are patched
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if keys is not None and key not in keys:
+                    continue
+                expires_at, value = self._entries[key]
+                self._entries[key] = (expires_at, func(key, value))
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only those whose key matches predicate"""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def items(self) -> list:
+        """Return (key, value) pairs of the unexpired entries without counting hits or refreshing recency"""
+        with self._lock:
+            now = time.monotonic()
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at >= now]
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters plus the current size"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+
+class SizedLRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values in bytes"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Total size budget; least recently used entries are evicted beyond it
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key, version=None):
+        """Return the value cached for key, or None if missing or stored under another version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._size -= entry[2]
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def set(self, key, value, size: int, version=None):
+        """Store value with its size in bytes, evicting least recently used entries to fit"""
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        """Return hit, miss and eviction counters plus current entry count and bytes"""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "bytes": self._size}
@@ -0,0 +1,145 @@
+"""
+Realtime change feed for the enquiries table
+
+A single background listener per server process receives insert, update
+and delete events on enquiries and applies them to the shared enquiry
+cache, so every logged-in dashboard sees new and changed bookings on its
+next rerun without refetching the table. Events come from Supabase
+Realtime, or from the SQLite backend's own writes when STORAGE_BACKEND
+is "sqlite".
+"""
+import asyncio
+import queue
+import threading
+import time
+
+from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+from config import SUPABASE_URL, SUPABASE_KEY, STORAGE_BACKEND, REALTIME_RECONNECT_DELAY
+from database import apply_change_event, get_cache_version, get_supabase_client, invalidate_enquiry_cache
+
+_listener = None
+_listener_lock = threading.Lock()
+
+# Events published by the SQLite backend, drained by the local listener
+_local_events = queue.Queue()
+
+# Events applied and listener status
+_state = {"events": 0, "connected": False, "last_event_at": None, "error": None}
+_state_lock = threading.Lock()
+
+
+def publish_change(event_type: str, record: dict = None, old_record: dict = None):
+    """
+    Apply one change event to the cached enquiry reads
+
+    Both listeners deliver events through here; call it directly to
+    simulate a Realtime event. The change version advances when the
+    event changes the cache; echoes of this process's own writes, which
+    bumped it when they were applied, leave it unchanged.
+
+    Args:
+        event_type: "INSERT", "UPDATE" or "DELETE"
+        record: Row after the change
+        old_record: Row before the change (at least its id for deletes)
+    """
+    apply_change_event(event_type, record, old_record)
+    with _state_lock:
+        _state["events"] += 1
+        _state["last_event_at"] = time.time()
+
+
+def _set_connected(connected: bool, error: str = None):
+    """Record whether the listener is currently receiving events"""
+    with _state_lock:
+        _state["connected"] = connected
+        _state["error"] = error
+
+
+def _on_postgres_change(payload: dict):
+    """Realtime callback: unpack a postgres_changes payload"""
+    data = payload["data"]
+    try:
+        publish_change(data["type"], data.get("record"), data.get("old_record"))
+    except Exception as e:
+        print(f"Error applying enquiry change: {e}")
+
+
+def _on_subscribe(state, error=None):
+    """Realtime subscription callback; events may have been missed before (re)joining, so resync"""
+    if state == RealtimeSubscribeStates.SUBSCRIBED:
+        invalidate_enquiry_cache()
+        _set_connected(True)
+    else:
+        _set_connected(False, str(error or state))
+
+
+async def _listen_supabase():
+    """Subscribe to postgres_changes on public.enquiries and stay connected"""
+    client = AsyncRealtimeClient(f"{SUPABASE_URL.rstrip('/')}/realtime/v1", token=SUPABASE_KEY)
+    await client.connect()
+    channel = client.channel("enquiries-changes")
+    channel.on_postgres_changes("*", schema="public", table="enquiries", callback=_on_postgres_change)
+    await channel.subscribe(_on_subscribe)
+
+    # The client reconnects and rejoins by itself until it gives up
+    while client.is_connected:
+        await asyncio.sleep(REALTIME_RECONNECT_DELAY)
+
+
+def _run_supabase_listener():
+    """Listener thread: keep a Realtime subscription open, starting over after a pause if it drops"""
+    while True:
+        try:
+            asyncio.run(_listen_supabase())
+            _set_connected(False, "connection closed")
+        except Exception as e:
+            _set_connected(False, str(e))
+            print(f"Enquiry change feed disconnected: {e}")
+        time.sleep(REALTIME_RECONNECT_DELAY)
+
+
+def _run_local_listener():
+    """Listener thread: apply the changes published by the SQLite backend"""
+    _set_connected(True)
+    while True:
+        table, event_type, record, old_record = _local_events.get()
+        if table != "enquiries":
+            continue
+        try:
+            publish_change(event_type, record, old_record)
+        except Exception as e:
+            print(f"Error applying enquiry change: {e}")
+
+
+def start_change_feed() -> threading.Thread:
+    """Start the change feed listener once per process and return its thread, or None without Supabase credentials"""
+    global _listener
+    if STORAGE_BACKEND != "sqlite" and (not SUPABASE_URL or not SUPABASE_KEY):
+        _set_connected(False, "Supabase credentials not configured")
+        return None
+    with _listener_lock:
+        if _listener is None:
+            if STORAGE_BACKEND == "sqlite":
+                get_supabase_client().subscribe(lambda *event: _local_events.put(event))
+        if _listener is None or not _listener.is_alive():
+            target = _run_local_listener if STORAGE_BACKEND == "sqlite" else _run_supabase_listener
+            _listener = threading.Thread(target=target, name="enquiry-change-feed", daemon=True)
+            _listener.start()
+    return _listener
+
+
+def get_change_version() -> int:
+    """Return a counter that increases whenever the cached enquiry reads change, by a feed event or a local write"""
+    return get_cache_version()
+
+
+def get_change_feed_stats() -> dict:
+    """
+    Return the change feed status
+
+    Returns:
+        dict: version, events applied, connected flag, last_event_at (epoch seconds) and last error
+    """
+    with _state_lock:
+        return {"version": get_cache_version(), **_state}
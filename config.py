@@ -1,95 +1,192 @@
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Supabase Configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# Admin Credentials
-ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
-ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
-
-# Contact Information
-CONTACT_EMAIL = "pachenaresort@gmail.com"
-CONTACT_PHONE = "+263 775 387 683 / 0786 714 774"
-LOGO_PATH = "LOGO2.svg"
-
-# Pricing Configuration
-PRICING = {
-    "Adult Package": 30,
-    "Child Package (Under 12)": 15,
-    "Wellness Day (Spa & Massage)": 25,
-    "Individual Activities": 5,
-    "Braai Package (Starting)": 5,
-    "Own Cooler Box Fee": 10
-}
-
-# Package Inclusions
-PACKAGE_INCLUSIONS = [
-    "Comfortable Tented Accommodation",
-    "Bed & Breakfast (Morning meal included)",
-    "Guided Farm Tour",
-    "Classic Farm Games",
-    "Bonfire Chats",
-    "Scenic Nature Walks"
-]
-
-# Gallery Images with Descriptions
-GALLERY_IMAGES = [
-    {"file": "1.jpg", "caption": "Scenic Farm Landscape"},
-    {"file": "2.jpg", "caption": "Peaceful Natural Surroundings"},
-    {"file": "4.jpg", "caption": "Outdoor Relaxation Area"},
-    {"file": "18.jpg", "caption": "Comfortable Tented Accommodation"},
-    {"file": "19.jpg", "caption": "Farm Tour Experience"},
-    {"file": "21.jpeg", "caption": "Nature Walking Trails"},
-    {"file": "28.jpg", "caption": "Resort Grounds & Gardens"},
-    {"file": "29.jpg", "caption": "Outdoor Dining Area"},
-    {"file": "34.jpg", "caption": "Cozy Accommodation Interior"},
-    {"file": "42.jpg", "caption": "Bonfire & Social Spaces"},
-    {"file": "86.jpeg", "caption": "Spa & Wellness Facilities"},
-    {"file": "87.jpeg", "caption": "Farm Animals & Activities"},
-    {"file": "88.jpeg", "caption": "Tranquil Resort Views"},
-    {"file": "89.jpeg", "caption": "Recreation & Games Area"},
-    {"file": "90.jpeg", "caption": "Outdoor Adventure Spaces"},
-    {"file": "91.jpeg", "caption": "Scenic Nature Spots"},
-    {"file": "92.jpeg", "caption": "Braai & BBQ Facilities"},
-    {"file": "NEW 81.jpeg", "caption": "Resort Amenities"},
-    {"file": "NEW 86.jpg", "caption": "Beautiful Resort Setting"}
-]
-
-# Activities
-ACTIVITIES = [
-    {
-        "name": "Guided Farm Tour",
-        "icon": "🚜",
-        "description": "Explore our beautiful farm and learn about sustainable farming practices"
-    },
-    {
-        "name": "Scenic Nature Walks",
-        "icon": "🥾",
-        "description": "Walk through picturesque trails and enjoy the natural beauty"
-    },
-    {
-        "name": "Bonfire Chats",
-        "icon": "🔥",
-        "description": "Share stories around a cozy bonfire under the stars"
-    },
-    {
-        "name": "Classic Farm Games",
-        "icon": "🎯",
-        "description": "Enjoy traditional games and family-friendly activities"
-    },
-    {
-        "name": "Spa & Wellness",
-        "icon": "💆",
-        "description": "Relax with professional spa treatments and massages"
-    },
-    {
-        "name": "Braai Experience",
-        "icon": "🍖",
-        "description": "Authentic braai packages for the perfect outdoor cooking experience"
-    }
-]
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Supabase Configuration
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Storage Backend ("supabase", or "sqlite" for a local database; SQLITE_PATH=":memory:" keeps it in memory)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "pachena.db")
+
+# Database Connection Pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "60"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "10"))
+DB_HTTP2 = os.getenv("DB_HTTP2", "true").lower() == "true"
+
+# Concurrent Dashboard Reads (issue the admin dashboard's independent queries together on an asyncio loop)
+DB_ASYNC_PREFETCH = os.getenv("DB_ASYNC_PREFETCH", "true").lower() == "true"
+
+# Enquiry Cache
+ENQUIRY_CACHE_TTL = float(os.getenv("ENQUIRY_CACHE_TTL", "300"))
+ENQUIRY_CACHE_MAX_ENTRIES = int(os.getenv("ENQUIRY_CACHE_MAX_ENTRIES", "64"))
+
+# Realtime Change Feed (pushes enquiry changes into the shared cache; dashboards check for them every LIVE_UPDATE_INTERVAL seconds)
+REALTIME_ENABLED = os.getenv("REALTIME_ENABLED", "true").lower() == "true"
+REALTIME_RECONNECT_DELAY = float(os.getenv("REALTIME_RECONNECT_DELAY", "5"))
+LIVE_UPDATE_INTERVAL = float(os.getenv("LIVE_UPDATE_INTERVAL", "5"))
+
+# Metrics (Prometheus text format on METRICS_PORT, 0 to disable the endpoint; METRICS_FILE is rewritten every METRICS_FILE_INTERVAL seconds when set)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_FILE_INTERVAL = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+METRICS_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Profiling (PROFILING_ENABLED profiles every rerun; admins can also profile their own session from the dashboard)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_RUNS = int(os.getenv("PROFILE_MAX_RUNS", "50"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+
+# Booking Enquiry Outbox (local write-behind journal drained to Supabase)
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", "outbox.db")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_FLUSH_INTERVAL = float(os.getenv("OUTBOX_FLUSH_INTERVAL", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "20"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "300"))
+
+# Booking Form Rate Limits (token buckets: burst size and sustained submissions per hour)
+BOOKING_SESSION_BURST = int(os.getenv("BOOKING_SESSION_BURST", "3"))
+BOOKING_SESSION_PER_HOUR = float(os.getenv("BOOKING_SESSION_PER_HOUR", "10"))
+BOOKING_IP_BURST = int(os.getenv("BOOKING_IP_BURST", "10"))
+BOOKING_IP_PER_HOUR = float(os.getenv("BOOKING_IP_PER_HOUR", "60"))
+BOOKING_DEBOUNCE_SECONDS = float(os.getenv("BOOKING_DEBOUNCE_SECONDS", "3"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"  # Use X-Forwarded-For for the client IP
+RATE_LIMIT_PROXY_HOPS = int(os.getenv("RATE_LIMIT_PROXY_HOPS", "1"))  # Trusted proxies that append to X-Forwarded-For
+
+# Duplicate Detection (country code used to canonicalize local phone numbers such as 0775...)
+PHONE_COUNTRY_CODE = os.getenv("PHONE_COUNTRY_CODE", "263")
+
+# Bulk Enquiry Import
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+
+# Admin Dashboard
+ENQUIRY_PAGE_SIZE = int(os.getenv("ENQUIRY_PAGE_SIZE", "25"))
+ENQUIRY_STATUSES = ["pending", "confirmed", "completed", "cancelled"]
+
+# Occupancy (guests per day the resort can host, and how many upcoming days the heatmap shows)
+DAILY_GUEST_CAPACITY = int(os.getenv("DAILY_GUEST_CAPACITY", "60"))
+OCCUPANCY_HEATMAP_DAYS = int(os.getenv("OCCUPANCY_HEATMAP_DAYS", "84"))
+
+# Enquiry Search (shortest search term and most rows returned per search)
+SEARCH_MIN_LENGTH = int(os.getenv("SEARCH_MIN_LENGTH", "3"))  # Trigram indexes only help from 3 characters
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "20"))
+
+# Admin Credentials
+ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
+
+# Contact Information
+CONTACT_EMAIL = "pachenaresort@gmail.com"
+CONTACT_PHONE = "+263 775 387 683 / 0786 714 774"
+LOGO_PATH = "LOGO2.svg"
+
+# Logo Delivery ("inline" embeds optimized SVG markup, "static" references files served from STATIC_DIR)
+LOGO_DELIVERY = os.getenv("LOGO_DELIVERY", "inline")
+STATIC_DIR = "static"
+LOGO_RASTER_WIDTHS = [300, 900]  # Sidebar and hero display widths, in pixels
+SVG_PRECISION = int(os.getenv("SVG_PRECISION", "2"))
+SVG_TRANSFORM_PRECISION = int(os.getenv("SVG_TRANSFORM_PRECISION", "5"))  # Scale factors multiply every coordinate they apply to
+SVG_EMBEDDED_MAX_PX = int(os.getenv("SVG_EMBEDDED_MAX_PX", "1000"))  # Largest side of rasters embedded in the logo
+
+# Pricing Configuration
+PRICING = {
+    "Adult Package": 30,
+    "Child Package (Under 12)": 15,
+    "Wellness Day (Spa & Massage)": 25,
+    "Individual Activities": 5,
+    "Braai Package (Starting)": 5,
+    "Own Cooler Box Fee": 10
+}
+
+# Quotation Rates (PRICING keys used for per-person rates, and the tax applied to every quote)
+ADULT_PRICE_KEY = "Adult Package"
+CHILD_PRICE_KEY = "Child Package (Under 12)"
+TAX_RATE = 0.12
+
+# Package Inclusions
+PACKAGE_INCLUSIONS = [
+    "Comfortable Tented Accommodation",
+    "Bed & Breakfast (Morning meal included)",
+    "Guided Farm Tour",
+    "Classic Farm Games",
+    "Bonfire Chats",
+    "Scenic Nature Walks"
+]
+
+# Gallery Images with Descriptions
+GALLERY_IMAGES = [
+    {"file": "1.jpg", "caption": "Scenic Farm Landscape"},
+    {"file": "2.jpg", "caption": "Peaceful Natural Surroundings"},
+    {"file": "4.jpg", "caption": "Outdoor Relaxation Area"},
+    {"file": "18.jpg", "caption": "Comfortable Tented Accommodation"},
+    {"file": "19.jpg", "caption": "Farm Tour Experience"},
+    {"file": "21.jpeg", "caption": "Nature Walking Trails"},
+    {"file": "28.jpg", "caption": "Resort Grounds & Gardens"},
+    {"file": "29.jpg", "caption": "Outdoor Dining Area"},
+    {"file": "34.jpg", "caption": "Cozy Accommodation Interior"},
+    {"file": "42.jpg", "caption": "Bonfire & Social Spaces"},
+    {"file": "86.jpeg", "caption": "Spa & Wellness Facilities"},
+    {"file": "87.jpeg", "caption": "Farm Animals & Activities"},
+    {"file": "88.jpeg", "caption": "Tranquil Resort Views"},
+    {"file": "89.jpeg", "caption": "Recreation & Games Area"},
+    {"file": "90.jpeg", "caption": "Outdoor Adventure Spaces"},
+    {"file": "91.jpeg", "caption": "Scenic Nature Spots"},
+    {"file": "92.jpeg", "caption": "Braai & BBQ Facilities"},
+    {"file": "NEW 81.jpeg", "caption": "Resort Amenities"},
+    {"file": "NEW 86.jpg", "caption": "Beautiful Resort Setting"}
+]
+
+# Gallery Thumbnails
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", ".thumbnails")
+THUMBNAIL_WIDTHS = [320, 640, 1280]
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "webp")  # "webp" or "jpeg" (progressive)
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+GALLERY_COLUMN_WIDTH = 480  # Rendered width of a gallery column on a wide layout, in pixels
+
+# In-memory cache for decoded images and logo markup
+ASSET_CACHE_MAX_BYTES = int(os.getenv("ASSET_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+# Activities
+ACTIVITIES = [
+    {
+        "name": "Guided Farm Tour",
+        "icon": "🚜",
+        "description": "Explore our beautiful farm and learn about sustainable farming practices"
+    },
+    {
+        "name": "Scenic Nature Walks",
+        "icon": "🥾",
+        "description": "Walk through picturesque trails and enjoy the natural beauty"
+    },
+    {
+        "name": "Bonfire Chats",
+        "icon": "🔥",
+        "description": "Share stories around a cozy bonfire under the stars"
+    },
+    {
+        "name": "Classic Farm Games",
+        "icon": "🎯",
+        "description": "Enjoy traditional games and family-friendly activities"
+    },
+    {
+        "name": "Spa & Wellness",
+        "icon": "💆",
+        "description": "Relax with professional spa treatments and massages"
+    },
+    {
+        "name": "Braai Experience",
+        "icon": "🍖",
+        "description": "Authentic braai packages for the perfect outdoor cooking experience"
+    }
+]
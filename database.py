@@ -1,163 +1,1181 @@
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
-from datetime import datetime
-import pandas as pd
-
-# Initialize Supabase client
-def get_supabase_client() -> Client:
-    """Create and return a Supabase client"""
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError("Supabase credentials not configured. Please set SUPABASE_URL and SUPABASE_KEY in .env file")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
-
-
-def insert_enquiry(name: str, phone: str, date: str, num_adults: int, 
-                   num_children: int, package: str) -> dict:
-    """
-    Insert a new enquiry into the Supabase 'enquiries' table
-    
-    Args:
-        name: Customer name
-        phone: Contact phone number
-        date: Booking date
-        num_adults: Number of adults
-        num_children: Number of children
-        package: Selected package name
-    
-    Returns:
-        dict: Response from Supabase insertion
-    """
-    try:
-        supabase = get_supabase_client()
-        
-        enquiry_data = {
-            "name": name,
-            "phone": phone,
-            "booking_date": date,
-            "num_adults": num_adults,
-            "num_children": num_children,
-            "package": package,
-            "created_at": datetime.now().isoformat(),
-            "status": "pending",
-            "follow_up_notes": ""
-        }
-        
-        response = supabase.table("enquiries").insert(enquiry_data).execute()
-        return {"success": True, "data": response.data}
-    
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def fetch_all_enquiries() -> pd.DataFrame:
-    """
-    Fetch all enquiries from Supabase and return as a Pandas DataFrame
-    
-    Returns:
-        pd.DataFrame: DataFrame containing all enquiries
-    """
-    try:
-        supabase = get_supabase_client()
-        response = supabase.table("enquiries").select("*").order("created_at", desc=True).execute()
-        
-        if response.data:
-            return pd.DataFrame(response.data)
-        else:
-            return pd.DataFrame()
-    
-    except Exception as e:
-        print(f"Error fetching enquiries: {e}")
-        return pd.DataFrame()
-
-
-def update_follow_up_notes(enquiry_id: int, notes: str) -> dict:
-    """
-    Update follow-up notes for a specific enquiry
-    
-    Args:
-        enquiry_id: ID of the enquiry to update
-        notes: Follow-up notes to add
-    
-    Returns:
-        dict: Response from Supabase update
-    """
-    try:
-        supabase = get_supabase_client()
-        
-        response = supabase.table("enquiries").update({
-            "follow_up_notes": notes,
-            "updated_at": datetime.now().isoformat()
-        }).eq("id", enquiry_id).execute()
-        
-        return {"success": True, "data": response.data}
-    
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def update_enquiry_status(enquiry_id: int, status: str) -> dict:
-    """
-    Update the status of a specific enquiry
-    
-    Args:
-        enquiry_id: ID of the enquiry to update
-        status: New status (e.g., 'pending', 'confirmed', 'completed')
-    
-    Returns:
-        dict: Response from Supabase update
-    """
-    try:
-        supabase = get_supabase_client()
-        
-        response = supabase.table("enquiries").update({
-            "status": status,
-            "updated_at": datetime.now().isoformat()
-        }).eq("id", enquiry_id).execute()
-        
-        return {"success": True, "data": response.data}
-    
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def calculate_quotation(num_adults: int, num_children: int, package: str) -> dict:
-    """
-    Calculate quotation based on pricing
-    
-    Args:
-        num_adults: Number of adults
-        num_children: Number of children
-        package: Package name
-    
-    Returns:
-        dict: Quotation details with breakdown
-    """
-    from config import PRICING
-    
-    adult_price = PRICING["Adult"]
-    child_price = PRICING["Child"]
-    
-    # Base calculation
-    adults_total = num_adults * adult_price
-    children_total = num_children * child_price
-    
-    # Package pricing
-    package_price = PRICING.get(package, 0)
-    
-    subtotal = adults_total + children_total + package_price
-    tax = subtotal * 0.12  # 12% tax
-    total = subtotal + tax
-    
-    return {
-        "num_adults": num_adults,
-        "num_children": num_children,
-        "adult_price": adult_price,
-        "child_price": child_price,
-        "adults_total": adults_total,
-        "children_total": children_total,
-        "package": package,
-        "package_price": package_price,
-        "subtotal": subtotal,
-        "tax": tax,
-        "total": total
-    }
+from supabase import create_client, Client, ClientOptions
+from config import (
+    SUPABASE_URL, SUPABASE_KEY, STORAGE_BACKEND, SQLITE_PATH, DB_POOL_SIZE, DB_KEEPALIVE_EXPIRY,
+    DB_TIMEOUT, DB_HTTP2, ENQUIRY_CACHE_TTL, ENQUIRY_CACHE_MAX_ENTRIES,
+    ENQUIRY_PAGE_SIZE, BULK_INSERT_CHUNK_SIZE, PRICING, ADULT_PRICE_KEY,
+    CHILD_PRICE_KEY, TAX_RATE, DAILY_GUEST_CAPACITY, SEARCH_MIN_LENGTH,
+    SEARCH_RESULT_LIMIT, PHONE_COUNTRY_CODE
+)
+from cache import TTLCache
+from metrics import instrument_call, record_request, record_response
+from sqlite_backend import SQLiteClient
+from datetime import datetime, date
+import hashlib
+import importlib.util
+import re
+import threading
+import httpx
+import pandas as pd
+
+# Process-wide database client (Supabase, or SQLite for STORAGE_BACKEND="sqlite") shared by every session and rerun
+_client = None
+_client_lock = threading.Lock()
+
+# Pool counters: client hits/misses plus HTTP requests and new connections
+_pool_stats = {"hits": 0, "misses": 0, "requests": 0, "connections_opened": 0}
+_stats_lock = threading.Lock()
+
+# Enquiry reads shared across sessions, kept current by the write functions
+_enquiry_cache = TTLCache(ENQUIRY_CACHE_TTL, ENQUIRY_CACHE_MAX_ENTRIES)
+
+# Bumped whenever a write, change event or invalidation changes the cached reads
+_cache_version = 0
+_cache_version_lock = threading.Lock()
+SUMMARY_KEY = ("enquiries", "summary")
+OCCUPANCY_KEY = ("occupancy", "upcoming")
+
+# Enquiry columns the occupancy rollup depends on
+OCCUPANCY_COLUMNS = ("status", "booking_date", "num_adults", "num_children")
+
+# Enquiry columns the search_enquiries() function matches against
+SEARCH_COLUMNS = ("name", "phone", "follow_up_notes")
+
+# Ids of enquiries already added to the cache, so an insert seen twice
+# (written here, then echoed by the change feed) is only counted once
+_applied_inserts = TTLCache(ENQUIRY_CACHE_TTL, 10_000)
+
+# Columns shown in enquiry lists; follow_up_notes is loaded per enquiry on demand
+LIST_COLUMNS = ['id', 'name', 'phone', 'booking_date', 'num_adults',
+                'num_children', 'package', 'status', 'created_at']
+
+# Compact dtypes for enquiry DataFrames
+ENQUIRY_DTYPES = {
+    "id": "int64",
+    "num_adults": "int16",
+    "num_children": "int16",
+    "status": "category",
+    "package": "category",
+}
+ENQUIRY_DATE_COLUMNS = ["booking_date"]
+ENQUIRY_TIMESTAMP_COLUMNS = ["created_at", "updated_at"]
+
+
+def _count(key: str, amount: int = 1):
+    """Increment a pool counter"""
+    with _stats_lock:
+        _pool_stats[key] += amount
+
+
+def _trace_connection(event_name: str, info: dict):
+    """httpcore trace callback counting new connections and sent requests"""
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+    elif event_name.endswith("send_request_headers.started"):
+        _count("requests")
+
+
+def _attach_trace(request: httpx.Request):
+    """httpx request hook that enables connection tracing"""
+    request.extensions["trace"] = _trace_connection
+
+
+def _record_http_request(request: httpx.Request):
+    """httpx request hook counting requests for the database call metrics"""
+    record_request()
+
+
+def _record_http_response(response: httpx.Response):
+    """httpx response hook adding the response size and status to the database call metrics"""
+    response.read()
+    record_response(response.status_code, len(response.content))
+
+
+def _build_http_client() -> httpx.Client:
+    """Create the keep-alive HTTP client used for PostgREST calls"""
+    return httpx.Client(
+        http2=DB_HTTP2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=DB_POOL_SIZE,
+            max_keepalive_connections=DB_POOL_SIZE,
+            keepalive_expiry=DB_KEEPALIVE_EXPIRY
+        ),
+        timeout=DB_TIMEOUT,
+        follow_redirects=True
+    )
+
+
+def _instrument(client: Client):
+    """Make sure the PostgREST session reports to the pool counters"""
+    if isinstance(client, SQLiteClient):
+        return
+    hooks = client.postgrest.session.event_hooks
+    if _attach_trace not in hooks["request"]:
+        hooks["request"] += [_attach_trace, _record_http_request]
+        hooks["response"].append(_record_http_response)
+
+
+def _create_client() -> Client:
+    """Create the client for the configured STORAGE_BACKEND"""
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteClient(SQLITE_PATH)
+    
+    options = ClientOptions(postgrest_client_timeout=DB_TIMEOUT)
+    # Newer supabase releases accept a preconfigured httpx client
+    if "httpx_client" in getattr(ClientOptions, "__dataclass_fields__", {}):
+        options.httpx_client = _build_http_client()
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+
+
+# Initialize Supabase client
+def get_supabase_client() -> Client:
+    """
+    Return the shared database client, creating it on first use
+    
+    With STORAGE_BACKEND="sqlite" this is a SQLiteClient, which offers the
+    same query-builder API on a local database.
+    """
+    global _client
+    if STORAGE_BACKEND != "sqlite" and (not SUPABASE_URL or not SUPABASE_KEY):
+        raise ValueError("Supabase credentials not configured. Please set SUPABASE_URL and SUPABASE_KEY in .env file")
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+                _count("misses")
+                _instrument(_client)
+                return _client
+
+    _count("hits")
+    _instrument(_client)
+    return _client
+
+
+@instrument_call
+def warm_up_pool() -> dict:
+    """
+    Create the shared client and open a connection ahead of the first request
+    
+    Returns:
+        dict: Success flag, or the error if Supabase could not be reached
+    """
+    try:
+        supabase = get_supabase_client()
+        supabase.table("enquiries").select("id").limit(1).execute()
+        return {"success": True}
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def get_pool_stats() -> dict:
+    """
+    Return connection pool counters
+    
+    Returns:
+        dict: Client hits/misses, requests sent, connections opened and reused
+    """
+    with _stats_lock:
+        stats = dict(_pool_stats)
+    stats["connections_reused"] = max(stats["requests"] - stats["connections_opened"], 0)
+    return stats
+
+
+def get_enquiry_cache_stats() -> dict:
+    """Return hit/miss/eviction counters for the shared enquiry cache"""
+    return _enquiry_cache.stats()
+
+
+def invalidate_enquiry_cache():
+    """Drop all cached enquiry reads so the next fetch goes to Supabase"""
+    _enquiry_cache.invalidate()
+    _bump_cache_version()
+
+
+def _bump_cache_version():
+    """Record that the cached enquiry reads changed"""
+    global _cache_version
+    with _cache_version_lock:
+        _cache_version += 1
+
+
+def get_cache_version() -> int:
+    """
+    Return a counter that increases whenever the cached enquiry reads change
+    
+    Writes from any session or process bump it, whether applied here
+    directly or delivered by the change feed; reads that only fill the
+    cache do not.
+    """
+    with _cache_version_lock:
+        return _cache_version
+
+
+def _invalidate_derived_reads():
+    """Drop cached pages, searches and the summary, keeping occupancy"""
+    _enquiry_cache.invalidate(lambda key: key != OCCUPANCY_KEY)
+
+
+def _add_occupancy(occupancy: dict, rows: list) -> dict:
+    """Return a copy of the cached occupancy with the guests of new enquiries added"""
+    patched = dict(occupancy)
+    for row in rows:
+        if (row.get("status") or "pending") == "cancelled" or not row.get("booking_date"):
+            continue
+        day = str(row["booking_date"])[:10]
+        current = patched.get(day, {"enquiries": 0, "adults": 0, "children": 0})
+        patched[day] = {
+            "enquiries": current["enquiries"] + 1,
+            "adults": current["adults"] + (row.get("num_adults") or 0),
+            "children": current["children"] + (row.get("num_children") or 0)
+        }
+    return patched
+
+
+def _cache_insert(rows: list):
+    """Write-through: add newly inserted rows to the cached occupancy and drop the reads they change"""
+    rows = [row for row in rows if _applied_inserts.get(row.get("id")) is None]
+    if not rows:
+        return
+    for row in rows:
+        _applied_inserts.set(row.get("id"), True)
+    
+    _enquiry_cache.patch(lambda key, cached: _add_occupancy(cached, rows), keys=[OCCUPANCY_KEY])
+    _invalidate_derived_reads()
+    _bump_cache_version()
+
+
+def apply_change_event(event_type: str, record: dict = None, old_record: dict = None):
+    """
+    Apply an insert, update or delete event from the change feed to the cached reads
+    
+    Events for writes made by this process leave the cache, and so the
+    cache version, unchanged: inserts already cached are skipped and
+    updates find their values already applied.
+    
+    Args:
+        event_type: "INSERT", "UPDATE" or "DELETE"
+        record: Row after the change (inserts and updates)
+        old_record: Row before the change; for deletes at least its id
+    """
+    if event_type == "INSERT" and record:
+        _cache_insert([record])
+    elif event_type == "UPDATE" and record:
+        _apply_to_cache({record["id"]: record})
+    elif event_type == "DELETE" and old_record:
+        # Any cached read may include the deleted enquiry
+        invalidate_enquiry_cache()
+
+
+def _move_summary_status(summary: dict, moves: list) -> dict:
+    """Return a copy of the cached summary with enquiries moved between status buckets"""
+    by_status = {bucket["key"]: dict(bucket) for bucket in summary["by_status"]}
+    pending = summary["pending"]
+    for old_status, new_status, adults, children in moves:
+        if old_status == new_status:
+            continue
+        for status, sign in ((old_status, -1), (new_status, 1)):
+            bucket = by_status.setdefault(status, {"key": status, "enquiries": 0, "adults": 0, "children": 0})
+            bucket["enquiries"] += sign
+            bucket["adults"] += sign * adults
+            bucket["children"] += sign * children
+            if status == "pending":
+                pending += sign
+    return {
+        **summary,
+        "pending": pending,
+        "by_status": sorted(
+            (bucket for bucket in by_status.values() if bucket["enquiries"] > 0),
+            key=lambda bucket: bucket["enquiries"], reverse=True
+        )
+    }
+
+
+def _filter_columns(key) -> set:
+    """Return the enquiry columns that decide which rows a cached page or search holds"""
+    if key[1] == "page":
+        _, _, _, _, status, package, date_from, date_to, _ = key
+        return (
+            ({"status"} if status else set())
+            | ({"package"} if package else set())
+            | ({"booking_date"} if date_from or date_to else set())
+        )
+    if key[1] == "search":
+        return set(SEARCH_COLUMNS)
+    return set()
+
+
+def _apply_to_cache(changes: dict) -> dict:
+    """
+    Patch every cached read that contains the changed enquiries
+    
+    Changes are compared with the cached rows first. Filtered pages and
+    searches are dropped when a change touches a column they filter on,
+    since enquiries may have left or joined them; other pages and
+    searches get the changed columns (each keeps only the columns it
+    selected). Cached notes are replaced and status moves are applied to
+    the cached summary. The cached occupancy is dropped only when a
+    status, booking date or guest count actually changes (cancelling
+    releases places). Changes to enquiries that are not cached cannot be
+    compared and count as changing every column they carry.
+    
+    Args:
+        changes: Column values by enquiry id
+    
+    Returns:
+        dict: Previous values of the cached reads that changed or were
+              dropped, by key, for _restore_cache; empty if the cache
+              already held the changes
+    """
+    cached = dict(_enquiry_cache.items())
+    
+    # Last cached values of the changed enquiries, merged across reads
+    known = {}
+    for key, value in cached.items():
+        if key[1] in ("page", "search"):
+            for row in value:
+                if row.get("id") in changes:
+                    known.setdefault(row["id"], {}).update(row)
+        elif key[1] == "notes" and key[2] in changes:
+            known.setdefault(key[2], {})["follow_up_notes"] = value
+    
+    changed_columns = {
+        enquiry_id: {
+            column for column, value in change.items()
+            if column not in known.get(enquiry_id, {}) or known[enquiry_id][column] != value
+        }
+        for enquiry_id, change in changes.items()
+    }
+    touched = set().union(*changed_columns.values())
+    
+    previous = {}
+    
+    def drop(keys):
+        for key in keys:
+            previous[key] = cached[key]
+        _enquiry_cache.invalidate(lambda key: key in keys)
+    
+    drop({key for key in cached if _filter_columns(key) & touched})
+    
+    def patch_rows(rows):
+        patched = []
+        for row in rows:
+            change = changes.get(row.get("id"), {})
+            updates = {column: value for column, value in change.items() if column in row and row[column] != value}
+            patched.append({**row, **updates} if updates else row)
+        return patched
+    
+    def patch(key, value):
+        if key[1] == "notes":
+            patched = changes.get(key[2], {}).get("follow_up_notes", value)
+        elif key[1] in ("page", "search"):
+            patched = patch_rows(value)
+        else:
+            return value
+        if patched != value:
+            previous[key] = value
+        return patched
+    
+    _enquiry_cache.patch(patch)
+    
+    # Status moves need the old status and guest counts, which only the cached rows know
+    status_ids = [enquiry_id for enquiry_id, change in changes.items() if "status" in change]
+    moves = [
+        (known[enquiry_id]["status"], changes[enquiry_id]["status"],
+         known[enquiry_id]["num_adults"], known[enquiry_id]["num_children"])
+        for enquiry_id in status_ids
+        if {"status", "num_adults", "num_children"} <= known.get(enquiry_id, {}).keys()
+    ]
+    if SUMMARY_KEY in cached and len(moves) < len(status_ids):
+        drop({SUMMARY_KEY})
+    elif any(old_status != new_status for old_status, new_status, _, _ in moves):
+        def patch_summary(key, summary):
+            previous[key] = summary
+            return _move_summary_status(summary, moves)
+        _enquiry_cache.patch(patch_summary, keys=[SUMMARY_KEY])
+    
+    if OCCUPANCY_KEY in cached and touched & set(OCCUPANCY_COLUMNS):
+        drop({OCCUPANCY_KEY})
+    
+    if previous:
+        _bump_cache_version()
+    return previous
+
+
+def _restore_cache(previous: dict):
+    """Roll cached reads back to the values captured by _apply_to_cache, re-adding the ones it dropped"""
+    restored = set()
+    
+    def restore(key, value):
+        restored.add(key)
+        return previous[key]
+    
+    _enquiry_cache.patch(restore, keys=previous)
+    for key in previous.keys() - restored:
+        _enquiry_cache.set(key, previous[key])
+    if previous:
+        _bump_cache_version()
+
+
+def _optimistic_update(changes: dict, send) -> dict:
+    """
+    Apply changes to the cached reads, then send the write to Supabase
+    
+    The rows Supabase returns are applied on top, so the next rerun reads
+    the updated enquiries from memory instead of refetching them. If the
+    request fails or updates nothing, the cache is rolled back.
+    
+    Args:
+        changes: Column values expected after the write, by enquiry id
+        send: Callable executing the Supabase request
+    
+    Returns:
+        dict: Response from Supabase update
+    """
+    previous = _apply_to_cache(changes)
+    try:
+        response = send()
+    except Exception as e:
+        _restore_cache(previous)
+        return {"success": False, "error": str(e)}
+    
+    if not response.data:
+        _restore_cache(previous)
+        return {"success": False, "error": "No enquiry was updated"}
+    
+    _apply_to_cache({row["id"]: row for row in response.data})
+    return {"success": True, "data": response.data}
+
+
+def canonical_phone(phone: str) -> str:
+    """
+    Reduce a phone number to its digits, including the country code
+    
+    "+263 775 387 683", "00263 775387683" and "0775 387 683" all become
+    "263775387683"; local numbers get PHONE_COUNTRY_CODE.
+    
+    Args:
+        phone: Phone number as entered
+    
+    Returns:
+        str: Canonical digits
+    """
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0"):
+        return PHONE_COUNTRY_CODE + digits[1:]
+    return digits
+
+
+def enquiry_fingerprint(phone: str, booking_date: str, package: str) -> str:
+    """
+    Hash the fields that identify a duplicate enquiry
+    
+    Args:
+        phone: Contact phone number
+        booking_date: Booking date
+        package: Selected package name
+    
+    Returns:
+        str: MD5 hex digest of canonical phone, date and package
+    """
+    key = f"{canonical_phone(phone)}|{str(booking_date)[:10]}|{(package or '').strip().lower()}"
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def build_enquiry_record(name: str, phone: str, date: str, num_adults: int,
+                         num_children: int, package: str, idempotency_key: str = None) -> dict:
+    """
+    Build the row inserted into the 'enquiries' table for a new enquiry
+    
+    Args:
+        name: Customer name
+        phone: Contact phone number
+        date: Booking date
+        num_adults: Number of adults
+        num_children: Number of children
+        package: Selected package name
+        idempotency_key: Optional UUID identifying the form submission
+    
+    Returns:
+        dict: Enquiry row stamped with the submission time and its duplicate fingerprint
+    """
+    return {
+        "name": name,
+        "phone": phone,
+        "booking_date": date,
+        "num_adults": num_adults,
+        "num_children": num_children,
+        "package": package,
+        "created_at": datetime.now().isoformat(),
+        "status": "pending",
+        "follow_up_notes": "",
+        "fingerprint": enquiry_fingerprint(phone, date, package),
+        "idempotency_key": idempotency_key
+    }
+
+
+@instrument_call
+def insert_enquiry(name: str, phone: str, date: str, num_adults: int, 
+                   num_children: int, package: str, idempotency_key: str = None) -> dict:
+    """
+    Insert a new enquiry into the Supabase 'enquiries' table
+    
+    Args:
+        name: Customer name
+        phone: Contact phone number
+        date: Booking date
+        num_adults: Number of adults
+        num_children: Number of children
+        package: Selected package name
+        idempotency_key: Optional UUID identifying the form submission
+    
+    Returns:
+        dict: Response from Supabase insertion; "duplicates" is 1 if the
+              enquiry was already recorded
+    """
+    try:
+        enquiry_data = build_enquiry_record(name, phone, date, num_adults, num_children, package, idempotency_key)
+        return insert_enquiry_records([enquiry_data])
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@instrument_call
+def insert_enquiry_records(records: list) -> dict:
+    """
+    Insert prepared enquiry rows in a single multi-row request
+    
+    Rows whose fingerprint matches an enquiry that is not cancelled (same
+    canonical phone, booking date and package) are skipped by the unique
+    index on active_fingerprint through ON CONFLICT DO NOTHING, so
+    resubmissions are dropped. A single row whose idempotency key was
+    already used counts as a duplicate of the enquiry stored under that
+    key, which is returned as "existing"; in a batch it fails the batch,
+    so callers retry its rows one by one.
+    
+    Args:
+        records: Rows built with build_enquiry_record
+    
+    Returns:
+        dict: Response from Supabase insertion with the inserted rows and
+              the number of "duplicates" skipped; failures caused by the
+              network rather than the data are flagged "retryable"
+    """
+    try:
+        # Records journaled before fingerprints existed get one here
+        records = [
+            record if record.get("fingerprint") else {
+                **record,
+                "fingerprint": enquiry_fingerprint(record["phone"], record["booking_date"], record["package"])
+            }
+            for record in records
+        ]
+        supabase = get_supabase_client()
+        response = supabase.table("enquiries").upsert(
+            records, on_conflict="active_fingerprint", ignore_duplicates=True, default_to_null=False
+        ).execute()
+        rows = response.data or []
+        _cache_insert(rows)
+        return {"success": True, "data": rows, "duplicates": len(records) - len(rows)}
+    
+    except httpx.TransportError as e:
+        return {"success": False, "error": str(e), "retryable": True}
+    
+    except Exception as e:
+        if len(records) == 1 and _is_idempotency_conflict(e):
+            return _existing_submission(records[0])
+        return {"success": False, "error": str(e)}
+
+
+def _is_idempotency_conflict(error: Exception) -> bool:
+    """Whether an insert failed on the unique index of idempotency_key (Postgres or SQLite)"""
+    message = str(error)
+    return "idempotency_key" in message and (
+        getattr(error, "code", None) == "23505" or "UNIQUE constraint failed" in message
+    )
+
+
+def _existing_submission(record: dict) -> dict:
+    """Return the enquiry already stored under a record's idempotency key as a duplicate insert result"""
+    try:
+        supabase = get_supabase_client()
+        response = supabase.table("enquiries").select("*").eq("idempotency_key", record["idempotency_key"]).execute()
+        return {
+            "success": True,
+            "data": [],
+            "duplicates": 1,
+            "existing": response.data[0] if response.data else None
+        }
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def validate_enquiry(enquiry: dict) -> list:
+    """
+    Check an enquiry against the 'enquiries' table constraints
+    
+    Args:
+        enquiry: Enquiry fields (name, phone, booking_date, num_adults, num_children, package)
+    
+    Returns:
+        list: Error messages; empty if the enquiry is valid
+    """
+    errors = []
+    for field, max_length in (("name", 255), ("phone", 50), ("package", 100)):
+        value = enquiry.get(field)
+        if not isinstance(value, str) or not value.strip():
+            errors.append(f"{field} is required")
+        elif len(value) > max_length:
+            errors.append(f"{field} is longer than {max_length} characters")
+    
+    try:
+        datetime.strptime(str(enquiry.get("booking_date")), "%Y-%m-%d")
+    except ValueError:
+        errors.append("booking_date must be a date in YYYY-MM-DD format")
+    
+    counts = []
+    for field in ("num_adults", "num_children"):
+        value = enquiry.get(field, 0)
+        if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+            errors.append(f"{field} must be a non-negative integer")
+        else:
+            counts.append(value)
+    if len(counts) == 2 and sum(counts) == 0:
+        errors.append("at least one adult or child is required")
+    
+    return errors
+
+
+@instrument_call
+def insert_enquiries_bulk(enquiries: list, chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> dict:
+    """
+    Validate and insert many enquiries using multi-row inserts
+    
+    Valid enquiries are sent chunk_size at a time, one request per chunk.
+    If Supabase rejects a chunk, its rows are retried one by one so a
+    single bad row only fails itself. Duplicates of existing enquiries,
+    or of earlier rows in the import, fail with "duplicate": True.
+    
+    Args:
+        enquiries: Dicts with name, phone, booking_date, num_adults, num_children
+                   and package; created_at, status and follow_up_notes are optional
+        chunk_size: Rows per insert request
+    
+    Returns:
+        dict: Overall success, inserted/failed/duplicate counts and per-row
+              results ({"index", "success", "id" or "error"}) in input order
+    """
+    results = [None] * len(enquiries)
+    pending = []
+    
+    for index, enquiry in enumerate(enquiries):
+        errors = validate_enquiry(enquiry)
+        if errors:
+            results[index] = {"index": index, "success": False, "error": "; ".join(errors)}
+            continue
+        record = build_enquiry_record(
+            enquiry["name"], enquiry["phone"], str(enquiry["booking_date"]),
+            enquiry.get("num_adults", 0), enquiry.get("num_children", 0), enquiry["package"]
+        )
+        for field in ("created_at", "status", "follow_up_notes"):
+            if enquiry.get(field) is not None:
+                record[field] = enquiry[field]
+        pending.append((index, record))
+    
+    def send(chunk):
+        result = insert_enquiry_records([record for _, record in chunk])
+        if result.get("success"):
+            # Skipped duplicates are missing from the response, so match rows by fingerprint
+            inserted = {row.get("fingerprint"): row for row in result["data"]}
+            for index, record in chunk:
+                row = inserted.pop(record["fingerprint"], None)
+                if row is None:
+                    results[index] = {"index": index, "success": False,
+                                      "error": "duplicate enquiry", "duplicate": True}
+                else:
+                    results[index] = {"index": index, "success": True, "id": row.get("id")}
+        elif len(chunk) > 1 and not result.get("retryable"):
+            for item in chunk:
+                send([item])
+        else:
+            for index, _ in chunk:
+                results[index] = {"index": index, "success": False, "error": result.get("error")}
+    
+    for start in range(0, len(pending), chunk_size):
+        send(pending[start:start + chunk_size])
+    
+    inserted = sum(1 for result in results if result["success"])
+    return {
+        "success": inserted == len(enquiries),
+        "inserted": inserted,
+        "failed": len(enquiries) - inserted,
+        "duplicates": sum(1 for result in results if result.get("duplicate")),
+        "results": results
+    }
+
+
+def enquiries_to_dataframe(rows: list, columns: list = None) -> pd.DataFrame:
+    """
+    Build an enquiry DataFrame with compact dtypes
+    
+    Status and package become categoricals, guest counts small ints and
+    dates datetime64. Columns missing from the rows are skipped.
+    
+    Args:
+        rows: Enquiry rows as returned by Supabase
+        columns: Optional subset of columns to keep
+    
+    Returns:
+        pd.DataFrame: Typed enquiry DataFrame
+    """
+    df = pd.DataFrame(rows, columns=columns)
+    if df.empty:
+        return df
+    
+    for column, dtype in ENQUIRY_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    for column in ENQUIRY_DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+    for column in ENQUIRY_TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors="coerce", utc=True, format="ISO8601")
+    return df
+
+
+def enquiry_page_query(supabase, cursor: tuple = None, page_size: int = ENQUIRY_PAGE_SIZE,
+                       status: str = None, package: str = None,
+                       date_from: str = None, date_to: str = None,
+                       columns: list = LIST_COLUMNS) -> tuple:
+    """
+    Build the query for one page of enquiries and the cache key of its rows
+    
+    Shared by fetch_enquiry_page and the async variant in async_database.py.
+    
+    Args:
+        supabase: Client (sync or async) to build the query on
+        cursor, page_size, status, package, date_from, date_to, columns: As for fetch_enquiry_page
+    
+    Returns:
+        tuple: (query builder, cache key)
+    """
+    columns = list(dict.fromkeys([*columns, "id", "created_at"]))
+    key = ("enquiries", "page", cursor, page_size, status, package, date_from, date_to, tuple(columns))
+    query = supabase.table("enquiries").select(",".join(columns))
+    
+    if status:
+        query = query.eq("status", status)
+    if package:
+        query = query.eq("package", package)
+    if date_from:
+        query = query.gte("booking_date", date_from)
+    if date_to:
+        query = query.lte("booking_date", date_to)
+    if cursor:
+        created_at, last_id = cursor
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})'
+        )
+    
+    # Fetch one extra row to find out whether another page follows
+    return query.order("created_at", desc=True).order("id", desc=True).limit(page_size + 1), key
+
+
+def enquiry_page_result(rows: list, page_size: int) -> tuple:
+    """Split fetched page rows into (DataFrame of the page, cursor for the next page or None)"""
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    
+    return enquiries_to_dataframe(rows), next_cursor
+
+
+@instrument_call
+def fetch_enquiry_page(cursor: tuple = None, page_size: int = ENQUIRY_PAGE_SIZE,
+                       status: str = None, package: str = None,
+                       date_from: str = None, date_to: str = None,
+                       columns: list = LIST_COLUMNS) -> tuple:
+    """
+    Fetch one page of enquiries using keyset pagination on (created_at, id)
+    
+    Filters and the column projection are applied server-side so only the
+    requested columns of the requested page are transferred.
+    
+    Args:
+        cursor: (created_at, id) of the last row on the previous page, or None for the first page
+        page_size: Number of rows per page
+        status: Only include enquiries with this status
+        package: Only include enquiries for this package
+        date_from: Earliest booking date (inclusive)
+        date_to: Latest booking date (inclusive)
+        columns: Columns to select; id and created_at are always included for the cursor
+    
+    Returns:
+        tuple: (DataFrame of the page, cursor for the next page or None)
+    """
+    try:
+        query, key = enquiry_page_query(get_supabase_client(), cursor, page_size, status,
+                                        package, date_from, date_to, columns)
+        rows = _enquiry_cache.get(key)
+        if rows is None:
+            rows = query.execute().data or []
+            _enquiry_cache.set(key, rows)
+        
+        return enquiry_page_result(rows, page_size)
+    
+    except Exception as e:
+        print(f"Error fetching enquiry page: {e}")
+        return pd.DataFrame(), None
+
+
+def enquiry_notes_query(supabase, enquiry_id: int):
+    """Build the query for an enquiry's follow-up notes on a sync or async client"""
+    return supabase.table("enquiries").select("follow_up_notes").eq("id", enquiry_id)
+
+
+@instrument_call
+def fetch_enquiry_notes(enquiry_id: int) -> str:
+    """
+    Fetch the follow-up notes of a single enquiry
+    
+    Args:
+        enquiry_id: ID of the enquiry
+    
+    Returns:
+        str: Follow-up notes, or an empty string if none or on error
+    """
+    key = ("enquiries", "notes", enquiry_id)
+    try:
+        notes = _enquiry_cache.get(key)
+        if notes is None:
+            response = enquiry_notes_query(get_supabase_client(), enquiry_id).execute()
+            notes = (response.data[0].get("follow_up_notes") if response.data else None) or ""
+            _enquiry_cache.set(key, notes)
+        return notes
+    
+    except Exception as e:
+        print(f"Error fetching notes for enquiry {enquiry_id}: {e}")
+        return ""
+
+
+@instrument_call
+def search_enquiries(term: str, limit: int = SEARCH_RESULT_LIMIT,
+                     columns: list = LIST_COLUMNS) -> pd.DataFrame:
+    """
+    Search enquiries by name, phone number or follow-up notes
+    
+    Calls the search_enquiries() Postgres function, which matches
+    substrings through trigram indexes and compares phone numbers in
+    their canonical_phone form, so "+263 775" finds "0775 387 683".
+    Results are limited server-side and best name matches come first.
+    
+    Args:
+        term: Text to search for
+        limit: Maximum number of enquiries returned
+        columns: Columns to select
+    
+    Returns:
+        pd.DataFrame: Matching enquiries; empty if term is shorter than SEARCH_MIN_LENGTH
+    """
+    term = term.strip()
+    if len(term) < SEARCH_MIN_LENGTH:
+        return pd.DataFrame()
+    
+    key = ("enquiries", "search", term.lower(), limit, tuple(columns))
+    try:
+        rows = _enquiry_cache.get(key)
+        if rows is None:
+            supabase = get_supabase_client()
+            response = supabase.rpc("search_enquiries", {
+                "term": term,
+                "max_results": limit
+            }).select(",".join(columns)).execute()
+            rows = response.data or []
+            _enquiry_cache.set(key, rows)
+        return enquiries_to_dataframe(rows)
+    
+    except Exception as e:
+        print(f"Error searching enquiries: {e}")
+        return pd.DataFrame()
+
+
+def empty_summary() -> dict:
+    """Return the summary shown when the metrics cannot be fetched"""
+    return {
+        "total_enquiries": 0,
+        "pending": 0,
+        "total_adults": 0,
+        "total_children": 0,
+        "by_status": [],
+        "by_package": []
+    }
+
+
+@instrument_call
+def fetch_enquiry_summary() -> dict:
+    """
+    Fetch dashboard summary metrics computed in the database
+    
+    Calls the enquiry_summary() Postgres function, so the totals and the
+    per-status and per-package breakdowns cost one small round trip.
+    
+    Returns:
+        dict: total_enquiries, pending, total_adults, total_children,
+              by_status and by_package (lists of {key, enquiries, adults, children})
+    """
+    try:
+        summary = _enquiry_cache.get(SUMMARY_KEY)
+        if summary is None:
+            supabase = get_supabase_client()
+            summary = supabase.rpc("enquiry_summary").execute().data
+            _enquiry_cache.set(SUMMARY_KEY, summary)
+        return summary
+    
+    except Exception as e:
+        print(f"Error fetching enquiry summary: {e}")
+        return empty_summary()
+
+
+def occupancy_query(supabase):
+    """Build the query for booking_occupancy rows from today onwards on a sync or async client"""
+    return supabase.table("booking_occupancy").select(
+        "booking_date,enquiries,adults,children"
+    ).gte("booking_date", date.today().isoformat())
+
+
+def occupancy_by_date(rows: list) -> dict:
+    """Key booking_occupancy rows by booking date"""
+    return {
+        row["booking_date"]: {
+            "enquiries": row["enquiries"],
+            "adults": row["adults"],
+            "children": row["children"]
+        }
+        for row in rows
+    }
+
+
+@instrument_call
+def fetch_occupancy() -> dict:
+    """
+    Fetch guests booked per date from today onwards
+    
+    Reads the booking_occupancy rollup, which a trigger keeps current on
+    every enquiry change, so the cost is one row per booked date rather
+    than a scan of the enquiries. The result is cached and patched by
+    new enquiries.
+    
+    Returns:
+        dict: {enquiries, adults, children} by booking date ('YYYY-MM-DD')
+    """
+    try:
+        occupancy = _enquiry_cache.get(OCCUPANCY_KEY)
+        if occupancy is None:
+            response = occupancy_query(get_supabase_client()).execute()
+            occupancy = occupancy_by_date(response.data or [])
+            _enquiry_cache.set(OCCUPANCY_KEY, occupancy)
+        return occupancy
+    
+    except Exception as e:
+        print(f"Error fetching occupancy: {e}")
+        return {}
+
+
+def get_date_occupancy(booking_date) -> dict:
+    """
+    Look up guests booked and places left on one date
+    
+    Args:
+        booking_date: Date or 'YYYY-MM-DD' string
+    
+    Returns:
+        dict: enquiries, adults, children, guests, capacity and remaining
+    """
+    day = fetch_occupancy().get(str(booking_date)[:10], {"enquiries": 0, "adults": 0, "children": 0})
+    guests = day["adults"] + day["children"]
+    return {
+        **day,
+        "guests": guests,
+        "capacity": DAILY_GUEST_CAPACITY,
+        "remaining": max(DAILY_GUEST_CAPACITY - guests, 0)
+    }
+
+
+@instrument_call
+def update_follow_up_notes(enquiry_id: int, notes: str) -> dict:
+    """
+    Update follow-up notes for a specific enquiry
+    
+    Args:
+        enquiry_id: ID of the enquiry to update
+        notes: Follow-up notes to add
+    
+    Returns:
+        dict: Response from Supabase update
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        return _optimistic_update(
+            {enquiry_id: {"follow_up_notes": notes}},
+            lambda: supabase.table("enquiries").update({
+                "follow_up_notes": notes,
+                "updated_at": datetime.now().isoformat()
+            }).eq("id", enquiry_id).execute()
+        )
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@instrument_call
+def update_enquiry_status(enquiry_id: int, status: str) -> dict:
+    """
+    Update the status of a specific enquiry
+    
+    Args:
+        enquiry_id: ID of the enquiry to update
+        status: New status (e.g., 'pending', 'confirmed', 'completed')
+    
+    Returns:
+        dict: Response from Supabase update
+    """
+    try:
+        supabase = get_supabase_client()
+        
+        return _optimistic_update(
+            {enquiry_id: {"status": status}},
+            lambda: supabase.table("enquiries").update({
+                "status": status,
+                "updated_at": datetime.now().isoformat()
+            }).eq("id", enquiry_id).execute()
+        )
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@instrument_call
+def bulk_update_enquiries(enquiry_ids: list, status: str = None, note: str = None) -> dict:
+    """
+    Update the status of, and/or append a note to, many enquiries in one request
+    
+    A status-only change is a single update filtered with in_(); appending
+    a note goes through the bulk_update_enquiries() Postgres function so
+    each enquiry keeps its existing notes.
+    
+    Args:
+        enquiry_ids: IDs of the enquiries to update
+        status: New status for all of them, or None to leave unchanged
+        note: Text appended on a new line to each enquiry's follow-up notes
+    
+    Returns:
+        dict: Response from Supabase with the updated rows
+    """
+    if not enquiry_ids or (not status and not note):
+        return {"success": True, "data": []}
+    
+    try:
+        supabase = get_supabase_client()
+        ids = [int(enquiry_id) for enquiry_id in enquiry_ids]
+        
+        changes = {enquiry_id: {"status": status} if status else {} for enquiry_id in ids}
+        
+        if note:
+            send = lambda: supabase.rpc("bulk_update_enquiries", {
+                "enquiry_ids": ids,
+                "new_status": status,
+                "note": note
+            }).execute()
+        else:
+            send = lambda: supabase.table("enquiries").update({
+                "status": status,
+                "updated_at": datetime.now().isoformat()
+            }).in_("id", ids).execute()
+        
+        return _optimistic_update(changes, send)
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def calculate_quotation(num_adults: int, num_children: int, package: str) -> dict:
+    """
+    Calculate quotation based on pricing
+    
+    Args:
+        num_adults: Number of adults
+        num_children: Number of children
+        package: Package name
+    
+    Returns:
+        dict: Quotation details with breakdown
+    """
+    adult_price = PRICING[ADULT_PRICE_KEY]
+    child_price = PRICING[CHILD_PRICE_KEY]
+    
+    # Base calculation
+    adults_total = num_adults * adult_price
+    children_total = num_children * child_price
+    
+    # Package pricing; the per-person packages are already charged per guest above
+    package_price = 0 if package in (ADULT_PRICE_KEY, CHILD_PRICE_KEY) else PRICING.get(package, 0)
+    
+    subtotal = adults_total + children_total + package_price
+    tax = subtotal * TAX_RATE
+    total = subtotal + tax
+    
+    return {
+        "num_adults": num_adults,
+        "num_children": num_children,
+        "adult_price": adult_price,
+        "child_price": child_price,
+        "adults_total": adults_total,
+        "children_total": children_total,
+        "package": package,
+        "package_price": package_price,
+        "subtotal": subtotal,
+        "tax": tax,
+        "total": total
+    }
+
+
+@instrument_call
+def calculate_quotations(enquiries_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate quotations for every enquiry in a DataFrame in one vectorized pass
+    
+    Uses the same formula as calculate_quotation. Package prices are looked
+    up through a price index without the per-person packages, once per
+    distinct package when the column is categorical.
+    
+    Args:
+        enquiries_df: DataFrame with num_adults, num_children and package columns
+    
+    Returns:
+        pd.DataFrame: adults_total, children_total, package_price, subtotal,
+                      tax and total, aligned to the input index
+    """
+    price_index = pd.Series(PRICING, dtype="float64").drop([ADULT_PRICE_KEY, CHILD_PRICE_KEY])
+    
+    adults_total = enquiries_df["num_adults"].to_numpy(dtype="float64") * PRICING[ADULT_PRICE_KEY]
+    children_total = enquiries_df["num_children"].to_numpy(dtype="float64") * PRICING[CHILD_PRICE_KEY]
+    package_price = enquiries_df["package"].map(price_index).astype("float64").fillna(0).to_numpy()
+    
+    subtotal = adults_total + children_total + package_price
+    tax = subtotal * TAX_RATE
+    
+    return pd.DataFrame({
+        "adults_total": adults_total,
+        "children_total": children_total,
+        "package_price": package_price,
+        "subtotal": subtotal,
+        "tax": tax,
+        "total": subtotal + tax
+    }, index=enquiries_df.index)
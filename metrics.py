@@ -0,0 +1,341 @@
+"""
+In-process metrics for database calls and page renders
+
+Instrumented database functions record their latency, rows returned,
+HTTP response bytes and errors; render functions record their wall time
+on every rerun. Metrics are exported in the Prometheus text format on
+http://METRICS_HOST:METRICS_PORT/metrics and, when METRICS_FILE is set,
+written to that file every METRICS_FILE_INTERVAL seconds.
+"""
+import bisect
+import contextlib
+import contextvars
+import functools
+import http.server
+import inspect
+import os
+import threading
+import time
+
+import pandas as pd
+
+from config import (
+    METRICS_ENABLED, METRICS_HOST, METRICS_PORT, METRICS_FILE,
+    METRICS_FILE_INTERVAL, METRICS_LATENCY_BUCKETS
+)
+
+_lock = threading.Lock()
+
+# Latency histograms by function name, and database call counters by function name
+_db_latency = {}
+_db_totals = {}
+_render_latency = {}
+
+# Stats functions exported as gauges, by metric name prefix
+_gauges = {}
+
+# Database calls in progress in the current thread or task; HTTP responses are attributed to all of them
+_active_calls = contextvars.ContextVar("active_db_calls", default=())
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+class Histogram:
+    """Latency histogram with cumulative Prometheus-style buckets"""
+
+    def __init__(self, buckets: list):
+        """
+        Args:
+            buckets: Upper bounds in seconds, ascending; +Inf is implied
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        """Add one observation"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> list:
+        """Return (upper bound label, observations at or below it) pairs, ending with +Inf"""
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        pairs, total = [], 0
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+def _observe(histograms: dict, name: str, seconds: float):
+    """Record seconds in the histogram for name, creating it on first use"""
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram(METRICS_LATENCY_BUCKETS)
+    histogram.observe(seconds)
+
+
+def _result_rows(result):
+    """Return the number of rows in a database function's result, or None if it has no rows"""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get("data"), list):
+        return len(result["data"])
+    return None
+
+
+def _record_call(name: str, seconds: float, call: dict):
+    """Add a finished database call to the metrics"""
+    result = call["result"]
+    failed = (
+        call["failed"]
+        or call["responses"] < call["requests"]
+        or (isinstance(result, dict) and result.get("success") is False)
+    )
+    rows = _result_rows(result)
+    with _lock:
+        _observe(_db_latency, name, seconds)
+        totals = _db_totals.setdefault(name, {"errors": 0, "rows": 0, "bytes": 0})
+        totals["errors"] += failed
+        totals["rows"] += rows or 0
+        totals["bytes"] += call["bytes"]
+
+
+@contextlib.contextmanager
+def _measure_call(name: str):
+    """Time a database call and collect the HTTP traffic it causes"""
+    call = {"requests": 0, "responses": 0, "bytes": 0, "failed": False, "result": None}
+    token = _active_calls.set(_active_calls.get() + (call,))
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        call["failed"] = True
+        raise
+    finally:
+        _active_calls.reset(token)
+        _record_call(name, time.perf_counter() - start, call)
+
+
+def instrument_call(func):
+    """
+    Decorator recording latency, rows, response bytes and errors of a database function
+
+    A call counts as an error if it raises, returns {"success": False},
+    gets an HTTP error status or sends a request that never gets a
+    response. Nested instrumented calls each include their inner calls.
+    Works on plain functions and coroutine functions.
+    """
+    if not METRICS_ENABLED:
+        return func
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with _measure_call(func.__name__) as call:
+                call["result"] = await func(*args, **kwargs)
+                return call["result"]
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with _measure_call(func.__name__) as call:
+            call["result"] = func(*args, **kwargs)
+            return call["result"]
+    return wrapper
+
+
+def record_request():
+    """Count an HTTP request sent on behalf of the database calls in progress"""
+    for call in _active_calls.get():
+        call["requests"] += 1
+
+
+def record_response(status_code: int, size: int):
+    """Attribute an HTTP response to the database calls in progress"""
+    for call in _active_calls.get():
+        call["responses"] += 1
+        call["bytes"] += size
+        if status_code >= 400:
+            call["failed"] = True
+
+
+def timed_render(func):
+    """Decorator recording the wall time of a render function on every rerun"""
+    if not METRICS_ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # Also reached when st.rerun() or st.stop() ends the script early
+            seconds = time.perf_counter() - start
+            with _lock:
+                _observe(_render_latency, func.__name__, seconds)
+    return wrapper
+
+
+def register_gauges(name: str, collect):
+    """
+    Export the numeric values of a stats function as gauges
+
+    Args:
+        name: Metric name prefix, e.g. "enquiry_cache"
+        collect: Function returning a dict such as get_enquiry_cache_stats;
+                 nested dicts are flattened and non-numeric values skipped
+    """
+    with _lock:
+        _gauges[name] = collect
+
+
+def _flatten(stats: dict, prefix: str):
+    """Yield (metric name, value) for the numeric values of a possibly nested stats dict"""
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (int, float)):
+            yield name, float(value)
+
+
+def _histogram_lines(metric: str, help_text: str, histograms: dict) -> list:
+    """Format histograms by function name in the Prometheus text format"""
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+    for name, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{function="{name}",le="{bound}"}} {count}')
+        lines.append(f'{metric}_sum{{function="{name}"}} {histogram.sum:.6f}')
+        lines.append(f'{metric}_count{{function="{name}"}} {histogram.count}')
+    return lines
+
+
+def render_metrics() -> str:
+    """
+    Return all metrics in the Prometheus text exposition format
+
+    Returns:
+        str: Database call and render histograms, database call counters and registered gauges
+    """
+    with _lock:
+        lines = _histogram_lines("pachena_db_call_duration_seconds",
+                                 "Latency of database function calls", _db_latency)
+        for counter, help_text in (("errors", "Database function calls that failed"),
+                                   ("rows", "Rows returned by database function calls"),
+                                   ("bytes", "HTTP response bytes received by database function calls")):
+            metric = f"pachena_db_call_{counter}_total"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{function="{name}"}} {totals[counter]}'
+                      for name, totals in sorted(_db_totals.items())]
+        lines += _histogram_lines("pachena_render_duration_seconds",
+                                  "Wall time of render functions per rerun", _render_latency)
+        gauges = dict(_gauges)
+
+    for prefix, collect in sorted(gauges.items()):
+        try:
+            values = list(_flatten(collect(), f"pachena_{prefix}"))
+        except Exception as e:
+            print(f"Error collecting {prefix} metrics: {e}")
+            continue
+        for metric, value in values:
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value:g}"]
+
+    return "\n".join(lines) + "\n"
+
+
+def get_metrics_summary() -> dict:
+    """
+    Return per-function call counts, mean latency and totals
+
+    Returns:
+        dict: "db" and "render", each mapping function name to
+              {calls, mean_ms} (plus errors, rows and bytes for "db")
+    """
+    with _lock:
+        db = {
+            name: {"calls": histogram.count, "mean_ms": histogram.sum / histogram.count * 1000,
+                   **_db_totals.get(name, {})}
+            for name, histogram in _db_latency.items()
+        }
+        render = {
+            name: {"calls": histogram.count, "mean_ms": histogram.sum / histogram.count * 1000}
+            for name, histogram in _render_latency.items()
+        }
+    return {"db": db, "render": render}
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """Serve render_metrics() on /metrics"""
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        payload = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def write_metrics_file(path: str = METRICS_FILE):
+    """Write render_metrics() to path, replacing the previous file atomically"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(render_metrics())
+    os.replace(temp_path, path)
+
+
+def _write_forever():
+    """Background loop: rewrite METRICS_FILE every METRICS_FILE_INTERVAL seconds"""
+    while True:
+        time.sleep(METRICS_FILE_INTERVAL)
+        try:
+            write_metrics_file()
+        except Exception as e:
+            print(f"Error writing metrics file: {e}")
+
+
+def start_metrics_exporter() -> dict:
+    """
+    Start the /metrics endpoint and the metrics file writer once per process
+
+    Returns:
+        dict: Success flag and the endpoint URL, or the error if the port could not be bound
+    """
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            return _exporter
+        if not METRICS_ENABLED:
+            _exporter = {"success": False, "error": "metrics disabled"}
+            return _exporter
+
+        if METRICS_FILE:
+            threading.Thread(target=_write_forever, name="metrics-file", daemon=True).start()
+
+        if not METRICS_PORT:
+            _exporter = {"success": True, "url": None}
+            return _exporter
+        try:
+            server = http.server.ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+        except OSError as e:
+            print(f"Error starting metrics endpoint: {e}")
+            _exporter = {"success": False, "error": str(e)}
+            return _exporter
+
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        _exporter = {"success": True, "url": f"http://{METRICS_HOST}:{server.server_port}/metrics"}
+        return _exporter
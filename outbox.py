@@ -0,0 +1,187 @@
+"""
+Durable write-behind queue for booking enquiries
+
+Enquiries are committed to a local SQLite journal (WAL mode) as soon as the
+booking form is submitted. A background thread drains the journal to
+Supabase in batches, retrying with exponential backoff while Supabase is
+slow or unreachable, so no lead is lost and guests never wait on the
+remote database.
+"""
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+
+from config import (
+    OUTBOX_PATH, OUTBOX_BATCH_SIZE, OUTBOX_FLUSH_INTERVAL,
+    OUTBOX_MAX_ATTEMPTS, OUTBOX_BACKOFF_BASE, OUTBOX_BACKOFF_MAX
+)
+from database import insert_enquiry_records
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox(status, next_attempt_at);
+"""
+
+_flusher = None
+_flusher_lock = threading.Lock()
+_wake = threading.Event()
+_flush_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a connection to the journal, creating it in WAL mode if needed"""
+    conn = sqlite3.connect(OUTBOX_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def enqueue_enquiry(record: dict) -> dict:
+    """
+    Durably record an enquiry for delivery to Supabase
+    
+    Args:
+        record: Enquiry row built with database.build_enquiry_record
+    
+    Returns:
+        dict: Success flag and the local journal id, or the error
+    """
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO outbox (payload, created_at) VALUES (?, ?)",
+                    (json.dumps(record), time.time())
+                )
+        finally:
+            conn.close()
+        _wake.set()
+        return {"success": True, "queued_id": cursor.lastrowid}
+    
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def _backoff(attempts: int) -> float:
+    """Return the delay before the next attempt, with jitter"""
+    delay = min(OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _mark_failed(conn: sqlite3.Connection, rows: list, error: str):
+    """Schedule a retry for rows, or park them as failed after OUTBOX_MAX_ATTEMPTS"""
+    now = time.time()
+    with conn:
+        for row_id, payload, attempts in rows:
+            attempts += 1
+            status = "failed" if attempts >= OUTBOX_MAX_ATTEMPTS else "pending"
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (status, attempts, now + _backoff(attempts), error, row_id)
+            )
+            if status == "failed":
+                print(f"Error: enquiry {row_id} in {OUTBOX_PATH} not delivered after {attempts} attempts "
+                      f"and parked as failed ({error}): {payload}", file=sys.stderr)
+
+
+class _Unreachable(Exception):
+    """Raised when Supabase cannot be reached so the flush stops and backs off"""
+
+
+def _send(conn: sqlite3.Connection, rows: list) -> int:
+    """Insert rows into Supabase and delete the ones delivered; return how many were sent"""
+    result = insert_enquiry_records([json.loads(payload) for _, payload, _ in rows])
+    if result.get("success"):
+        with conn:
+            conn.executemany("DELETE FROM outbox WHERE id = ?", [(row_id,) for row_id, _, _ in rows])
+        return len(rows)
+    
+    if result.get("retryable"):
+        raise _Unreachable(result.get("error"))
+    
+    # A rejected batch may be caused by a single bad row, so isolate it
+    if len(rows) > 1:
+        return sum(_send(conn, [row]) for row in rows)
+    
+    _mark_failed(conn, rows, result.get("error"))
+    return 0
+
+
+def flush_outbox() -> dict:
+    """
+    Deliver every enquiry that is due, in batches of OUTBOX_BATCH_SIZE
+    
+    Returns:
+        dict: Number of enquiries sent and whether Supabase was unreachable
+    """
+    sent = 0
+    with _flush_lock:
+        conn = _connect()
+        try:
+            while True:
+                rows = conn.execute(
+                    "SELECT id, payload, attempts FROM outbox "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (time.time(), OUTBOX_BATCH_SIZE)
+                ).fetchall()
+                if not rows:
+                    return {"sent": sent, "unreachable": False}
+                
+                try:
+                    sent += _send(conn, rows)
+                except _Unreachable as e:
+                    # Supabase is down or slow: back off the whole batch and stop for now
+                    _mark_failed(conn, rows, str(e))
+                    return {"sent": sent, "unreachable": True}
+        finally:
+            conn.close()
+
+
+def _flush_forever():
+    """Background loop: flush when woken by a new enquiry or every OUTBOX_FLUSH_INTERVAL seconds"""
+    while True:
+        _wake.wait(OUTBOX_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush_outbox()
+        except Exception as e:
+            print(f"Error flushing enquiry outbox: {e}")
+
+
+def start_flusher() -> threading.Thread:
+    """Start the background flusher thread once per process and return it"""
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_forever, name="enquiry-outbox", daemon=True)
+            _flusher.start()
+            _wake.set()
+    return _flusher
+
+
+def get_outbox_stats() -> dict:
+    """
+    Return the number of journaled enquiries by status
+    
+    Returns:
+        dict: Counts of 'pending' and 'failed' enquiries
+    """
+    conn = _connect()
+    try:
+        counts = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+    finally:
+        conn.close()
+    return {"pending": counts.get("pending", 0), "failed": counts.get("failed", 0)}
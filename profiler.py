@@ -0,0 +1,188 @@
+"""
+Opt-in profiling of single Streamlit reruns
+
+profile_rerun() runs a function (main() for a whole rerun) under cProfile
+while a sampling thread records the script thread's call stacks. Each
+rerun is stored in PROFILE_DIR as a .prof file (pstats format, readable
+by snakeviz) and a .folded file of collapsed stacks, the input format of
+flamegraph.pl and speedscope. Only the newest PROFILE_MAX_RUNS reruns
+are kept.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_MAX_RUNS, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_N
+
+_store_lock = threading.Lock()
+
+
+class _StackSampler:
+    """Thread sampling another thread's Python call stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float, root_code):
+        """
+        Args:
+            thread_id: Ident of the thread to sample
+            interval: Seconds between samples
+            root_code: Code object where stacks are cut off; frames below it are not recorded
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root_code = root_code
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        """Start sampling"""
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the last sample"""
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        """Sampler loop: add the target thread's current stack to the counts"""
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.root_code:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+
+def _profile_path(name: str, kind: str) -> str:
+    """Return the path of a stored profile's 'prof' or 'folded' file"""
+    return os.path.join(PROFILE_DIR, f"{name}.{kind}")
+
+
+def _save_profile(label: str, profiler: cProfile.Profile, stacks: Counter, seconds: float):
+    """Store a rerun's profile and collapsed stacks, then drop the oldest beyond PROFILE_MAX_RUNS"""
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}_{label}_{seconds * 1000:.0f}ms"
+    with _store_lock:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(_profile_path(name, "prof"))
+        with open(_profile_path(name, "folded"), "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in stacks.items())
+
+        for profile in list_profiles()[PROFILE_MAX_RUNS:]:
+            for kind in ("prof", "folded"):
+                path = _profile_path(profile["name"], kind)
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def profile_rerun(func, label: str = "main"):
+    """
+    Run func under cProfile and the stack sampler and store its profile
+
+    The profile is stored even when func ends the rerun early with
+    st.rerun() or st.stop(). If another profiler is already active,
+    func runs unprofiled.
+
+    Args:
+        func: Function to profile, called without arguments
+        label: Name stored with the profile
+
+    Returns:
+        The return value of func
+    """
+    profiler = cProfile.Profile()
+    sampler = _StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL, profile_rerun.__code__)
+    sampler.start()
+    try:
+        # Python 3.12+ allows one active profiler at a time, so an overlapping profiled rerun fails here
+        profiler.enable()
+    except ValueError as e:
+        sampler.stop()
+        print(f"Rerun not profiled: {e}")
+        return func()
+
+    start = time.perf_counter()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+        sampler.stop()
+        try:
+            _save_profile(label, profiler, sampler.stacks, time.perf_counter() - start)
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+
+
+def list_profiles() -> list:
+    """
+    Return the stored profiles, newest first
+
+    Returns:
+        list: Dicts with name, created (datetime), label and duration_ms
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for filename in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not filename.endswith(".prof"):
+            continue
+        name = filename[:-len(".prof")]
+        try:
+            stamp, rest = name.split("_", 1)
+            label, duration = rest.rsplit("_", 1)
+            profiles.append({
+                "name": name,
+                "created": datetime.strptime(stamp, "%Y%m%d-%H%M%S-%f"),
+                "label": label,
+                "duration_ms": int(duration[:-len("ms")])
+            })
+        except ValueError:
+            continue
+    return profiles
+
+
+def get_hotspots(name: str, sort: str = "cumulative_ms", limit: int = PROFILE_TOP_N) -> list:
+    """
+    Return the most expensive functions of a stored profile
+
+    Args:
+        name: Profile name from list_profiles
+        sort: "cumulative_ms" (including callees) or "own_ms" (the function's own code)
+        limit: Number of functions returned
+
+    Returns:
+        list: Dicts with function, location, calls, own_ms and cumulative_ms
+    """
+    stats = pstats.Stats(_profile_path(name, "prof"))
+    hotspots = [
+        {
+            "function": function,
+            "location": f"{os.path.basename(filename)}:{line}",
+            "calls": calls,
+            "own_ms": own * 1000,
+            "cumulative_ms": cumulative * 1000
+        }
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items()
+    ]
+    hotspots.sort(key=lambda hotspot: hotspot[sort], reverse=True)
+    return hotspots[:limit]
+
+
+def read_profile(name: str, kind: str) -> bytes:
+    """
+    Return the contents of a stored profile for download
+
+    Args:
+        name: Profile name from list_profiles
+        kind: "prof" for the pstats file or "folded" for the collapsed stacks
+    """
+    with open(_profile_path(name, kind), "rb") as f:
+        return f.read()
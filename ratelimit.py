@@ -0,0 +1,160 @@
+"""
+Token-bucket rate limiting for the public booking form
+
+Buckets live in process memory and are shared by every Streamlit session,
+so a bot opening new sessions is still limited by its client IP. Repeat
+submissions within BOOKING_DEBOUNCE_SECONDS are dropped before any
+tokens are spent.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from cache import TTLCache
+from config import (
+    BOOKING_SESSION_BURST, BOOKING_SESSION_PER_HOUR, BOOKING_IP_BURST,
+    BOOKING_IP_PER_HOUR, BOOKING_DEBOUNCE_SECONDS, RATE_LIMIT_MAX_CLIENTS,
+    RATE_LIMIT_PROXY_HOPS
+)
+
+
+class TokenBucketLimiter:
+    """Thread-safe token buckets per key, refilled continuously up to a burst capacity"""
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int):
+        """
+        Args:
+            capacity: Tokens a bucket holds when full (the allowed burst)
+            refill_per_second: Tokens added to each bucket per second
+            max_keys: Buckets kept before the least recently used is dropped
+        """
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "limited": 0}
+
+    def _refill(self, key, now: float) -> float:
+        """Return the tokens in key's bucket at time now"""
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+
+    def acquire(self, key, cost: float = 1) -> float:
+        """
+        Take cost tokens from key's bucket if it has enough
+
+        Args:
+            key: Client the bucket belongs to
+            cost: Tokens the action costs
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until enough tokens are available
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens = self._refill(key, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            self._stats["allowed" if allowed else "limited"] += 1
+
+            if allowed:
+                return 0.0
+            if self.refill_per_second <= 0:
+                return float("inf")
+            return (cost - tokens) / self.refill_per_second
+
+    def refund(self, key, cost: float = 1):
+        """Give back tokens taken for an action that was not carried out"""
+        with self._lock:
+            if key in self._buckets:
+                now = time.monotonic()
+                self._buckets[key] = (min(self.capacity, self._refill(key, now) + cost), now)
+
+    def stats(self) -> dict:
+        """Return allowed/limited counters plus the number of tracked clients"""
+        with self._lock:
+            return {**self._stats, "clients": len(self._buckets)}
+
+
+_session_limiter = TokenBucketLimiter(BOOKING_SESSION_BURST, BOOKING_SESSION_PER_HOUR / 3600, RATE_LIMIT_MAX_CLIENTS)
+_ip_limiter = TokenBucketLimiter(BOOKING_IP_BURST, BOOKING_IP_PER_HOUR / 3600, RATE_LIMIT_MAX_CLIENTS)
+_recent_submissions = TTLCache(BOOKING_DEBOUNCE_SECONDS, RATE_LIMIT_MAX_CLIENTS)
+_warned_no_client_ip = False
+
+
+def _warn_no_client_ip():
+    """Log once per process that submissions are only limited per session"""
+    global _warned_no_client_ip
+    if not _warned_no_client_ip:
+        _warned_no_client_ip = True
+        print("Client IP unknown: booking submissions are rate limited per session only "
+              "(set RATE_LIMIT_TRUST_PROXY behind a proxy that sends X-Forwarded-For)")
+
+
+def forwarded_client_ip(forwarded: str, trusted_hops: int = RATE_LIMIT_PROXY_HOPS) -> str:
+    """
+    Return the client IP from an X-Forwarded-For header
+
+    Each proxy appends the address it received the request from, so only
+    the last trusted_hops entries are trustworthy; anything left of them
+    was sent by the client and may be forged. The entry added by the
+    outermost trusted proxy is the client.
+
+    Args:
+        forwarded: X-Forwarded-For header value
+        trusted_hops: Number of trusted proxies in front of the app
+
+    Returns:
+        str: Client IP address, or None if the header is empty
+    """
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    if not hops:
+        return None
+    return hops[-min(max(trusted_hops, 1), len(hops))]
+
+
+def check_booking_submission(session_id: str, client_ip: str = None) -> dict:
+    """
+    Decide whether a booking form submission may be sent to the database
+
+    Args:
+        session_id: Identifier of the browser session
+        client_ip: Client IP address, or None if unknown (IP limiting is then skipped)
+
+    Returns:
+        dict: "allowed", plus "reason" ('debounce', 'session' or 'ip') and
+              "retry_after" in seconds when the submission is refused
+    """
+    if _recent_submissions.get(session_id) is not None:
+        return {"allowed": False, "reason": "debounce", "retry_after": BOOKING_DEBOUNCE_SECONDS}
+    _recent_submissions.set(session_id, True)
+
+    retry_after = _session_limiter.acquire(session_id)
+    if retry_after:
+        return {"allowed": False, "reason": "session", "retry_after": retry_after}
+
+    if not client_ip:
+        _warn_no_client_ip()
+    else:
+        retry_after = _ip_limiter.acquire(client_ip)
+        if retry_after:
+            _session_limiter.refund(session_id)
+            return {"allowed": False, "reason": "ip", "retry_after": retry_after}
+
+    return {"allowed": True}
+
+
+def get_rate_limit_stats() -> dict:
+    """
+    Return counters for the booking form limiters
+
+    Returns:
+        dict: Per-session and per-IP allowed/limited counts and tracked clients
+    """
+    return {"session": _session_limiter.stats(), "ip": _ip_limiter.stats()}
@@ -1,70 +1,249 @@
--- Supabase SQL Schema for Pachena Eco-Tourism Resort
--- Run this SQL in your Supabase SQL Editor to create the enquiries table
-
--- Create the enquiries table
-CREATE TABLE IF NOT EXISTS enquiries (
-    id BIGSERIAL PRIMARY KEY,
-    name VARCHAR(255) NOT NULL,
-    phone VARCHAR(50) NOT NULL,
-    booking_date DATE NOT NULL,
-    num_adults INTEGER NOT NULL DEFAULT 0,
-    num_children INTEGER NOT NULL DEFAULT 0,
-    package VARCHAR(100) NOT NULL,
-    status VARCHAR(50) DEFAULT 'pending',
-    follow_up_notes TEXT DEFAULT '',
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
-
--- Create an index on created_at for faster sorting
-CREATE INDEX idx_enquiries_created_at ON enquiries(created_at DESC);
-
--- Create an index on status for filtering
-CREATE INDEX idx_enquiries_status ON enquiries(status);
-
--- Create an index on booking_date
-CREATE INDEX idx_enquiries_booking_date ON enquiries(booking_date);
-
--- Enable Row Level Security (RLS) - Optional but recommended
-ALTER TABLE enquiries ENABLE ROW LEVEL SECURITY;
-
--- Create a policy to allow all operations (adjust based on your security needs)
--- For public access (booking form submission)
-CREATE POLICY "Allow public insert" ON enquiries
-    FOR INSERT
-    TO anon
-    WITH CHECK (true);
-
--- For authenticated users (admin dashboard)
-CREATE POLICY "Allow authenticated full access" ON enquiries
-    FOR ALL
-    TO authenticated
-    USING (true);
-
--- If you want to allow anonymous read access (for public viewing)
-CREATE POLICY "Allow public read" ON enquiries
-    FOR SELECT
-    TO anon
-    USING (true);
-
--- Create a function to automatically update the updated_at timestamp
-CREATE OR REPLACE FUNCTION update_updated_at_column()
-RETURNS TRIGGER AS $$
-BEGIN
-    NEW.updated_at = NOW();
-    RETURN NEW;
-END;
-$$ LANGUAGE plpgsql;
-
--- Create a trigger to call the function before any update
-CREATE TRIGGER update_enquiries_updated_at
-    BEFORE UPDATE ON enquiries
-    FOR EACH ROW
-    EXECUTE FUNCTION update_updated_at_column();
-
--- Insert some sample data (optional - remove in production)
-INSERT INTO enquiries (name, phone, booking_date, num_adults, num_children, package, status)
-VALUES 
-    ('John Doe', '+1-555-0101', '2026-02-15', 2, 1, 'Adventure Package', 'pending'),
-    ('Jane Smith', '+1-555-0102', '2026-02-20', 1, 0, 'Wellness Day', 'confirmed'),
-    ('Bob Johnson', '+1-555-0103', '2026-03-01', 4, 2, 'Ultimate Package', 'pending');
+-- Supabase SQL Schema for Pachena Eco-Tourism Resort
+-- Run this SQL in your Supabase SQL Editor to create the enquiries table
+
+-- Create the enquiries table
+CREATE TABLE IF NOT EXISTS enquiries (
+    id BIGSERIAL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    phone VARCHAR(50) NOT NULL,
+    booking_date DATE NOT NULL,
+    num_adults INTEGER NOT NULL DEFAULT 0,
+    num_children INTEGER NOT NULL DEFAULT 0,
+    package VARCHAR(100) NOT NULL,
+    status VARCHAR(50) DEFAULT 'pending',
+    follow_up_notes TEXT DEFAULT '',
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create an index on created_at for faster sorting
+CREATE INDEX idx_enquiries_created_at ON enquiries(created_at DESC);
+
+-- Create an index on status for filtering
+CREATE INDEX idx_enquiries_status ON enquiries(status);
+
+-- Create an index on booking_date
+CREATE INDEX idx_enquiries_booking_date ON enquiries(booking_date);
+
+-- Create an index on package for filtering
+CREATE INDEX idx_enquiries_package ON enquiries(package);
+
+-- Create a composite index for keyset pagination on (created_at, id)
+CREATE INDEX idx_enquiries_created_at_id ON enquiries(created_at DESC, id DESC);
+
+-- Enable Row Level Security (RLS) - Optional but recommended
+ALTER TABLE enquiries ENABLE ROW LEVEL SECURITY;
+
+-- Create a policy to allow all operations (adjust based on your security needs)
+-- For public access (booking form submission)
+CREATE POLICY "Allow public insert" ON enquiries
+    FOR INSERT
+    TO anon
+    WITH CHECK (true);
+
+-- For authenticated users (admin dashboard)
+CREATE POLICY "Allow authenticated full access" ON enquiries
+    FOR ALL
+    TO authenticated
+    USING (true);
+
+-- If you want to allow anonymous read access (for public viewing)
+CREATE POLICY "Allow public read" ON enquiries
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- Create a function to automatically update the updated_at timestamp
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create a trigger to call the function before any update
+CREATE TRIGGER update_enquiries_updated_at
+    BEFORE UPDATE ON enquiries
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Create a function returning the admin dashboard summary as one JSON payload
+CREATE OR REPLACE FUNCTION enquiry_summary()
+RETURNS JSON AS $$
+    SELECT json_build_object(
+        'total_enquiries', COUNT(*),
+        'pending', COUNT(*) FILTER (WHERE COALESCE(status, 'pending') = 'pending'),
+        'total_adults', COALESCE(SUM(num_adults), 0),
+        'total_children', COALESCE(SUM(num_children), 0),
+        'by_status', (
+            SELECT COALESCE(json_agg(s ORDER BY s.enquiries DESC), '[]'::json)
+            FROM (
+                SELECT COALESCE(status, 'pending') AS key, COUNT(*) AS enquiries,
+                       SUM(num_adults) AS adults, SUM(num_children) AS children
+                FROM enquiries
+                GROUP BY 1
+            ) s
+        ),
+        'by_package', (
+            SELECT COALESCE(json_agg(p ORDER BY p.enquiries DESC), '[]'::json)
+            FROM (
+                SELECT package AS key, COUNT(*) AS enquiries,
+                       SUM(num_adults) AS adults, SUM(num_children) AS children
+                FROM enquiries
+                GROUP BY 1
+            ) p
+        )
+    )
+    FROM enquiries;
+$$ LANGUAGE sql STABLE;
+
+-- Create a function to update status and append follow-up notes for many enquiries at once
+CREATE OR REPLACE FUNCTION bulk_update_enquiries(
+    enquiry_ids BIGINT[],
+    new_status VARCHAR DEFAULT NULL,
+    note TEXT DEFAULT NULL
+)
+RETURNS SETOF enquiries AS $$
+    UPDATE enquiries
+    SET status = COALESCE(new_status, status),
+        follow_up_notes = CASE
+            WHEN COALESCE(note, '') = '' THEN follow_up_notes
+            WHEN COALESCE(follow_up_notes, '') = '' THEN note
+            ELSE follow_up_notes || E'\n' || note
+        END
+    WHERE id = ANY(enquiry_ids)
+    RETURNING *;
+$$ LANGUAGE sql;
+
+-- Keep a per-date occupancy rollup so availability never scans enquiries
+-- (cancelled enquiries do not hold places)
+CREATE TABLE IF NOT EXISTS booking_occupancy (
+    booking_date DATE PRIMARY KEY,
+    enquiries INTEGER NOT NULL DEFAULT 0,
+    adults INTEGER NOT NULL DEFAULT 0,
+    children INTEGER NOT NULL DEFAULT 0
+);
+
+ALTER TABLE booking_occupancy ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public read" ON booking_occupancy
+    FOR SELECT
+    TO anon
+    USING (true);
+
+-- Create a function to move an enquiry's guests between occupancy dates
+CREATE OR REPLACE FUNCTION maintain_booking_occupancy()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND COALESCE(OLD.status, 'pending') <> 'cancelled' THEN
+        UPDATE booking_occupancy
+        SET enquiries = enquiries - 1,
+            adults = adults - COALESCE(OLD.num_adults, 0),
+            children = children - COALESCE(OLD.num_children, 0)
+        WHERE booking_date = OLD.booking_date;
+    END IF;
+    
+    IF TG_OP IN ('INSERT', 'UPDATE') AND COALESCE(NEW.status, 'pending') <> 'cancelled' THEN
+        INSERT INTO booking_occupancy (booking_date, enquiries, adults, children)
+        VALUES (NEW.booking_date, 1, COALESCE(NEW.num_adults, 0), COALESCE(NEW.num_children, 0))
+        ON CONFLICT (booking_date) DO UPDATE
+        SET enquiries = booking_occupancy.enquiries + 1,
+            adults = booking_occupancy.adults + EXCLUDED.adults,
+            children = booking_occupancy.children + EXCLUDED.children;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Create a trigger to call the function whenever guests, dates or status change
+CREATE TRIGGER maintain_enquiries_occupancy
+    AFTER INSERT OR DELETE OR UPDATE OF booking_date, num_adults, num_children, status ON enquiries
+    FOR EACH ROW
+    EXECUTE FUNCTION maintain_booking_occupancy();
+
+-- Backfill the rollup from enquiries created before the trigger existed
+INSERT INTO booking_occupancy (booking_date, enquiries, adults, children)
+SELECT booking_date, COUNT(*), COALESCE(SUM(num_adults), 0), COALESCE(SUM(num_children), 0)
+FROM enquiries
+WHERE COALESCE(status, 'pending') <> 'cancelled'
+GROUP BY booking_date
+ON CONFLICT (booking_date) DO UPDATE
+SET enquiries = EXCLUDED.enquiries,
+    adults = EXCLUDED.adults,
+    children = EXCLUDED.children;
+
+-- Enable trigram matching for substring search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Reduce a phone number to canonical digits, the same rule as canonical_phone() in
+-- database.py: strip non-digits, drop a 00 international prefix and replace a leading 0
+-- with the country code (PHONE_COUNTRY_CODE in config.py; change '263' here with it)
+CREATE OR REPLACE FUNCTION canonical_phone(phone TEXT)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN digits LIKE '00%' THEN substr(digits, 3)
+        WHEN digits LIKE '0%' THEN '263' || substr(digits, 2)
+        ELSE digits
+    END
+    FROM (SELECT regexp_replace(COALESCE(phone, ''), '\D', '', 'g') AS digits) d;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Keep a canonical copy of the phone number so formatting and local/international
+-- notation never affect lookups ("0775 387 683" is stored as 263775387683)
+ALTER TABLE enquiries
+    ADD COLUMN IF NOT EXISTS phone_canonical TEXT
+    GENERATED ALWAYS AS (canonical_phone(phone)) STORED;
+
+-- Create trigram indexes for ILIKE/LIKE search on name, notes and phone
+CREATE INDEX idx_enquiries_name_trgm ON enquiries USING gin (name gin_trgm_ops);
+CREATE INDEX idx_enquiries_notes_trgm ON enquiries USING gin (follow_up_notes gin_trgm_ops);
+CREATE INDEX idx_enquiries_phone_canonical_trgm ON enquiries USING gin (phone_canonical gin_trgm_ops);
+
+-- Create a function searching enquiries by name, phone or follow-up notes
+CREATE OR REPLACE FUNCTION search_enquiries(term TEXT, max_results INTEGER DEFAULT 20)
+RETURNS SETOF enquiries AS $$
+    WITH q AS (
+        SELECT '%' || replace(replace(replace(btrim(term), '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern,
+               regexp_replace(term, '\D', '', 'g') AS digits,
+               canonical_phone(term) AS phone
+    )
+    SELECT e.*
+    FROM enquiries e, q
+    WHERE e.name ILIKE q.pattern
+       OR e.follow_up_notes ILIKE q.pattern
+       OR (length(q.digits) >= 3 AND e.phone_canonical LIKE '%' || q.phone || '%')
+    ORDER BY similarity(e.name, btrim(term)) DESC, e.created_at DESC
+    LIMIT LEAST(GREATEST(max_results, 1), 100);
+$$ LANGUAGE sql STABLE;
+
+-- Detect duplicate enquiries: the app stores a hash of the canonical phone number,
+-- booking date and package, plus an idempotency key per form submission
+-- (enquiries created before these columns existed keep NULLs and never conflict)
+ALTER TABLE enquiries
+    ADD COLUMN IF NOT EXISTS fingerprint CHAR(32),
+    ADD COLUMN IF NOT EXISTS idempotency_key UUID;
+
+-- Only enquiries that are not cancelled block a new one with the same details.
+-- PostgREST's on_conflict cannot name a partial index predicate, so the predicate
+-- lives in a generated column (NULL once cancelled) whose unique index is the
+-- conflict target of the app's inserts
+ALTER TABLE enquiries
+    ADD COLUMN IF NOT EXISTS active_fingerprint CHAR(32)
+    GENERATED ALWAYS AS (
+        CASE WHEN COALESCE(status, 'pending') <> 'cancelled' THEN fingerprint END
+    ) STORED;
+
+CREATE UNIQUE INDEX idx_enquiries_active_fingerprint ON enquiries(active_fingerprint);
+CREATE UNIQUE INDEX idx_enquiries_idempotency_key ON enquiries(idempotency_key);
+
+-- Publish enquiry changes to Supabase Realtime for the dashboard change feed
+ALTER PUBLICATION supabase_realtime ADD TABLE enquiries;
+
+-- Insert some sample data (optional - remove in production)
+INSERT INTO enquiries (name, phone, booking_date, num_adults, num_children, package, status)
+VALUES 
+    ('John Doe', '+1-555-0101', '2026-02-15', 2, 1, 'Adventure Package', 'pending'),
+    ('Jane Smith', '+1-555-0102', '2026-02-20', 1, 0, 'Wellness Day', 'confirmed'),
+    ('Bob Johnson', '+1-555-0103', '2026-03-01', 4, 2, 'Ultimate Package', 'pending');
@@ -0,0 +1,525 @@
+"""
+Local SQLite storage backend
+
+SQLiteClient implements the part of the supabase-py client that
+database.py uses: table().select/insert/upsert/update/delete with
+eq/neq/gt/gte/lt/lte/in_/or_ filters, order and limit, and rpc() for the
+Postgres functions in schema.sql. The tables, indexes and triggers mirror
+schema.sql, so the app, benchmarks and load tests can run on one machine
+without a Supabase project.
+
+Select it with STORAGE_BACKEND=sqlite; SQLITE_PATH=":memory:" keeps the
+database in memory for the life of the process. Committed writes are
+published to subscribe() callbacks, standing in for Supabase Realtime.
+"""
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from config import PHONE_COUNTRY_CODE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enquiries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    booking_date TEXT NOT NULL,
+    num_adults INTEGER NOT NULL DEFAULT 0,
+    num_children INTEGER NOT NULL DEFAULT 0,
+    package TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    follow_up_notes TEXT DEFAULT '',
+    created_at TEXT DEFAULT (utc_now()),
+    updated_at TEXT DEFAULT (utc_now()),
+    phone_canonical TEXT GENERATED ALWAYS AS (canonical_phone(phone)) STORED,
+    fingerprint TEXT,
+    active_fingerprint TEXT GENERATED ALWAYS AS (
+        CASE WHEN COALESCE(status, 'pending') <> 'cancelled' THEN fingerprint END
+    ) STORED,
+    idempotency_key TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_enquiries_created_at ON enquiries(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_enquiries_status ON enquiries(status);
+CREATE INDEX IF NOT EXISTS idx_enquiries_booking_date ON enquiries(booking_date);
+CREATE INDEX IF NOT EXISTS idx_enquiries_package ON enquiries(package);
+CREATE INDEX IF NOT EXISTS idx_enquiries_created_at_id ON enquiries(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_enquiries_phone_canonical ON enquiries(phone_canonical);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_enquiries_active_fingerprint ON enquiries(active_fingerprint);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_enquiries_idempotency_key ON enquiries(idempotency_key);
+
+CREATE TRIGGER IF NOT EXISTS update_enquiries_updated_at
+    AFTER UPDATE ON enquiries
+    FOR EACH ROW
+BEGIN
+    UPDATE enquiries SET updated_at = utc_now() WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS booking_occupancy (
+    booking_date TEXT PRIMARY KEY,
+    enquiries INTEGER NOT NULL DEFAULT 0,
+    adults INTEGER NOT NULL DEFAULT 0,
+    children INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS occupancy_hold_on_insert
+    AFTER INSERT ON enquiries
+    FOR EACH ROW WHEN COALESCE(NEW.status, 'pending') <> 'cancelled'
+BEGIN
+    INSERT INTO booking_occupancy (booking_date, enquiries, adults, children)
+    VALUES (NEW.booking_date, 1, NEW.num_adults, NEW.num_children)
+    ON CONFLICT (booking_date) DO UPDATE
+    SET enquiries = enquiries + 1,
+        adults = adults + excluded.adults,
+        children = children + excluded.children;
+END;
+
+CREATE TRIGGER IF NOT EXISTS occupancy_release_on_update
+    AFTER UPDATE OF booking_date, num_adults, num_children, status ON enquiries
+    FOR EACH ROW WHEN COALESCE(OLD.status, 'pending') <> 'cancelled'
+BEGIN
+    UPDATE booking_occupancy
+    SET enquiries = enquiries - 1,
+        adults = adults - OLD.num_adults,
+        children = children - OLD.num_children
+    WHERE booking_date = OLD.booking_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS occupancy_hold_on_update
+    AFTER UPDATE OF booking_date, num_adults, num_children, status ON enquiries
+    FOR EACH ROW WHEN COALESCE(NEW.status, 'pending') <> 'cancelled'
+BEGIN
+    INSERT INTO booking_occupancy (booking_date, enquiries, adults, children)
+    VALUES (NEW.booking_date, 1, NEW.num_adults, NEW.num_children)
+    ON CONFLICT (booking_date) DO UPDATE
+    SET enquiries = enquiries + 1,
+        adults = adults + excluded.adults,
+        children = children + excluded.children;
+END;
+
+CREATE TRIGGER IF NOT EXISTS occupancy_release_on_delete
+    AFTER DELETE ON enquiries
+    FOR EACH ROW WHEN COALESCE(OLD.status, 'pending') <> 'cancelled'
+BEGIN
+    UPDATE booking_occupancy
+    SET enquiries = enquiries - 1,
+        adults = adults - OLD.num_adults,
+        children = children - OLD.num_children
+    WHERE booking_date = OLD.booking_date;
+END;
+"""
+
+# Timestamp columns are stored as UTC ISO 8601 text, the way PostgREST returns timestamptz
+_TIMESTAMP_COLUMNS = {"created_at", "updated_at"}
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+              "like": "LIKE", "ilike": "LIKE"}
+
+
+def _utc_now() -> str:
+    """Return the current time as UTC ISO 8601 text"""
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _timestamp(value):
+    """Normalize a timestamp to UTC ISO 8601 text, reading naive values as UTC like Supabase does"""
+    if value is None:
+        return None
+    stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _digits_only(value) -> str:
+    """Return the digits of value"""
+    return re.sub(r"\D", "", value or "")
+
+
+def _canonical_phone(value) -> str:
+    """SQL function used for the generated phone_canonical column; same rule as schema.sql's canonical_phone()"""
+    digits = _digits_only(value)
+    if digits.startswith("00"):
+        return digits[2:]
+    if digits.startswith("0"):
+        return PHONE_COUNTRY_CODE + digits[1:]
+    return digits
+
+
+def _identifier(name: str) -> str:
+    """Return name if it is a plain column or table name, so it can be placed in SQL"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return name
+
+
+def _split_top_level(text: str) -> list:
+    """Split a PostgREST logic expression on commas outside parentheses and quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _parse_logic(text: str, joiner: str) -> tuple:
+    """
+    Translate a PostgREST or=(...)/and=(...) expression into a SQL condition
+
+    Args:
+        text: Conditions such as 'created_at.lt."x",and(created_at.eq."x",id.lt.5)'
+        joiner: "OR" or "AND"
+
+    Returns:
+        tuple: (SQL condition, parameters)
+    """
+    clauses, params = [], []
+    for part in _split_top_level(text):
+        for prefix, nested in (("and(", "AND"), ("or(", "OR")):
+            if part.startswith(prefix) and part.endswith(")"):
+                clause, nested_params = _parse_logic(part[len(prefix):-1], nested)
+                break
+        else:
+            column, operator, value = part.split(".", 2)
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            if operator == "is":
+                clause, nested_params = f"{_identifier(column)} IS NULL", []
+            else:
+                if operator in ("like", "ilike"):
+                    value = value.replace("*", "%")
+                clause, nested_params = f"{_identifier(column)} {_OPERATORS[operator]} ?", [value]
+        clauses.append(f"({clause})")
+        params.extend(nested_params)
+    return f" {joiner} ".join(clauses), params
+
+
+class APIResponse:
+    """Query result shaped like the supabase-py response: rows (or the function result) in .data"""
+
+    def __init__(self, data):
+        self.data = data
+        self.count = None
+
+
+class _Query:
+    """Chainable query on one table, executed against the SQLite connection"""
+
+    def __init__(self, client, table: str):
+        self._client = client
+        self._table = _identifier(table)
+        self._action = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._where = []
+        self._params = []
+        self._order = []
+        self._limit = None
+
+    def select(self, columns: str = "*", **options):
+        """Select columns ("*" or a comma-separated list)"""
+        self._action = "select"
+        self._columns = columns
+        return self
+
+    def insert(self, rows, **options):
+        """Insert one row (dict) or many (list of dicts)"""
+        self._action = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False, **options):
+        """Insert rows, skipping or merging those that conflict on the on_conflict columns"""
+        self.insert(rows)
+        self._on_conflict = on_conflict or "id"
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: dict, **options):
+        """Update the filtered rows with values"""
+        self._action = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **options):
+        """Delete the filtered rows"""
+        self._action = "delete"
+        return self
+
+    def _filter(self, column: str, operator: str, value):
+        self._where.append(f"{_identifier(column)} {operator} ?")
+        self._params.append(_timestamp(value) if column in _TIMESTAMP_COLUMNS else value)
+        return self
+
+    def eq(self, column: str, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, "<>", value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, "<=", value)
+
+    def in_(self, column: str, values: list):
+        values = list(values)
+        self._where.append(f"{_identifier(column)} IN ({', '.join('?' * len(values))})" if values else "0")
+        self._params.extend(values)
+        return self
+
+    def or_(self, filters: str):
+        """Apply a PostgREST or filter, e.g. 'status.eq.pending,and(id.gt.5,id.lt.9)'"""
+        clause, params = _parse_logic(filters, "OR")
+        self._where.append(f"({clause})")
+        self._params.extend(params)
+        return self
+
+    def order(self, column: str, desc: bool = False, **options):
+        self._order.append(f"{_identifier(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int, **options):
+        self._limit = int(size)
+        return self
+
+    def _where_sql(self) -> str:
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ""
+
+    def execute(self) -> APIResponse:
+        """Run the query and return the affected or selected rows"""
+        with self._client.lock:
+            conn = self._client.connection
+            if self._action == "select":
+                return APIResponse(self._client.query(self._select_sql(), self._params))
+            with conn:
+                if self._action == "insert":
+                    rows = [row for row in map(self._insert_row, self._payload) if row]
+                    events = [("INSERT", row, {}) for row in rows]
+                elif self._action == "update":
+                    rows = self._update()
+                    events = [("UPDATE", row, {"id": row.get("id")}) for row in rows]
+                else:
+                    rows = self._client.query(
+                        f"DELETE FROM {self._table}{self._where_sql()} RETURNING *", self._params
+                    )
+                    events = [("DELETE", {}, row) for row in rows]
+        self._client.publish(self._table, events)
+        return APIResponse(rows)
+
+    def _select_sql(self) -> str:
+        columns = self._columns.strip()
+        if columns != "*":
+            columns = ", ".join(_identifier(column.strip()) for column in columns.split(","))
+        sql = f"SELECT {columns} FROM {self._table}{self._where_sql()}"
+        if self._order:
+            sql += f" ORDER BY {', '.join(self._order)}"
+        if self._limit is not None:
+            sql += f" LIMIT {self._limit}"
+        return sql
+
+    def _insert_row(self, row: dict):
+        """Insert one row, returning it, or None if skipped as a duplicate"""
+        row = {
+            column: _timestamp(value) if column in _TIMESTAMP_COLUMNS else value
+            for column, value in row.items()
+        }
+        columns = [_identifier(column) for column in row]
+        sql = f"INSERT INTO {self._table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        if self._on_conflict:
+            target = ", ".join(_identifier(column.strip()) for column in self._on_conflict.split(","))
+            if self._ignore_duplicates:
+                sql += f" ON CONFLICT ({target}) DO NOTHING"
+            else:
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET " + ", ".join(
+                    f"{column} = excluded.{column}" for column in columns
+                )
+        rows = self._client.query(sql + " RETURNING *", list(row.values()))
+        return rows[0] if rows else None
+
+    def _update(self) -> list:
+        """Update the filtered rows and return them as stored, after triggers have run"""
+        values = {
+            _identifier(column): _timestamp(value) if column in _TIMESTAMP_COLUMNS else value
+            for column, value in self._payload.items()
+        }
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        changed = self._client.query(
+            f"UPDATE {self._table} SET {assignments}{self._where_sql()} RETURNING rowid AS row_id",
+            [*values.values(), *self._params]
+        )
+        rowids = [row["row_id"] for row in changed]
+        if not rowids:
+            return []
+        return self._client.query(
+            f"SELECT * FROM {self._table} WHERE rowid IN ({', '.join('?' * len(rowids))})", rowids
+        )
+
+
+class _RPCCall:
+    """Call of one of the schema.sql functions, with an optional column projection"""
+
+    def __init__(self, client, name: str, params: dict):
+        self._client = client
+        self._name = name
+        self._function = _FUNCTIONS[name]
+        self._params = params or {}
+        self._columns = None
+
+    def select(self, columns: str = "*", **options):
+        if columns.strip() != "*":
+            self._columns = [column.strip() for column in columns.split(",")]
+        return self
+
+    def execute(self) -> APIResponse:
+        with self._client.lock:
+            with self._client.connection:
+                data = self._function(self._client, **self._params)
+        if self._name in _WRITING_FUNCTIONS:
+            self._client.publish("enquiries", [("UPDATE", row, {"id": row.get("id")}) for row in data])
+        if self._columns and isinstance(data, list):
+            data = [{column: row.get(column) for column in self._columns} for row in data]
+        return APIResponse(data)
+
+
+def _enquiry_summary(client) -> dict:
+    """SQLite version of enquiry_summary()"""
+    totals = client.query(
+        "SELECT COUNT(*) AS total_enquiries, "
+        "COALESCE(SUM(COALESCE(status, 'pending') = 'pending'), 0) AS pending, "
+        "COALESCE(SUM(num_adults), 0) AS total_adults, "
+        "COALESCE(SUM(num_children), 0) AS total_children FROM enquiries"
+    )[0]
+    breakdown = (
+        "SELECT {key} AS key, COUNT(*) AS enquiries, SUM(num_adults) AS adults, "
+        "SUM(num_children) AS children FROM enquiries GROUP BY 1 ORDER BY enquiries DESC"
+    )
+    return {
+        **totals,
+        "by_status": client.query(breakdown.format(key="COALESCE(status, 'pending')")),
+        "by_package": client.query(breakdown.format(key="package"))
+    }
+
+
+def _search_enquiries(client, term: str, max_results: int = 20) -> list:
+    """SQLite version of search_enquiries(); SQLite has no trigram indexes, so matching scans"""
+    term = term.strip()
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return client.query(
+        "SELECT * FROM enquiries "
+        "WHERE name LIKE :pattern ESCAPE '\\' OR follow_up_notes LIKE :pattern ESCAPE '\\' "
+        "OR (length(:digits) >= 3 AND phone_canonical LIKE '%' || :phone || '%') "
+        "ORDER BY name LIKE :prefix ESCAPE '\\' DESC, created_at DESC LIMIT :limit",
+        {"pattern": f"%{escaped}%", "prefix": f"{escaped}%", "digits": _digits_only(term),
+         "phone": _canonical_phone(term),
+         "limit": min(max(int(max_results), 1), 100)}
+    )
+
+
+def _bulk_update_enquiries(client, enquiry_ids: list, new_status: str = None, note: str = None) -> list:
+    """SQLite version of bulk_update_enquiries()"""
+    ids = [int(enquiry_id) for enquiry_id in enquiry_ids]
+    if not ids:
+        return []
+    placeholders = ", ".join("?" * len(ids))
+    client.query(
+        "UPDATE enquiries SET status = COALESCE(?, status), follow_up_notes = CASE "
+        "WHEN COALESCE(?, '') = '' THEN follow_up_notes "
+        "WHEN COALESCE(follow_up_notes, '') = '' THEN ? "
+        "ELSE follow_up_notes || char(10) || ? END "
+        f"WHERE id IN ({placeholders})",
+        [new_status, note, note, note, *ids]
+    )
+    return client.query(f"SELECT * FROM enquiries WHERE id IN ({placeholders})", ids)
+
+
+_FUNCTIONS = {
+    "enquiry_summary": _enquiry_summary,
+    "search_enquiries": _search_enquiries,
+    "bulk_update_enquiries": _bulk_update_enquiries,
+}
+
+# Functions whose returned rows were updated, and so are published as UPDATE events
+_WRITING_FUNCTIONS = {"bulk_update_enquiries"}
+
+
+class SQLiteClient:
+    """Drop-in replacement for the Supabase client backed by a local SQLite database"""
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Args:
+            path: Database file, or ":memory:" for a private in-memory database
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self._listeners = []
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.create_function("canonical_phone", 1, _canonical_phone, deterministic=True)
+        self.connection.create_function("utc_now", 0, _utc_now)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+
+    def table(self, name: str) -> _Query:
+        """Start a query on a table"""
+        return _Query(self, name)
+
+    def from_(self, name: str) -> _Query:
+        """Alias of table(), as in supabase-py"""
+        return self.table(name)
+
+    def rpc(self, name: str, params: dict = None, **options) -> _RPCCall:
+        """Call one of the database functions defined in schema.sql"""
+        if name not in _FUNCTIONS:
+            raise ValueError(f"Unknown function: {name}")
+        return _RPCCall(self, name, params)
+
+    def subscribe(self, callback):
+        """
+        Register a change listener
+
+        Args:
+            callback: Called as callback(table, event_type, record, old_record)
+                      after each committed insert, update or delete
+        """
+        self._listeners.append(callback)
+
+    def publish(self, table: str, events: list):
+        """Send (event_type, record, old_record) events for table to every listener"""
+        for event_type, record, old_record in events:
+            for callback in self._listeners:
+                callback(table, event_type, record, old_record)
+
+    def query(self, sql: str, params=()) -> list:
+        """Run a statement and return its rows as dicts"""
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+
+    def close(self):
+        """Close the underlying connection"""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,235 @@
+import pandas as pd
+import pytest
+
+import cache
+import changefeed
+import database
+import outbox
+import ratelimit
+from cache import TTLCache
+from config import ENQUIRY_PAGE_SIZE, TAX_RATE
+from database import calculate_quotation, calculate_quotations
+from ratelimit import TokenBucketLimiter, forwarded_client_ip
+from sqlite_backend import SQLiteClient, _parse_logic
+
+
+def test_per_person_package_is_not_charged_twice():
+    quotation = calculate_quotation(1, 0, "Adult Package")
+    assert quotation["package_price"] == 0
+    assert quotation["total"] == pytest.approx(30 * (1 + TAX_RATE))
+
+
+def test_other_packages_add_their_price():
+    quotation = calculate_quotation(2, 1, "Wellness Day (Spa & Massage)")
+    assert quotation["total"] == pytest.approx((2 * 30 + 15 + 25) * (1 + TAX_RATE))
+
+
+def test_vectorized_quotations_match_calculate_quotation():
+    enquiries = pd.DataFrame({
+        "num_adults": [1, 2, 0, 3],
+        "num_children": [0, 1, 2, 0],
+        "package": ["Adult Package", "Child Package (Under 12)", "Own Cooler Box Fee", "Unknown"],
+    })
+    totals = calculate_quotations(enquiries)["total"].tolist()
+    expected = [calculate_quotation(*row)["total"] for row in enquiries.itertuples(index=False)]
+    assert totals == pytest.approx(expected)
+    assert totals[0] == pytest.approx(33.6)
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    monkeypatch.setattr(database, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(database, "_client", SQLiteClient(":memory:"))
+    database.invalidate_enquiry_cache()
+    # Ids restart in every database, so forget the inserts applied in other tests
+    database._applied_inserts.invalidate()
+    yield database._client
+    database.invalidate_enquiry_cache()
+
+
+def add_enquiries(client, count, **columns):
+    rows = [{"name": f"Guest {i}", "phone": f"0775{i:06d}", "booking_date": "2026-12-01",
+             "num_adults": 2, "package": "Adult Package", **columns} for i in range(count)]
+    return client.table("enquiries").insert(rows).execute().data
+
+
+def test_status_update_keeps_filtered_page_full(sqlite_db):
+    add_enquiries(sqlite_db, 40)
+    page, next_cursor = database.fetch_enquiry_page(status="pending")
+    assert next_cursor is not None
+    
+    assert database.update_enquiry_status(int(page["id"].iloc[0]), "confirmed")["success"]
+    
+    pending, next_cursor = database.fetch_enquiry_page(status="pending")
+    confirmed, _ = database.fetch_enquiry_page(status="confirmed")
+    assert len(pending) == ENQUIRY_PAGE_SIZE and next_cursor is not None
+    assert page["id"].iloc[0] not in pending["id"].tolist()
+    assert confirmed["id"].tolist() == [page["id"].iloc[0]]
+
+
+def test_failed_write_restores_dropped_reads(sqlite_db):
+    enquiry_id = add_enquiries(sqlite_db, 3)[0]["id"]
+    pending, _ = database.fetch_enquiry_page(status="pending")
+    summary = database.fetch_enquiry_summary()
+    occupancy = database.fetch_occupancy()
+    
+    def fail():
+        raise ConnectionError("offline")
+    
+    result = database._optimistic_update({enquiry_id: {"status": "confirmed"}}, fail)
+    
+    assert result["success"] is False
+    misses = database.get_enquiry_cache_stats()["misses"]
+    assert database.fetch_enquiry_page(status="pending")[0].equals(pending)
+    assert database.fetch_enquiry_summary() == summary
+    assert database.fetch_occupancy() == occupancy
+    assert database.get_enquiry_cache_stats()["misses"] == misses
+
+
+def test_outbox_delivery_advances_change_version(sqlite_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(outbox, "OUTBOX_PATH", str(tmp_path / "outbox.db"))
+    version = changefeed.get_change_version()
+    record = database.build_enquiry_record("Guest", "0775 387 683", "2026-12-01", 2, 0, "Adult Package")
+    
+    assert outbox.enqueue_enquiry(record)["success"]
+    assert outbox.flush_outbox()["sent"] == 1
+    
+    assert changefeed.get_change_version() > version
+
+
+def test_change_feed_echo_of_own_write_keeps_version(sqlite_db):
+    enquiry_id = add_enquiries(sqlite_db, 1)[0]["id"]
+    database.fetch_enquiry_page()
+    database.fetch_enquiry_summary()
+    assert database.update_enquiry_status(enquiry_id, "confirmed")["success"]
+    version = changefeed.get_change_version()
+    echo = sqlite_db.table("enquiries").select("*").eq("id", enquiry_id).execute().data[0]
+    
+    changefeed.publish_change("UPDATE", echo)
+    assert changefeed.get_change_version() == version
+    
+    changefeed.publish_change("UPDATE", {**echo, "status": "cancelled"})
+    assert changefeed.get_change_version() > version
+    assert database.fetch_enquiry_summary()["by_status"][0]["key"] == "cancelled"
+
+
+def test_forwarded_client_ip_ignores_client_supplied_hops():
+    assert forwarded_client_ip("6.6.6.6, 203.0.113.7", trusted_hops=1) == "203.0.113.7"
+    assert forwarded_client_ip("6.6.6.6, 203.0.113.7, 10.0.0.2", trusted_hops=2) == "203.0.113.7"
+    assert forwarded_client_ip("203.0.113.7", trusted_hops=2) == "203.0.113.7"
+    assert forwarded_client_ip(" ", trusted_hops=1) is None
+
+
+def test_parse_logic_translates_keyset_cursor():
+    stamp = "2026-01-01T00:00:00+00:00"
+    clause, params = _parse_logic(f'created_at.lt."{stamp}",and(created_at.eq."{stamp}",id.lt.5)', "OR")
+    assert clause == "(created_at < ?) OR ((created_at = ?) AND (id < ?))"
+    assert params == [stamp, stamp, "5"]
+
+
+def test_keyset_pages_split_rows_with_equal_created_at(sqlite_db):
+    add_enquiries(sqlite_db, 30, created_at="2026-01-01T00:00:00+00:00")
+    seen, cursor = [], None
+    while True:
+        page, cursor = database.fetch_enquiry_page(cursor=cursor, page_size=7)
+        seen += page["id"].tolist()
+        if cursor is None:
+            break
+    assert seen == sorted(range(1, 31), reverse=True)
+
+
+def test_active_fingerprint_drops_resubmission_until_cancelled(sqlite_db):
+    first = database.insert_enquiry("Guest", "0775 387 683", "2026-12-01", 2, 0, "Adult Package")
+    resubmitted = database.insert_enquiry("Guest", "+263 775 387 683", "2026-12-01", 2, 0, "Adult Package")
+    assert first["success"] and len(first["data"]) == 1
+    assert resubmitted["success"] and resubmitted["duplicates"] == 1 and resubmitted["data"] == []
+    
+    assert database.update_enquiry_status(first["data"][0]["id"], "cancelled")["success"]
+    again = database.insert_enquiry("Guest", "0775 387 683", "2026-12-01", 2, 0, "Adult Package")
+    assert again["success"] and len(again["data"]) == 1
+
+
+def test_reused_idempotency_key_returns_existing_enquiry(sqlite_db):
+    record = database.build_enquiry_record("Guest", "0775 387 683", "2026-12-01", 2, 0, "Adult Package",
+                                           idempotency_key="form-1")
+    stored = database.insert_enquiry_records([record])["data"][0]
+    other_date = {**record, "booking_date": "2026-12-02", "fingerprint": None}
+    
+    retried = database.insert_enquiry_records([other_date])
+    
+    assert retried["success"] and retried["duplicates"] == 1
+    assert retried["existing"]["id"] == stored["id"]
+    assert database.insert_enquiry_records([other_date, {**other_date, "idempotency_key": "form-2"}])["success"] is False
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(capacity=2, refill_per_second=0.5, max_keys=10)
+    
+    assert limiter.acquire("ip") == 0 and limiter.acquire("ip") == 0
+    assert limiter.acquire("ip") == pytest.approx(2.0)
+    now[0] += 1
+    assert limiter.acquire("ip") == pytest.approx(1.0)
+    now[0] += 1
+    assert limiter.acquire("ip") == 0
+    now[0] += 60
+    assert limiter.acquire("ip") == 0 and limiter.acquire("ip") == 0
+    assert limiter.acquire("ip") > 0
+    assert limiter.stats() == {"allowed": 5, "limited": 3, "clients": 1}
+
+
+def test_token_bucket_refund_is_capped_at_capacity():
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=0, max_keys=10)
+    
+    assert limiter.acquire("session") == 0
+    assert limiter.acquire("session") == float("inf")
+    limiter.refund("session")
+    limiter.refund("session")
+    assert limiter.acquire("session") == 0
+    assert limiter.acquire("session") == float("inf")
+
+
+def test_ttl_cache_patch_keeps_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    ttl_cache = TTLCache(ttl=10, max_entries=2)
+    ttl_cache.set("a", 1)
+    
+    now[0] += 6
+    ttl_cache.patch(lambda key, value: value + 1)
+    assert ttl_cache.get("a") == 2
+    assert ttl_cache.items() == [("a", 2)]
+    
+    now[0] += 5
+    assert ttl_cache.items() == []
+    assert ttl_cache.get("a") is None
+
+
+def test_patched_page_rolls_back(sqlite_db):
+    enquiry_id = add_enquiries(sqlite_db, 2)[0]["id"]
+    page, _ = database.fetch_enquiry_page()
+    
+    previous = database._apply_to_cache({enquiry_id: {"name": "Renamed", "follow_up_notes": "Called"}})
+    patched, _ = database.fetch_enquiry_page()
+    assert patched.set_index("id").loc[enquiry_id, "name"] == "Renamed"
+    
+    database._restore_cache(previous)
+    assert database.fetch_enquiry_page()[0].equals(page)
+    assert database._apply_to_cache({enquiry_id: {"name": page.set_index("id").loc[enquiry_id, "name"]}}) == {}
+
+
+def test_change_version_tracks_cache_changes_only(sqlite_db):
+    rows = add_enquiries(sqlite_db, 2)
+    version = changefeed.get_change_version()
+    database.fetch_enquiry_page()
+    database.fetch_occupancy()
+    assert changefeed.get_change_version() == version
+    
+    changefeed.publish_change("INSERT", rows[0])
+    changefeed.publish_change("INSERT", rows[0])
+    assert changefeed.get_change_version() == version + 1
+    
+    changefeed.publish_change("DELETE", old_record={"id": rows[1]["id"]})
+    assert changefeed.get_change_version() == version + 2
+    assert database.get_enquiry_cache_stats()["size"] == 0